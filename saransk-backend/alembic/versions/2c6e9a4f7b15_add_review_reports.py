@@ -0,0 +1,36 @@
+"""Add per-user review reports
+
+Revision ID: 2c6e9a4f7b15
+Revises: 8d2f4a6c1e93
+Create Date: 2025-09-23 11:37:05.418926
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '2c6e9a4f7b15'
+down_revision = '8d2f4a6c1e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('review_reports',
+    sa.Column('review_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['review_id'], ['reviews.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('review_id', 'user_id')
+    )
+    # The counter becomes the number of distinct reporters; earlier anonymous
+    # increments have no reporter rows and are kept as they are.
+    op.execute("UPDATE reviews SET reports_count = 0 WHERE reports_count IS NULL")
+    op.alter_column('reviews', 'reports_count', server_default='0', nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('reviews', 'reports_count', server_default=None, nullable=True)
+    op.drop_table('review_reports')
@@ -0,0 +1,47 @@
+"""Add composite and partial indexes for place and review listings
+
+Revision ID: 3b7f9d2e6a41
+Revises: 5d8e2a9c4b17
+Create Date: 2025-09-15 14:05:37.219844
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3b7f9d2e6a41'
+down_revision = '5d8e2a9c4b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # get_places: every public listing filters is_active = true and orders by id
+    # (or rating_overall, id for sort=rating), optionally narrowed by one enum filter
+    op.create_index('ix_places_active_id', 'places', ['id'],
+                    postgresql_where=sa.text('is_active'))
+    op.create_index('ix_places_active_category_id', 'places', ['category', 'id'],
+                    postgresql_where=sa.text('is_active'))
+    op.create_index('ix_places_active_subcategory_id', 'places', ['subcategory', 'id'],
+                    postgresql_where=sa.text('is_active'))
+    op.create_index('ix_places_active_price_tier_id', 'places', ['price_tier', 'id'],
+                    postgresql_where=sa.text('is_active'))
+    op.create_index('ix_places_active_rating_id', 'places',
+                    [sa.text('rating_overall DESC'), sa.text('id DESC')],
+                    postgresql_where=sa.text('is_active'))
+
+    # reviews.place_id had no index at all (FK checks, cascades, rating reconcile);
+    # get_place_reviews pages approved reviews of one place newest first
+    op.create_index(op.f('ix_reviews_place_id'), 'reviews', ['place_id'], unique=False)
+    op.create_index('ix_reviews_place_approved_id', 'reviews', ['place_id', sa.text('id DESC')],
+                    postgresql_where=sa.text("status = 'approved'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reviews_place_approved_id', table_name='reviews')
+    op.drop_index(op.f('ix_reviews_place_id'), table_name='reviews')
+    op.drop_index('ix_places_active_rating_id', table_name='places')
+    op.drop_index('ix_places_active_price_tier_id', table_name='places')
+    op.drop_index('ix_places_active_subcategory_id', table_name='places')
+    op.drop_index('ix_places_active_category_id', table_name='places')
+    op.drop_index('ix_places_active_id', table_name='places')
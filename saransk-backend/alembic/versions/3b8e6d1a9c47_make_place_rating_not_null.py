@@ -0,0 +1,25 @@
+"""Make places.rating_overall NOT NULL
+
+Revision ID: 3b8e6d1a9c47
+Revises: 7c2e5a9d3f18
+Create Date: 2025-10-06 11:02:17.448203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3b8e6d1a9c47'
+down_revision = '7c2e5a9d3f18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pages on (rating_overall, id) skip NULL ratings in row comparisons
+    op.execute("UPDATE places SET rating_overall = 0 WHERE rating_overall IS NULL")
+    op.alter_column('places', 'rating_overall', existing_type=sa.Float(), server_default='0', nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('places', 'rating_overall', existing_type=sa.Float(), server_default=None, nullable=True)
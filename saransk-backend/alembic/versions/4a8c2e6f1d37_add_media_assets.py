@@ -0,0 +1,53 @@
+"""Add media assets and per-photo variant URLs on places
+
+Revision ID: 4a8c2e6f1d37
+Revises: 2c6e9a4f7b15
+Create Date: 2025-09-26 10:14:52.630184
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '4a8c2e6f1d37'
+down_revision = '2c6e9a4f7b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    mediakind = postgresql.ENUM('place', 'review', name='mediakind')
+    mediastatus = postgresql.ENUM('uploading', 'processing', 'ready', 'failed', name='mediastatus')
+    mediakind.create(op.get_bind())
+    mediastatus.create(op.get_bind())
+
+    op.create_table('media_assets',
+    sa.Column('kind', postgresql.ENUM(name='mediakind', create_type=False), nullable=False),
+    sa.Column('key', sa.String(length=512), nullable=False),
+    sa.Column('url', sa.String(length=1024), nullable=False),
+    sa.Column('content_type', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='mediastatus', create_type=False), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.Column('variants', sa.JSON(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key')
+    )
+    op.create_index(op.f('ix_media_assets_id'), 'media_assets', ['id'], unique=False)
+    op.create_index(op.f('ix_media_assets_url'), 'media_assets', ['url'], unique=False)
+    op.add_column('places', sa.Column('photo_variants', sa.JSON(), server_default='{}', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('places', 'photo_variants')
+    op.drop_index(op.f('ix_media_assets_url'), table_name='media_assets')
+    op.drop_index(op.f('ix_media_assets_id'), table_name='media_assets')
+    op.drop_table('media_assets')
+    op.execute('DROP TYPE mediastatus')
+    op.execute('DROP TYPE mediakind')
@@ -0,0 +1,35 @@
+"""Add place grid cell for nearby search
+
+Revision ID: 4e2b7c9a1d35
+Revises: bb9146a546a8
+Create Date: 2025-09-02 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '4e2b7c9a1d35'
+down_revision = 'bb9146a546a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('places', sa.Column('grid_cell', sa.BigInteger(), nullable=True))
+
+    # Backfill existing rows; mirrors app.core.geo.grid_cell (CELL_DEG = 0.01, 36000 columns)
+    op.execute(
+        """
+        UPDATE places
+        SET grid_cell = floor((latitude + 90) / 0.01)::bigint * 36000
+                        + LEAST(floor((longitude + 180) / 0.01)::bigint, 35999)
+        """
+    )
+
+    op.create_index(op.f('ix_places_grid_cell'), 'places', ['grid_cell'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_places_grid_cell'), table_name='places')
+    op.drop_column('places', 'grid_cell')
@@ -0,0 +1,129 @@
+"""Add per-zoom place cluster aggregates for the map
+
+Revision ID: 5b9d3f7e2a68
+Revises: 4a8c2e6f1d37
+Create Date: 2025-09-29 11:37:08.552914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '5b9d3f7e2a68'
+down_revision = '4a8c2e6f1d37'
+branch_labels = None
+depends_on = None
+
+# Mirrors app.services.clusters: cells are tiles CELL_SHIFT (1) level below
+# the map zoom, for zooms below MAX_ZOOM (18)
+MIN_LEVEL, MAX_LEVEL = 1, 18
+
+# Active places only; UPDATE statements count only rows whose position,
+# category or is_active changed (rating updates touch nothing)
+DELTAS = {
+    'INSERT': "SELECT latitude, longitude, category, 1 AS n FROM new_rows WHERE is_active",
+    'DELETE': "SELECT latitude, longitude, category, -1 AS n FROM old_rows WHERE is_active",
+    'UPDATE': """
+        SELECT o.latitude, o.longitude, o.category, -1 AS n
+        FROM old_rows o JOIN new_rows n USING (id)
+        WHERE o.is_active AND (o.latitude, o.longitude, o.category, o.is_active)
+                              IS DISTINCT FROM (n.latitude, n.longitude, n.category, n.is_active)
+        UNION ALL
+        SELECT n.latitude, n.longitude, n.category, 1 AS n
+        FROM old_rows o JOIN new_rows n USING (id)
+        WHERE n.is_active AND (o.latitude, o.longitude, o.category, o.is_active)
+                              IS DISTINCT FROM (n.latitude, n.longitude, n.category, n.is_active)
+    """,
+}
+
+
+def upgrade() -> None:
+    op.create_table('place_clusters',
+    sa.Column('level', sa.SmallInteger(), nullable=False),
+    sa.Column('x', sa.Integer(), nullable=False),
+    sa.Column('y', sa.Integer(), nullable=False),
+    sa.Column('category', postgresql.ENUM(name='placecategory', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('sum_lat', sa.Float(), nullable=False),
+    sa.Column('sum_lng', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('level', 'x', 'y', 'category')
+    )
+    # Cells emptied by a move or deactivation, for the cleanup after each statement
+    op.create_index('ix_place_clusters_empty', 'place_clusters', ['level'], unique=False,
+                    postgresql_where=sa.text('count <= 0'))
+
+    # Web Mercator tile column/row; mirrors app.core.geo.tile_xy
+    op.execute(
+        """
+        CREATE FUNCTION tile_x(lng double precision, level integer) RETURNS integer
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT LEAST(GREATEST(floor((lng + 180) / 360 * (1 << level))::integer, 0), (1 << level) - 1)
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION tile_y(lat double precision, level integer) RETURNS integer
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT LEAST(GREATEST(floor(
+                (1 - ln(tan(radians(c)) + 1 / cos(radians(c))) / pi()) / 2 * (1 << level)
+            )::integer, 0), (1 << level) - 1)
+            FROM (SELECT LEAST(GREATEST(lat, -85.0511287798), 85.0511287798) AS c) clamped
+        $$
+        """
+    )
+
+    # Statement-level triggers (as for the sync log): one grouped upsert per
+    # statement and level range, so bulk imports pay per statement
+    for event, deltas in DELTAS.items():
+        op.execute(
+            f"""
+            CREATE FUNCTION place_clusters_{event.lower()}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                INSERT INTO place_clusters AS c (level, x, y, category, count, sum_lat, sum_lng)
+                SELECT l, tile_x(d.longitude, l), tile_y(d.latitude, l), d.category,
+                       sum(d.n), sum(d.n * d.latitude), sum(d.n * d.longitude)
+                FROM ({deltas}) d, generate_series({MIN_LEVEL}, {MAX_LEVEL}) l
+                GROUP BY 1, 2, 3, 4
+                ON CONFLICT (level, x, y, category) DO UPDATE
+                SET count = c.count + EXCLUDED.count,
+                    sum_lat = c.sum_lat + EXCLUDED.sum_lat,
+                    sum_lng = c.sum_lng + EXCLUDED.sum_lng;
+                DELETE FROM place_clusters WHERE count <= 0;
+                RETURN NULL;
+            END
+            $$
+            """
+        )
+        transition = {
+            'INSERT': 'NEW TABLE AS new_rows',
+            'DELETE': 'OLD TABLE AS old_rows',
+            'UPDATE': 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+        }[event]
+        op.execute(
+            f"CREATE TRIGGER places_clusters_{event.lower()} AFTER {event} ON places "
+            f"REFERENCING {transition} FOR EACH STATEMENT "
+            f"EXECUTE FUNCTION place_clusters_{event.lower()}()"
+        )
+
+    op.execute(
+        f"""
+        INSERT INTO place_clusters (level, x, y, category, count, sum_lat, sum_lng)
+        SELECT l, tile_x(longitude, l), tile_y(latitude, l), category, count(*), sum(latitude), sum(longitude)
+        FROM places, generate_series({MIN_LEVEL}, {MAX_LEVEL}) l
+        WHERE is_active
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    for event in DELTAS:
+        op.execute(f"DROP TRIGGER places_clusters_{event.lower()} ON places")
+        op.execute(f"DROP FUNCTION place_clusters_{event.lower()}()")
+    op.execute("DROP FUNCTION tile_y(double precision, integer)")
+    op.execute("DROP FUNCTION tile_x(double precision, integer)")
+    op.drop_index('ix_place_clusters_empty', table_name='place_clusters')
+    op.drop_table('place_clusters')
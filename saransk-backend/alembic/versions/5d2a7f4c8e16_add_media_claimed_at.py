@@ -0,0 +1,23 @@
+"""Add claimed_at to media assets for thumbnail claims
+
+Revision ID: 5d2a7f4c8e16
+Revises: 3b8e6d1a9c47
+Create Date: 2025-10-06 14:37:52.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5d2a7f4c8e16'
+down_revision = '3b8e6d1a9c47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('media_assets', sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('media_assets', 'claimed_at')
@@ -0,0 +1,55 @@
+"""Add bilingual full-text search vectors to places
+
+Revision ID: 5d8e2a9c4b17
+Revises: 9c4f1a7e2b83
+Create Date: 2025-09-12 09:48:21.557310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '5d8e2a9c4b17'
+down_revision = '9c4f1a7e2b83'
+branch_labels = None
+depends_on = None
+
+# Mirrors SEARCH_RU_SQL / SEARCH_EN_SQL in app.models.place
+SEARCH_RU_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title_ru, '')), 'A') || "
+    "setweight(to_tsvector('russian', places_tags_text(tags::text[])), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(address_ru, '')), 'C') || "
+    "setweight(to_tsvector('russian', coalesce(description_ru, '')), 'D')"
+)
+SEARCH_EN_SQL = (
+    "setweight(to_tsvector('english', coalesce(title_en, '')), 'A') || "
+    "setweight(to_tsvector('english', places_tags_text(tags::text[])), 'B') || "
+    "setweight(to_tsvector('english', coalesce(address_en, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description_en, '')), 'D')"
+)
+
+
+def upgrade() -> None:
+    # array_to_string is only STABLE; generated columns need IMMUTABLE expressions
+    op.execute(
+        """
+        CREATE FUNCTION places_tags_text(tags text[]) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$ SELECT coalesce(array_to_string(tags, ' '), '') $$
+        """
+    )
+    # Stored generated columns: filled for existing rows by the table rewrite
+    # and kept current by Postgres on every INSERT/UPDATE, including bulk imports
+    op.add_column('places', sa.Column('search_ru', postgresql.TSVECTOR(), sa.Computed(SEARCH_RU_SQL, persisted=True)))
+    op.add_column('places', sa.Column('search_en', postgresql.TSVECTOR(), sa.Computed(SEARCH_EN_SQL, persisted=True)))
+    op.create_index('ix_places_search_ru', 'places', ['search_ru'], unique=False, postgresql_using='gin')
+    op.create_index('ix_places_search_en', 'places', ['search_en'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_places_search_en', table_name='places')
+    op.drop_index('ix_places_search_ru', table_name='places')
+    op.drop_column('places', 'search_en')
+    op.drop_column('places', 'search_ru')
+    op.execute("DROP FUNCTION places_tags_text(text[])")
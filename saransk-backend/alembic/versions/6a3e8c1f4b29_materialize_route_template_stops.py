@@ -0,0 +1,208 @@
+"""Materialize route template stops, legs and polyline
+
+Revision ID: 6a3e8c1f4b29
+Revises: 5b9d3f7e2a68
+Create Date: 2025-10-01 10:14:52.306118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '6a3e8c1f4b29'
+down_revision = '5b9d3f7e2a68'
+branch_labels = None
+depends_on = None
+
+# Mirrors app.services.routing (WALK_DETOUR_FACTOR, WALK_SPEED_M_PER_MIN,
+# DWELL_MINUTES) and app.core.geo.EARTH_RADIUS_M
+EARTH_RADIUS_M = 6371008.8
+WALK_DETOUR_FACTOR = 1.3
+WALK_SPEED_M_PER_MIN = 75.0
+DWELL_MINUTES = {'monument': 15, 'architecture': 30, 'food': 45, 'souvenir': 20}
+DEFAULT_DWELL_MINUTES = 30
+
+# Columns route_stops() fills, in its output order
+MATERIALIZED = ('stops', 'polyline', 'missing_place_ids', 'distance_m', 'walk_minutes', 'dwell_minutes',
+                'distance_km')
+# What a stop shows of its place; routes are refreshed only when one of these changes
+STOP_COLUMNS = ('title_ru', 'title_en', 'category', 'subcategory', 'latitude', 'longitude', 'is_active',
+                'photos', 'photo_variants::text')
+
+DWELL_CASE = "CASE category::text {} ELSE {} END".format(
+    " ".join(f"WHEN '{category}' THEN {minutes}" for category, minutes in DWELL_MINUTES.items()),
+    DEFAULT_DWELL_MINUTES,
+)
+
+
+def _changed(alias_old: str, alias_new: str) -> str:
+    old = ", ".join(f"{alias_old}.{column}" for column in STOP_COLUMNS)
+    new = ", ".join(f"{alias_new}.{column}" for column in STOP_COLUMNS)
+    return f"({old}) IS DISTINCT FROM ({new})"
+
+
+# Place ids whose stop summary may have changed, per statement
+CHANGED_IDS = {
+    'INSERT': "SELECT id FROM new_rows",
+    'DELETE': "SELECT id FROM old_rows",
+    'UPDATE': f"SELECT n.id FROM old_rows o JOIN new_rows n USING (id) WHERE {_changed('o', 'n')}",
+}
+
+
+def upgrade() -> None:
+    # place_ids: JSON list -> integer[], so templates referencing a place are a GIN lookup
+    op.add_column('route_templates', sa.Column('place_id_array', postgresql.ARRAY(sa.Integer()),
+                                               server_default='{}', nullable=False))
+    op.execute(
+        "UPDATE route_templates SET place_id_array = "
+        "ARRAY(SELECT json_array_elements_text(place_ids)::integer)"
+    )
+    op.drop_column('route_templates', 'place_ids')
+    op.alter_column('route_templates', 'place_id_array', new_column_name='place_ids')
+    op.create_index('ix_route_templates_place_ids', 'route_templates', ['place_ids'], unique=False,
+                    postgresql_using='gin')
+
+    op.add_column('route_templates', sa.Column('stops', postgresql.JSONB(), server_default='[]', nullable=False))
+    op.add_column('route_templates', sa.Column('polyline', postgresql.JSONB(), server_default='[]', nullable=False))
+    op.add_column('route_templates', sa.Column('missing_place_ids', postgresql.ARRAY(sa.Integer()),
+                                               server_default='{}', nullable=False))
+    op.add_column('route_templates', sa.Column('distance_m', sa.Float(), server_default='0', nullable=False))
+    op.add_column('route_templates', sa.Column('walk_minutes', sa.Float(), server_default='0', nullable=False))
+    op.add_column('route_templates', sa.Column('dwell_minutes', sa.Float(), server_default='0', nullable=False))
+
+    # Active places in route order: the first stop is where the walk starts,
+    # each later one carries the walk from the previous stop (as
+    # describe_route, without a start point). Ids of deleted or inactive
+    # places go to missing_place_ids, first occurrence order.
+    op.execute(
+        f"""
+        CREATE FUNCTION route_stops(
+            ids integer[],
+            OUT stops jsonb, OUT polyline jsonb, OUT missing_place_ids integer[],
+            OUT distance_m double precision, OUT walk_minutes double precision,
+            OUT dwell_minutes double precision, OUT distance_km double precision
+        )
+        LANGUAGE sql STABLE AS $$
+            WITH wanted AS (
+                SELECT id, ord FROM unnest(ids) WITH ORDINALITY AS u(id, ord)
+            ), found AS (
+                SELECT w.ord, p.id, p.title_ru, p.title_en, p.category, p.subcategory, p.latitude, p.longitude,
+                       p.photos[1] AS photo, p.photo_variants::jsonb -> p.photos[1] AS photo_variants,
+                       lag(p.latitude) OVER w AS prev_lat, lag(p.longitude) OVER w AS prev_lng
+                FROM wanted w JOIN places p ON p.id = w.id AND p.is_active
+                WINDOW w AS (ORDER BY w.ord)
+            ), legs AS (
+                SELECT f.*,
+                       -- (LEAST skips NULLs, so the first stop needs its own branch)
+                       CASE WHEN prev_lat IS NULL THEN 0 ELSE 2 * {EARTH_RADIUS_M} * asin(sqrt(LEAST(1,
+                           sin(radians(latitude - prev_lat) / 2) ^ 2
+                           + cos(radians(prev_lat)) * cos(radians(latitude)) * sin(radians(longitude - prev_lng) / 2) ^ 2
+                       ))) * {WALK_DETOUR_FACTOR} END AS leg_m,
+                       {DWELL_CASE}::double precision AS dwell
+                FROM found f
+            ), timed AS (
+                SELECT l.*, sum(leg_m / {WALK_SPEED_M_PER_MIN} + dwell) OVER (ORDER BY ord) - dwell AS arrive
+                FROM legs l
+            ), totals AS (
+                SELECT COALESCE(sum(leg_m), 0) AS distance_m, COALESCE(sum(dwell), 0) AS dwell_minutes FROM timed
+            )
+            SELECT
+                COALESCE((
+                    SELECT jsonb_agg(jsonb_build_object(
+                        'place_id', id, 'title_ru', title_ru, 'title_en', title_en,
+                        'category', category, 'subcategory', subcategory,
+                        'latitude', latitude, 'longitude', longitude,
+                        'photo', photo, 'photo_variants', photo_variants,
+                        'leg_distance_m', round(leg_m::numeric, 1),
+                        'leg_walk_minutes', round((leg_m / {WALK_SPEED_M_PER_MIN})::numeric, 1),
+                        'arrive_minute', round(arrive::numeric, 1),
+                        'dwell_minutes', dwell
+                    ) ORDER BY ord) FROM timed
+                ), '[]'),
+                COALESCE((SELECT jsonb_agg(jsonb_build_array(latitude, longitude) ORDER BY ord) FROM timed), '[]'),
+                ARRAY(
+                    SELECT w.id FROM wanted w
+                    WHERE NOT EXISTS (SELECT 1 FROM found f WHERE f.ord = w.ord)
+                    GROUP BY w.id ORDER BY min(w.ord)
+                ),
+                round(t.distance_m::numeric, 1)::double precision,
+                round((t.distance_m / {WALK_SPEED_M_PER_MIN})::numeric, 1)::double precision,
+                t.dwell_minutes,
+                round((t.distance_m / 1000)::numeric, 2)::double precision
+            FROM totals t
+        $$
+        """
+    )
+
+    columns = ", ".join(MATERIALIZED)
+    # Written place_ids are materialized before the row is stored
+    op.execute(
+        f"""
+        CREATE FUNCTION route_templates_materialize() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            SELECT {columns} INTO {", ".join(f"NEW.{column}" for column in MATERIALIZED)}
+            FROM route_stops(NEW.place_ids);
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER route_templates_materialize BEFORE INSERT OR UPDATE OF place_ids ON route_templates "
+        "FOR EACH ROW EXECUTE FUNCTION route_templates_materialize()"
+    )
+
+    # Statement-level triggers on places (as for the sync log and clusters):
+    # one refresh of the routes referencing any changed place per statement.
+    # The UPDATE also logs the routes for delta sync.
+    for event, changed in CHANGED_IDS.items():
+        op.execute(
+            f"""
+            CREATE FUNCTION route_templates_refresh_{event.lower()}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            DECLARE
+                changed_ids integer[] := ARRAY({changed});
+            BEGIN
+                IF cardinality(changed_ids) > 0 THEN
+                    UPDATE route_templates t
+                    SET ({columns}) = (SELECT {columns} FROM route_stops(t.place_ids)),
+                        updated_at = timezone('utc', now())
+                    WHERE t.place_ids && changed_ids;
+                END IF;
+                RETURN NULL;
+            END
+            $$
+            """
+        )
+        transition = {
+            'INSERT': 'NEW TABLE AS new_rows',
+            'DELETE': 'OLD TABLE AS old_rows',
+            'UPDATE': 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+        }[event]
+        op.execute(
+            f"CREATE TRIGGER places_route_templates_{event.lower()} AFTER {event} ON places "
+            f"REFERENCING {transition} FOR EACH STATEMENT "
+            f"EXECUTE FUNCTION route_templates_refresh_{event.lower()}()"
+        )
+
+    # Backfill; hand-entered distances are replaced by the computed ones
+    op.execute("UPDATE route_templates SET place_ids = place_ids")
+
+
+def downgrade() -> None:
+    for event in CHANGED_IDS:
+        op.execute(f"DROP TRIGGER places_route_templates_{event.lower()} ON places")
+        op.execute(f"DROP FUNCTION route_templates_refresh_{event.lower()}()")
+    op.execute("DROP TRIGGER route_templates_materialize ON route_templates")
+    op.execute("DROP FUNCTION route_templates_materialize()")
+    op.execute("DROP FUNCTION route_stops(integer[])")
+    for column in ('dwell_minutes', 'walk_minutes', 'distance_m', 'missing_place_ids', 'polyline', 'stops'):
+        op.drop_column('route_templates', column)
+
+    op.drop_index('ix_route_templates_place_ids', table_name='route_templates', postgresql_using='gin')
+    op.add_column('route_templates', sa.Column('place_id_list', sa.JSON(), server_default='[]', nullable=False))
+    op.execute("UPDATE route_templates SET place_id_list = to_json(place_ids)")
+    op.drop_column('route_templates', 'place_ids')
+    op.alter_column('route_templates', 'place_id_list', new_column_name='place_ids', server_default=None)
@@ -0,0 +1,41 @@
+"""Add compiled opening-hours intervals to places
+
+Revision ID: 6f1c8b3e9d52
+Revises: 3b7f9d2e6a41
+Create Date: 2025-09-17 11:26:09.504318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.hours import parse_hours
+
+# revision identifiers, used by Alembic.
+revision = '6f1c8b3e9d52'
+down_revision = '3b7f9d2e6a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('places', sa.Column('open_intervals', postgresql.INT4MULTIRANGE(), nullable=True))
+
+    # Backfill existing rows; the hours grammar only exists in Python (app.core.hours)
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, hours_json FROM places WHERE hours_json IS NOT NULL")).all()
+    params = []
+    for place_id, hours_json in rows:
+        intervals = parse_hours(hours_json)
+        if intervals is not None:
+            ranges = ",".join(f"[{lo},{hi})" for lo, hi in intervals)
+            params.append({"id": place_id, "ranges": "{" + ranges + "}"})
+    if params:
+        conn.execute(
+            sa.text("UPDATE places SET open_intervals = CAST(:ranges AS int4multirange) WHERE id = :id"),
+            params,
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('places', 'open_intervals')
@@ -0,0 +1,54 @@
+"""Add running rating sums to places
+
+Revision ID: 7a5d3e1f8c62
+Revises: 4e2b7c9a1d35
+Create Date: 2025-09-04 16:40:05.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7a5d3e1f8c62'
+down_revision = '4e2b7c9a1d35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('places', sa.Column('rating_interest_sum', sa.Float(), server_default='0', nullable=False))
+    op.add_column('places', sa.Column('rating_informativeness_sum', sa.Float(), server_default='0', nullable=False))
+    op.add_column('places', sa.Column('rating_convenience_sum', sa.Float(), server_default='0', nullable=False))
+
+    # Seed sums, counts and averages from the approved reviews
+    op.execute(
+        """
+        UPDATE places AS p
+        SET reviews_count = a.n,
+            rating_interest_sum = a.interest,
+            rating_informativeness_sum = a.informativeness,
+            rating_convenience_sum = a.convenience,
+            rating_interest = CASE WHEN a.n > 0 THEN a.interest / a.n ELSE 0 END,
+            rating_informativeness = CASE WHEN a.n > 0 THEN a.informativeness / a.n ELSE 0 END,
+            rating_convenience = CASE WHEN a.n > 0 THEN a.convenience / a.n ELSE 0 END,
+            rating_overall = CASE WHEN a.n > 0
+                THEN (a.interest + a.informativeness + a.convenience) / 3 / a.n ELSE 0 END
+        FROM (
+            SELECT pl.id,
+                   count(r.id) AS n,
+                   coalesce(sum(r.rating_interest), 0) AS interest,
+                   coalesce(sum(r.rating_informativeness), 0) AS informativeness,
+                   coalesce(sum(r.rating_convenience), 0) AS convenience
+            FROM places pl
+            LEFT JOIN reviews r ON r.place_id = pl.id AND r.status = 'approved'
+            GROUP BY pl.id
+        ) AS a
+        WHERE p.id = a.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('places', 'rating_convenience_sum')
+    op.drop_column('places', 'rating_informativeness_sum')
+    op.drop_column('places', 'rating_interest_sum')
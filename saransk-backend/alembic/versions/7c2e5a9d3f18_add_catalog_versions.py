@@ -0,0 +1,67 @@
+"""Add catalog version counters for in-process snapshots
+
+Revision ID: 7c2e5a9d3f18
+Revises: 6a3e8c1f4b29
+Create Date: 2025-10-03 15:26:41.907352
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7c2e5a9d3f18'
+down_revision = '6a3e8c1f4b29'
+branch_labels = None
+depends_on = None
+
+TRACKED = ['places']
+
+
+def upgrade() -> None:
+    op.create_table('catalog_versions',
+    sa.Column('name', sa.String(length=32), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # One bump per statement that touched rows (as for the sync log). The row
+    # lock is held to commit, which serializes concurrent place writers; these
+    # are admin edits, imports and rating updates, all short transactions.
+    op.execute(
+        """
+        CREATE FUNCTION bump_catalog_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            touched boolean;
+        BEGIN
+            -- Only the statement's own transition table exists
+            IF TG_OP = 'DELETE' THEN
+                touched := EXISTS (SELECT 1 FROM old_rows);
+            ELSE
+                touched := EXISTS (SELECT 1 FROM new_rows);
+            END IF;
+            IF touched THEN
+                UPDATE catalog_versions SET version = version + 1 WHERE name = TG_TABLE_NAME;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table in TRACKED:
+        op.execute(f"INSERT INTO catalog_versions (name, version) VALUES ('{table}', 1)")
+        for event, transition in (('INSERT', 'NEW TABLE AS new_rows'),
+                                  ('UPDATE', 'NEW TABLE AS new_rows'),
+                                  ('DELETE', 'OLD TABLE AS old_rows')):
+            op.execute(
+                f"CREATE TRIGGER {table}_catalog_version_{event.lower()} AFTER {event} ON {table} "
+                f"REFERENCING {transition} FOR EACH STATEMENT "
+                f"EXECUTE FUNCTION bump_catalog_version()"
+            )
+
+
+def downgrade() -> None:
+    for table in TRACKED:
+        for event in ('insert', 'update', 'delete'):
+            op.execute(f"DROP TRIGGER {table}_catalog_version_{event} ON {table}")
+    op.execute("DROP FUNCTION bump_catalog_version()")
+    op.drop_table('catalog_versions')
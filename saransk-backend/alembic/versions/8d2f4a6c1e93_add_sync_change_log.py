@@ -0,0 +1,73 @@
+"""Add change log for delta sync of places and route templates
+
+Revision ID: 8d2f4a6c1e93
+Revises: 6f1c8b3e9d52
+Create Date: 2025-09-19 16:02:44.871205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8d2f4a6c1e93'
+down_revision = '6f1c8b3e9d52'
+branch_labels = None
+depends_on = None
+
+# (table, entity name in the log)
+TRACKED = [('places', 'place'), ('route_templates', 'route_template')]
+
+
+def upgrade() -> None:
+    op.create_table('sync_changes',
+    sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+    # 64-bit id of the writing transaction (xid8 has no direct cast to bigint)
+    sa.Column('xid', sa.BigInteger(), server_default=sa.text('pg_current_xact_id()::text::bigint'), nullable=False),
+    sa.Column('entity', sa.String(length=32), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(length=8), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_changes_xid', 'sync_changes', ['xid'], unique=False)
+    op.create_index('ix_sync_changes_entity', 'sync_changes', ['entity', 'entity_id'], unique=False)
+
+    # Statement-level triggers with transition tables: one INSERT ... SELECT per
+    # statement, so bulk imports pay per statement rather than per row.
+    # Hard deletes leave a 'delete' row behind, the tombstone clients sync.
+    op.execute(
+        """
+        CREATE FUNCTION sync_log_changes() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                INSERT INTO sync_changes (entity, entity_id, op)
+                SELECT TG_ARGV[0], id, 'delete' FROM old_rows;
+            ELSE
+                INSERT INTO sync_changes (entity, entity_id, op)
+                SELECT TG_ARGV[0], id, 'upsert' FROM new_rows;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table, entity in TRACKED:
+        for event, transition in (('INSERT', 'NEW TABLE AS new_rows'),
+                                  ('UPDATE', 'NEW TABLE AS new_rows'),
+                                  ('DELETE', 'OLD TABLE AS old_rows')):
+            op.execute(
+                f"CREATE TRIGGER {table}_sync_{event.lower()} AFTER {event} ON {table} "
+                f"REFERENCING {transition} FOR EACH STATEMENT "
+                f"EXECUTE FUNCTION sync_log_changes('{entity}')"
+            )
+
+
+def downgrade() -> None:
+    for table, _ in TRACKED:
+        for event in ('insert', 'update', 'delete'):
+            op.execute(f"DROP TRIGGER {table}_sync_{event} ON {table}")
+    op.execute("DROP FUNCTION sync_log_changes()")
+    op.drop_index('ix_sync_changes_entity', table_name='sync_changes')
+    op.drop_index('ix_sync_changes_xid', table_name='sync_changes')
+    op.drop_table('sync_changes')
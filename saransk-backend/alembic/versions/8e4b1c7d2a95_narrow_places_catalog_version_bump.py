@@ -0,0 +1,63 @@
+"""Bump the places catalog version only when a served column changes
+
+Revision ID: 8e4b1c7d2a95
+Revises: 5d2a7f4c8e16
+Create Date: 2025-10-07 09:48:31.560274
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '8e4b1c7d2a95'
+down_revision = '5d2a7f4c8e16'
+branch_labels = None
+depends_on = None
+
+# app.services.catalog.RECORD_FIELDS as of this revision, without id (the
+# join key); json has no equality operator, so photo_variants compares as text
+SERVED_COLUMNS = (
+    'title_ru', 'title_en', 'description_ru', 'description_en', 'category', 'subcategory', 'tags',
+    'latitude', 'longitude', 'address_ru', 'address_en', 'price_tier', 'is_commercial', 'website', 'phone',
+    'hours_json', 'photos', 'audio_url_ru', 'audio_url_en', 'wheelchair_accessible', 'audio_description',
+    'external_id', 'rating_overall', 'rating_interest', 'rating_informativeness', 'rating_convenience',
+    'reviews_count', 'is_active', 'created_at', 'updated_at', 'photo_variants::text', 'open_intervals',
+)
+
+
+def upgrade() -> None:
+    old = ", ".join(f"o.{column}" for column in SERVED_COLUMNS)
+    new = ", ".join(f"n.{column}" for column in SERVED_COLUMNS)
+    # Updates of other columns (rating sums, search vectors, grid cells) leave
+    # every snapshot as it is
+    op.execute(
+        f"""
+        CREATE FUNCTION bump_places_catalog_version_update() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM old_rows o JOIN new_rows n USING (id)
+                WHERE ({old}) IS DISTINCT FROM ({new})
+            ) THEN
+                UPDATE catalog_versions SET version = version + 1 WHERE name = 'places';
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute("DROP TRIGGER places_catalog_version_update ON places")
+    op.execute(
+        "CREATE TRIGGER places_catalog_version_update AFTER UPDATE ON places "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT "
+        "EXECUTE FUNCTION bump_places_catalog_version_update()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER places_catalog_version_update ON places")
+    op.execute(
+        "CREATE TRIGGER places_catalog_version_update AFTER UPDATE ON places "
+        "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT "
+        "EXECUTE FUNCTION bump_catalog_version()"
+    )
+    op.execute("DROP FUNCTION bump_places_catalog_version_update()")
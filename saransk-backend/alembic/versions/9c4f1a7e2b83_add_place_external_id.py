@@ -0,0 +1,27 @@
+"""Add place external id for bulk import upserts
+
+Revision ID: 9c4f1a7e2b83
+Revises: 7a5d3e1f8c62
+Create Date: 2025-09-08 11:27:53.640215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9c4f1a7e2b83'
+down_revision = '7a5d3e1f8c62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('places', sa.Column('external_id', sa.String(length=255), nullable=True))
+    # Plain (non-partial) unique index so INSERT ... ON CONFLICT (external_id) can use it;
+    # places created through the API keep NULL, which never conflicts
+    op.create_index(op.f('ix_places_external_id'), 'places', ['external_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_places_external_id'), table_name='places')
+    op.drop_column('places', 'external_id')
@@ -0,0 +1,47 @@
+"""Add title and tags search vectors to places
+
+Revision ID: 9f3c6a2e7b51
+Revises: 8e4b1c7d2a95
+Create Date: 2025-10-08 10:21:06.893417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '9f3c6a2e7b51'
+down_revision = '8e4b1c7d2a95'
+branch_labels = None
+depends_on = None
+
+# Mirrors TITLE_TAGS_SEARCH_RU_SQL / TITLE_TAGS_SEARCH_EN_SQL in app.models.place
+TITLE_TAGS_SEARCH_RU_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title_ru, '')), 'A') || "
+    "setweight(to_tsvector('russian', places_tags_text(tags::text[])), 'B')"
+)
+TITLE_TAGS_SEARCH_EN_SQL = (
+    "setweight(to_tsvector('english', coalesce(title_en, '')), 'A') || "
+    "setweight(to_tsvector('english', places_tags_text(tags::text[])), 'B')"
+)
+
+
+def upgrade() -> None:
+    # The heaviest weights of search_ru / search_en, small enough to rank
+    # every match of a broad query before the full documents
+    # (app.services.search)
+    op.add_column('places', sa.Column('title_tags_search_ru', postgresql.TSVECTOR(),
+                                      sa.Computed(TITLE_TAGS_SEARCH_RU_SQL, persisted=True)))
+    op.add_column('places', sa.Column('title_tags_search_en', postgresql.TSVECTOR(),
+                                      sa.Computed(TITLE_TAGS_SEARCH_EN_SQL, persisted=True)))
+    op.create_index('ix_places_title_tags_search_ru', 'places', ['title_tags_search_ru'], unique=False,
+                    postgresql_using='gin')
+    op.create_index('ix_places_title_tags_search_en', 'places', ['title_tags_search_en'], unique=False,
+                    postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_places_title_tags_search_en', table_name='places', postgresql_using='gin')
+    op.drop_index('ix_places_title_tags_search_ru', table_name='places', postgresql_using='gin')
+    op.drop_column('places', 'title_tags_search_en')
+    op.drop_column('places', 'title_tags_search_ru')
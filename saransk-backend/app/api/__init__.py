@@ -1,8 +1,20 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from app.core.conditional import get_conditional
+from .media import router as media_router
+from .offline import router as offline_router
 from .places import router as places_router
 from .reviews import router as reviews_router
+from .routes import router as routes_router
+from .sync import router as sync_router
+from .users import router as users_router
 
-api_router = APIRouter(prefix="/api/v1")
+# Every endpoint can answer conditional GETs (see app.core.conditional)
+api_router = APIRouter(prefix="/api/v1", dependencies=[Depends(get_conditional)])
 
 api_router.include_router(places_router, prefix="/places", tags=["places"])
-api_router.include_router(reviews_router, prefix="/reviews", tags=["reviews"])
\ No newline at end of file
+api_router.include_router(reviews_router, prefix="/reviews", tags=["reviews"])
+api_router.include_router(routes_router, prefix="/routes", tags=["routes"])
+api_router.include_router(offline_router, prefix="/offline", tags=["offline"])
+api_router.include_router(sync_router, prefix="/sync", tags=["sync"])
+api_router.include_router(media_router, prefix="/media", tags=["media"])
+api_router.include_router(users_router, prefix="/users", tags=["users"])
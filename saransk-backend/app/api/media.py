@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.db import get_db
+from app.core.ratelimit import RateLimit
+from app.models.media import MediaAsset, MediaStatus
+from app.schemas.media import MediaAssetResponse, MediaUploadRequest, MediaUploadTicket
+from app.services.media import MediaStorage, create_upload, get_media_storage
+from app.services.thumbnails import ThumbnailPipeline, get_thumbnail_pipeline
+
+router = APIRouter()
+
+
+@router.post("/uploads", response_model=MediaUploadTicket, status_code=201,
+             dependencies=[Depends(RateLimit("media_upload"))])
+async def create_media_upload(
+    request: MediaUploadRequest,
+    db: AsyncSession = Depends(get_db),
+    storage: MediaStorage = Depends(get_media_storage),
+):
+    """Issue a presigned PUT for a photo; the client uploads it directly to storage.
+
+    Confirm with ``POST /media/uploads/{id}/complete`` once the PUT succeeds.
+    """
+    # TODO: Add user authentication (reviews) and admin check (places)
+    if request.size > settings.media_upload_max_bytes:
+        raise HTTPException(status_code=413, detail=f"Photos are limited to {settings.media_upload_max_bytes} bytes")
+
+    asset, upload_url = await create_upload(db, storage, request.kind, request.content_type, request.size)
+    await db.commit()
+    return MediaUploadTicket(
+        id=asset.id,
+        url=asset.url,
+        upload_url=upload_url,
+        headers={"Content-Type": request.content_type, "Content-Length": str(request.size)},
+        expires_in=settings.media_upload_expires_seconds,
+    )
+
+
+@router.post("/uploads/{asset_id}/complete", response_model=MediaAssetResponse)
+async def complete_media_upload(
+    asset_id: int,
+    db: AsyncSession = Depends(get_db),
+    storage: MediaStorage = Depends(get_media_storage),
+    pipeline: ThumbnailPipeline = Depends(get_thumbnail_pipeline),
+):
+    """Confirm an upload landed and queue its thumbnails"""
+    asset = await db.get(MediaAsset, asset_id)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if asset.status != MediaStatus.UPLOADING:
+        return asset  # Already confirmed
+
+    size = await storage.size(asset.key)
+    if size is None:
+        raise HTTPException(status_code=409, detail="The file has not been uploaded yet")
+    if size != asset.size:
+        raise HTTPException(status_code=409, detail="Uploaded size does not match the ticket")
+
+    asset.status = MediaStatus.PROCESSING
+    await db.commit()
+    pipeline.submit(asset.id)
+    return asset
+
+
+@router.get("/uploads/{asset_id}", response_model=MediaAssetResponse)
+async def get_media_upload(asset_id: int, db: AsyncSession = Depends(get_db)):
+    """Upload status and, once ready, the resized variants"""
+    asset = await db.get(MediaAsset, asset_id)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return asset
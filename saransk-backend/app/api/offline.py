@@ -0,0 +1,140 @@
+import hashlib
+import re
+from typing import Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from app.core.http import RangeNotSatisfiable, etag_matches, parse_range
+from app.schemas.offline import OfflineLatestResponse
+from app.services.pack_storage import get_pack_storage
+
+router = APIRouter()
+
+PACK_ID = re.compile(r"^v(\d+)(?:-v(\d+))?$")
+# Packs are immutable once published, so clients and proxies may keep them
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# pack_id -> ETag; manifests never change for a given pack id
+_etags: dict = {}
+
+
+def _metadata_name(pack_id: str) -> str:
+    match = PACK_ID.match(pack_id)
+    if not match:
+        raise HTTPException(status_code=404, detail="Pack not found")
+    return f"deltas/{pack_id}.json" if match.group(2) else f"manifests/{pack_id}.json"
+
+
+async def _load_metadata(storage, pack_id: str) -> bytes:
+    data = await storage.read(_metadata_name(pack_id))
+    if data is None:
+        raise HTTPException(status_code=404, detail="Pack not found")
+    return data
+
+
+async def pack_etag(storage, pack_id: str) -> str:
+    """Strong ETag derived from the manifest content hashes of the pack.
+
+    Metadata written before the content hashes existed falls back to a hash
+    of the metadata file itself, which is just as immutable.
+    """
+    etag = _etags.get(pack_id)
+    if etag is None:
+        data = await _load_metadata(storage, pack_id)
+        meta = orjson.loads(data)
+        from_hash, to_hash = meta.get("from_content_hash"), meta.get("to_content_hash")
+        if meta.get("content_hash"):
+            digest = meta["content_hash"]
+        elif from_hash and to_hash:
+            digest = hashlib.sha256(f"{from_hash}:{to_hash}".encode()).hexdigest()
+        else:
+            digest = hashlib.sha256(data).hexdigest()
+        etag = f'"{digest[:40]}"'
+        if len(_etags) > 1024:
+            _etags.clear()
+        _etags[pack_id] = etag
+    return etag
+
+
+@router.get("/latest", response_model=OfflineLatestResponse)
+async def get_latest_pack(
+    since: Optional[int] = Query(None, ge=1, description="Pack version the client already has"),
+    storage=Depends(get_pack_storage),
+):
+    """Latest offline pack version and the archive the client should download"""
+    latest = await storage.read("latest.json")
+    if latest is None:
+        raise HTTPException(status_code=404, detail="No offline pack published")
+    latest = orjson.loads(latest)
+
+    download = latest["pack_id"]
+    if since is not None and since < latest["version"]:
+        delta = f"v{since}-v{latest['version']}"
+        if await storage.size(f"packs/{delta}.tar") is not None:
+            download = delta
+    size = await storage.size(f"packs/{download}.tar")
+    if size is None:
+        raise HTTPException(status_code=404, detail="Pack not found")
+
+    return OfflineLatestResponse(
+        version=latest["version"],
+        pack_id=latest["pack_id"],
+        download_pack_id=download,
+        size=size,
+        etag=await pack_etag(storage, download),
+    )
+
+
+@router.get("/{pack_id}/manifest")
+async def get_pack_manifest(pack_id: str, request: Request, storage=Depends(get_pack_storage)):
+    """Manifest (full pack) or delta manifest, so clients can fetch objects selectively"""
+    etag = await pack_etag(storage, pack_id)
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=await _load_metadata(storage, pack_id), media_type="application/json", headers=headers)
+
+
+@router.api_route("/{pack_id}", methods=["GET", "HEAD"])
+async def download_pack(pack_id: str, request: Request, storage=Depends(get_pack_storage)):
+    """Stream a pack archive with ETag revalidation and single-range resume"""
+    name = f"packs/{pack_id}.tar"
+    etag = await pack_etag(storage, pack_id)
+    size = await storage.size(name)
+    if size is None:
+        raise HTTPException(status_code=404, detail="Pack not found")
+
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": IMMUTABLE,
+        "Content-Disposition": f'attachment; filename="saransk-{pack_id}.tar"',
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    # A stale If-Range means the client's partial copy is outdated: send everything
+    if if_range is None or etag_matches(if_range, etag, weak=False):
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    status = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    if request.method == "HEAD" or size == 0:
+        return Response(status_code=status, headers=headers, media_type="application/x-tar")
+    return StreamingResponse(
+        storage.iter_range(name, start, end),
+        status_code=status,
+        headers=headers,
+        media_type="application/x-tar",
+    )
@@ -1,16 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from datetime import datetime, timezone
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional, Union
+from app.core.cache import PLACE_ITEMS_TAG, PLACES_TAG, ResponseCache, get_cache, place_tag
+from app.core.conditional import Conditional, get_conditional, strong_etag, weak_etag
+from app.core.config import settings
 from app.core.db import get_db
+from app.core.hours import week_minute
+from app.core.images import PhotoSize, get_photo_size
+from app.core.pagination import apply_keyset, check_key, decode_cursor, encode_cursor
+from app.core.ratelimit import RateLimit
 from app.models.place import Place, PlaceCategory, PlaceSubcategory, PriceTier
-from app.schemas.place import PlaceResponse, PlaceListResponse, PlaceCreate, PlaceUpdate
+from app.schemas.place import (
+    PlaceResponse, PlaceListResponse, PlaceCreate, PlaceUpdate, PlaceSort, PlaceNearbyResponse, PlaceImportReport,
+    PlaceSearchResponse, SearchLang, PlaceBatchRequest, PlaceBatchResponse, PlaceView, PlaceProjectionListResponse,
+    PlaceClustersResponse,
+)
+from app.services.clusters import (
+    clusters_payload, map_position, map_state, parse_bbox,
+)
+from app.services.batch import MAX_BATCH_IDS_QUERY, fetch_places, ordered_places
+from app.services.catalog import catalog_cache
+from app.services.importer import import_places, iter_ndjson
+from app.services.invalidation import after_place_write
+from app.services.media import attach_photo_variants
+from app.services.nearby import find_nearby_places
+from app.services.projection import PlaceProjection
+from app.services.search import search_places
 
 router = APIRouter()
 
 
-@router.get("/", response_model=PlaceListResponse)
+def json_response(payload: bytes) -> Response:
+    return Response(content=payload, media_type="application/json")
+
+
+def validator_key(cache: ResponseCache, **filters) -> str:
+    """Cache key of a list validator: the filter set only, so every page shares one aggregate"""
+    return cache.key("places:validator", **filters)
+
+
+async def list_etag(
+    db: AsyncSession, cache: ResponseCache, cache_key: str, filter_key: str, filters: list
+) -> str:
+    """Weak ETag for a place list: count and max(updated_at) over its whole filter set.
+
+    The count catches deletions, which leave max(updated_at) unchanged. The
+    aggregate is cached under ``filter_key`` (see validator_key) with the
+    payload's tag, so it is dropped by the same place writes, and pages,
+    cursors and views of one list reuse it.
+    """
+    async def load() -> bytes:
+        count, latest = (await db.execute(
+            select(func.count(), func.max(Place.updated_at)).where(*filters)
+        )).one()
+        return orjson.dumps([count, latest.isoformat() if latest else None])
+
+    validator = await cache.get_or_set(filter_key, load, tags=[PLACES_TAG])
+    return weak_etag(cache_key, validator.decode())
+
+
+@router.get("/", response_model=Union[PlaceListResponse, PlaceProjectionListResponse])
 async def get_places(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     category: Optional[PlaceCategory] = None,
@@ -18,82 +73,387 @@ async def get_places(
     price_tier: Optional[PriceTier] = None,
     is_commercial: Optional[bool] = None,
     is_active: bool = True,
+    open_now: bool = False,
+    open_at: Optional[datetime] = Query(None, description="Only places open at this time (naive = local time)"),
+    sort: PlaceSort = PlaceSort.ID,
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    with_total: Optional[bool] = Query(None, description="Count matching places (default: page mode only)"),
+    view: PlaceView = Query(PlaceView.FULL, description="compact: list rows, map: map pins, full: PlaceResponse"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return instead of a view's"),
+    lang: Optional[SearchLang] = Query(None, description="Return one language: title, description, address"),
+    cache: ResponseCache = Depends(get_cache),
+    conditional: Conditional = Depends(get_conditional),
+    photo_size: PhotoSize = Depends(get_photo_size),
 ):
-    """Get list of places with filtering and pagination"""
-    query = db.query(Place)
-    
+    """Get list of places with filtering and pagination.
+
+    Page mode (``page``) keeps the original behaviour. Passing ``cursor``
+    switches to keyset pagination, which skips the exact total by default
+    and costs the same for every page regardless of depth.
+
+    ``view``, ``fields`` and ``lang`` return slimmer places: only the
+    selected columns are read, and rows are serialized without PlaceResponse.
+
+    With the catalog snapshot enabled, active places are paged from memory
+    (app.services.catalog) and the snapshot version is the validator.
+    """
+    if with_total is None:
+        with_total = cursor is None
+
+    projection = None
+    if view != PlaceView.FULL or fields or lang is not None:
+        try:
+            projection = PlaceProjection(view, fields, lang, photo_size)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+
+    # Opening hours are compiled to week-minute ranges on write; places with
+    # unknown hours are kept, as the app always treated them as open
+    open_minute = None
+    if open_at is not None or open_now:
+        open_minute = week_minute(open_at or datetime.now(timezone.utc), settings.app_timezone)
+
+    filters = []
     if category:
-        query = query.filter(Place.category == category)
+        filters.append(Place.category == category)
     if subcategory:
-        query = query.filter(Place.subcategory == subcategory)
+        filters.append(Place.subcategory == subcategory)
     if price_tier:
-        query = query.filter(Place.price_tier == price_tier)
+        filters.append(Place.price_tier == price_tier)
     if is_commercial is not None:
-        query = query.filter(Place.is_commercial == is_commercial)
+        filters.append(Place.is_commercial == is_commercial)
     if is_active is not None:
-        query = query.filter(Place.is_active == is_active)
-    
-    total = query.count()
-    places = query.offset((page - 1) * per_page).limit(per_page).all()
-    
-    return PlaceListResponse(
-        places=places,
-        total=total,
-        page=page,
-        per_page=per_page,
-        has_next=page * per_page < total
+        filters.append(Place.is_active == is_active)
+    if open_minute is not None:
+        filters.append(or_(Place.open_intervals.is_(None), Place.open_intervals.contains(open_minute)))
+
+    # The snapshot holds active places only
+    snapshot = catalog_cache.current() if is_active else None
+    cache_key = cache.key(
+        "places", page=page, per_page=per_page, category=category, subcategory=subcategory,
+        price_tier=price_tier, is_commercial=is_commercial, is_active=is_active, sort=sort,
+        cursor=cursor, with_total=with_total, open_minute=open_minute,
+        projection=projection.key if projection else None, **photo_size.params(),
+        # Processes still on an older snapshot must not fill a newer one's entries
+        catalog=snapshot.version if snapshot else None,
+    )
+    if snapshot is not None:
+        conditional.check(weak_etag(cache_key))
+    else:
+        filter_key = validator_key(
+            cache, category=category, subcategory=subcategory, price_tier=price_tier,
+            is_commercial=is_commercial, is_active=is_active, open_minute=open_minute,
+        )
+        conditional.check(await list_etag(db, cache, cache_key, filter_key, filters))
+
+    async def load() -> bytes:
+        if sort == PlaceSort.RATING:
+            columns, descending = [Place.rating_overall, Place.id], True
+        else:
+            columns, descending = [Place.id], False
+
+        key = decode_cursor(cursor, sort.value) if cursor else None
+        offset = (page - 1) * per_page if cursor is None else 0
+        # Fetch one extra row to learn whether another page exists without counting
+        if snapshot is not None:
+            if key is not None:
+                check_key(key, columns)
+            rows, total = snapshot.select(
+                category=category, subcategory=subcategory, price_tier=price_tier, is_commercial=is_commercial,
+                open_minute=open_minute, sort=sort, key=key, offset=offset, limit=per_page + 1,
+                with_total=with_total,
+            )
+        else:
+            total = None
+            if with_total:
+                total = await db.scalar(select(func.count()).select_from(Place).where(*filters))
+
+            query = select(*projection.columns(*columns)) if projection else select(Place)
+            query = apply_keyset(query.where(*filters), columns, key, descending=descending)
+            query = query.offset(offset).limit(per_page + 1)
+            rows = (await db.execute(query)).mappings().all() if projection else (await db.scalars(query)).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+
+        next_cursor = None
+        if has_next:
+            last = rows[-1]
+            key = [last[c.key] for c in columns] if projection else [getattr(last, c.key) for c in columns]
+            next_cursor = encode_cursor(sort.value, key)
+
+        if projection:
+            return orjson.dumps({
+                "places": [projection.project(row) for row in rows],
+                "total": total,
+                "page": page,
+                "per_page": per_page,
+                "has_next": has_next,
+                "next_cursor": next_cursor,
+            })
+        return orjson.dumps(PlaceListResponse.model_validate({
+            "places": rows,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "has_next": has_next,
+            "next_cursor": next_cursor,
+        }, from_attributes=True, context=photo_size.context()).model_dump())
+
+    return json_response(await cache.get_or_set(cache_key, load, tags=[PLACES_TAG]))
+
+
+@router.get("/nearby", response_model=List[PlaceNearbyResponse])
+async def get_nearby_places(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_m: float = Query(1000, gt=0, le=20000),
+    category: Optional[PlaceCategory] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    photo_size: PhotoSize = Depends(get_photo_size),
+):
+    """Get active places around a point, sorted by distance"""
+    hits = await find_nearby_places(db, lat, lng, radius_m, category=category, limit=limit)
+    context = photo_size.context()
+    return [
+        PlaceNearbyResponse(
+            **PlaceResponse.model_validate(place, context=context).model_dump(), distance_m=round(distance, 1)
+        )
+        for place, distance in hits
+    ]
+
+
+@router.get("/search", response_model=List[PlaceSearchResponse])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    lang: SearchLang = SearchLang.RU,
+    category: Optional[PlaceCategory] = None,
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    cache: ResponseCache = Depends(get_cache),
+    conditional: Conditional = Depends(get_conditional),
+    photo_size: PhotoSize = Depends(get_photo_size),
+):
+    """Ranked full-text search over titles, tags, addresses and descriptions.
+
+    The last word is matched as a prefix, for search-as-you-type.
+    """
+    async def load() -> bytes:
+        hits = await search_places(db, q, lang.value, category=category, limit=limit)
+        context = photo_size.context()
+        return orjson.dumps([
+            PlaceSearchResponse(
+                **PlaceResponse.model_validate(place, context=context).model_dump(), rank=round(rank, 4)
+            ).model_dump()
+            for place, rank in hits
+        ])
+
+    cache_key = cache.key(
+        "places:search", q=q.strip().lower(), lang=lang, category=category, limit=limit, **photo_size.params()
     )
+    # Any active place in the category may enter the results
+    filters = [Place.is_active == True] + ([Place.category == category] if category else [])
+    filter_key = validator_key(cache, category=category, is_active=True)
+    conditional.check(await list_etag(db, cache, cache_key, filter_key, filters))
+    return json_response(await cache.get_or_set(cache_key, load, tags=[PLACES_TAG]))
+
+
+async def place_batch(
+    db: AsyncSession, ids: List[int], photo_size: PhotoSize, conditional: Optional[Conditional] = None
+) -> Response:
+    if conditional is not None:
+        # The body is fully determined by the requested ids and each row's updated_at
+        versions = (await db.execute(
+            select(Place.id, Place.updated_at).where(Place.id.in_(set(ids)), Place.is_active == True)
+        )).all()
+        stamps = dict(versions)
+        conditional.check(strong_etag(
+            "places:batch", *photo_size.params().values(), *(f"{i}@{stamps.get(i)}" for i in ids)
+        ))
+    found = await fetch_places(db, ids)
+    places, missing = ordered_places(ids, found, photo_size.context())
+    return json_response(orjson.dumps({"places": places, "missing": missing}))
+
+
+@router.get("/batch", response_model=PlaceBatchResponse)
+async def get_places_batch(
+    ids: str = Query(..., description=f"Comma-separated place ids, at most {MAX_BATCH_IDS_QUERY}"),
+    db: AsyncSession = Depends(get_db),
+    conditional: Conditional = Depends(get_conditional),
+    photo_size: PhotoSize = Depends(get_photo_size),
+):
+    """Get several places at once, in the order given.
+
+    Unknown or inactive ids are listed in ``missing``. Use the POST variant
+    for longer lists.
+    """
+    try:
+        place_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated integers")
+    if not place_ids:
+        raise HTTPException(status_code=422, detail="ids must not be empty")
+    if len(place_ids) > MAX_BATCH_IDS_QUERY:
+        raise HTTPException(
+            status_code=422, detail=f"At most {MAX_BATCH_IDS_QUERY} ids per GET; use POST /places/batch"
+        )
+    return await place_batch(db, place_ids, photo_size, conditional)
+
+
+@router.post("/batch", response_model=PlaceBatchResponse)
+async def post_places_batch(
+    request: PlaceBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    photo_size: PhotoSize = Depends(get_photo_size),
+):
+    """Get several places at once, for id lists too long for a query string"""
+    return await place_batch(db, request.ids, photo_size)
+
+
+@router.get("/clusters", response_model=PlaceClustersResponse)
+async def get_place_clusters(
+    bbox: str = Query(..., description="min_lng,min_lat,max_lng,max_lat"),
+    zoom: int = Query(..., ge=0, le=22, description="Map zoom level (Web Mercator)"),
+    db: AsyncSession = Depends(get_db),
+    cache: ResponseCache = Depends(get_cache),
+    conditional: Conditional = Depends(get_conditional),
+):
+    """Active places in a map viewport, clustered for the zoom level.
+
+    One cluster per occupied cell (half a tile side) of every tile
+    covering ``bbox``, with count, centroid and top categories. From zoom 18
+    on, each place is its own cluster carrying its ``id``.
+    """
+    try:
+        box = parse_bbox(bbox)
+        body, digest = await clusters_payload(db, cache, box, zoom)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    conditional.check(strong_etag("clusters", digest))
+    return json_response(body)
 
 
 @router.get("/{place_id}", response_model=PlaceResponse)
-async def get_place(place_id: int, db: Session = Depends(get_db)):
+async def get_place(
+    place_id: int,
+    db: AsyncSession = Depends(get_db),
+    cache: ResponseCache = Depends(get_cache),
+    conditional: Conditional = Depends(get_conditional),
+    photo_size: PhotoSize = Depends(get_photo_size),
+):
     """Get a specific place by ID"""
-    place = db.query(Place).filter(Place.id == place_id, Place.is_active == True).first()
-    if not place:
+    snapshot = catalog_cache.current()
+    place = snapshot.get(place_id) if snapshot else None
+    if place is not None:
+        # Served from memory; places missing from the snapshot (just created
+        # by another process) fall through to the database
+        conditional.check(
+            strong_etag("place", place_id, place.updated_at.isoformat(), *photo_size.params().values()),
+            last_modified=place.updated_at,
+        )
+        return json_response(
+            orjson.dumps(PlaceResponse.model_validate(place, context=photo_size.context()).model_dump())
+        )
+
+    # Validators come from one primary-key lookup, before the payload is loaded
+    updated_at = await db.scalar(select(Place.updated_at).where(Place.id == place_id, Place.is_active == True))
+    if updated_at is None:
         raise HTTPException(status_code=404, detail="Place not found")
-    return place
+    conditional.check(
+        strong_etag("place", place_id, updated_at.isoformat(), *photo_size.params().values()),
+        last_modified=updated_at,
+    )
+
+    async def load() -> bytes:
+        place = await db.scalar(select(Place).where(Place.id == place_id, Place.is_active == True))
+        if not place:
+            raise HTTPException(status_code=404, detail="Place not found")
+        return orjson.dumps(PlaceResponse.model_validate(place, context=photo_size.context()).model_dump())
 
+    cache_key = cache.key("place", place_id, **photo_size.params())
+    return json_response(await cache.get_or_set(cache_key, load, tags=[place_tag(place_id), PLACE_ITEMS_TAG]))
 
-@router.post("/", response_model=PlaceResponse)
-async def create_place(place_data: PlaceCreate, db: Session = Depends(get_db)):
+
+@router.post("/", response_model=PlaceResponse, dependencies=[Depends(RateLimit("place_write"))])
+async def create_place(
+    place_data: PlaceCreate,
+    db: AsyncSession = Depends(get_db),
+    cache: ResponseCache = Depends(get_cache),
+):
     """Create a new place (admin only)"""
     # TODO: Add admin authentication
     place = Place(**place_data.model_dump())
+    await attach_photo_variants(db, place)
     db.add(place)
-    db.commit()
-    db.refresh(place)
+    await db.commit()
+    await db.refresh(place)
+    await after_place_write(cache, place.id, map_position(place))
     return place
 
 
-@router.put("/{place_id}", response_model=PlaceResponse)
+@router.post("/import", response_model=PlaceImportReport, dependencies=[Depends(RateLimit("place_import"))])
+async def import_places_ndjson(
+    request: Request,
+    batch_size: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db),
+    cache: ResponseCache = Depends(get_cache),
+):
+    """Bulk upsert places from an NDJSON body (admin only).
+
+    One PlaceImport object per line, keyed by ``external_id``. The body is
+    consumed as a stream and written in batches; invalid lines are reported
+    and skipped.
+    """
+    # TODO: Add admin authentication
+    report = await import_places(db, iter_ndjson(request.stream()), batch_size)
+    if report.inserted or report.updated:
+        await after_place_write(cache, None)
+    return report
+
+
+@router.put("/{place_id}", response_model=PlaceResponse, dependencies=[Depends(RateLimit("place_write"))])
 async def update_place(
-    place_id: int, 
-    place_data: PlaceUpdate, 
-    db: Session = Depends(get_db)
+    place_id: int,
+    place_data: PlaceUpdate,
+    db: AsyncSession = Depends(get_db),
+    cache: ResponseCache = Depends(get_cache),
 ):
     """Update a place (admin only)"""
     # TODO: Add admin authentication
-    place = db.query(Place).filter(Place.id == place_id).first()
+    place = await db.get(Place, place_id)
     if not place:
         raise HTTPException(status_code=404, detail="Place not found")
-    
+
+    before, old_position = map_state(place), map_position(place)
     update_data = place_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(place, field, value)
-    
-    db.commit()
-    db.refresh(place)
+    if "photos" in update_data:
+        await attach_photo_variants(db, place)
+
+    await db.commit()
+    await db.refresh(place)
+    moved = [old_position, map_position(place)] if map_state(place) != before else []
+    await after_place_write(cache, place.id, *moved)
     return place
 
 
-@router.delete("/{place_id}")
-async def delete_place(place_id: int, db: Session = Depends(get_db)):
+@router.delete("/{place_id}", dependencies=[Depends(RateLimit("place_write"))])
+async def delete_place(
+    place_id: int,
+    db: AsyncSession = Depends(get_db),
+    cache: ResponseCache = Depends(get_cache),
+):
     """Delete a place (admin only)"""
     # TODO: Add admin authentication
-    place = db.query(Place).filter(Place.id == place_id).first()
+    # Reviews are removed through the ORM cascade, so load them eagerly:
+    # lazy loading is not available on an AsyncSession.
+    place = await db.get(Place, place_id, options=[selectinload(Place.reviews)])
     if not place:
         raise HTTPException(status_code=404, detail="Place not found")
-    
-    db.delete(place)
-    db.commit()
-    return {"message": "Place deleted successfully"}
\ No newline at end of file
+
+    position = map_position(place)
+    await db.delete(place)
+    await db.commit()
+    await after_place_write(cache, place_id, position)
+    return {"message": "Place deleted successfully"}
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from app.core.cache import ResponseCache, get_cache, invalidate_place
+from app.core.conditional import Conditional, get_conditional, weak_etag
 from app.core.db import get_db
+from app.core.ratelimit import RateLimit
+from app.core.pagination import apply_keyset, decode_cursor, encode_cursor
 from app.models.review import Review, ReviewStatus
 from app.models.place import Place
 from app.schemas.review import ReviewResponse, ReviewCreate, ReviewUpdate
+from app.services.moderation import get_moderation_queue, submit_for_moderation
+from app.services.ratings import apply_review_transition
+from app.services.reports import record_report
 
 router = APIRouter()
 
@@ -12,145 +20,175 @@ router = APIRouter()
 @router.get("/place/{place_id}", response_model=List[ReviewResponse])
 async def get_place_reviews(
     place_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     status: ReviewStatus = ReviewStatus.APPROVED,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque X-Next-Cursor from a previous page"),
+    conditional: Conditional = Depends(get_conditional),
 ):
-    """Get reviews for a specific place"""
+    """Get reviews for a specific place, newest first.
+
+    The next page cursor is returned in the ``X-Next-Cursor`` header so the
+    response body stays a plain list for page-based clients.
+    """
     # Check if place exists
-    place = db.query(Place).filter(Place.id == place_id, Place.is_active == True).first()
-    if not place:
+    place_exists = await db.scalar(
+        select(Place.id).where(Place.id == place_id, Place.is_active == True)
+    )
+    if not place_exists:
         raise HTTPException(status_code=404, detail="Place not found")
-    
-    query = db.query(Review).filter(
+
+    # Weak validator over every review in the list; the count catches deletions
+    count, latest = (await db.execute(
+        select(func.count(), func.max(Review.updated_at)).where(Review.place_id == place_id, Review.status == status)
+    )).one()
+    conditional.check(weak_etag("reviews", place_id, status.value, page, per_page, cursor, count, latest))
+
+    query = select(Review).where(
         Review.place_id == place_id,
         Review.status == status
     )
-    
-    reviews = query.offset((page - 1) * per_page).limit(per_page).all()
+
+    key = decode_cursor(cursor, "id") if cursor else None
+    query = apply_keyset(query, [Review.id], key, descending=True)
+    if cursor is None:
+        query = query.offset((page - 1) * per_page)
+
+    result = await db.scalars(query.limit(per_page + 1))
+    reviews = result.all()
+    if len(reviews) > per_page:
+        reviews = reviews[:per_page]
+        response.headers["X-Next-Cursor"] = encode_cursor("id", [reviews[-1].id])
     return reviews
 
 
-@router.post("/", response_model=ReviewResponse)
+@router.post("/", response_model=ReviewResponse, dependencies=[Depends(RateLimit("review_create"))])
 async def create_review(
     review_data: ReviewCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    queue=Depends(get_moderation_queue),
     # TODO: user_id: int = Depends(get_current_user_id)
 ):
     """Create a new review"""
     # TODO: Add user authentication
     user_id = 1  # Temporary placeholder
-    
+
     # Check if place exists
-    place = db.query(Place).filter(Place.id == review_data.place_id, Place.is_active == True).first()
-    if not place:
+    place_exists = await db.scalar(
+        select(Place.id).where(Place.id == review_data.place_id, Place.is_active == True)
+    )
+    if not place_exists:
         raise HTTPException(status_code=404, detail="Place not found")
-    
+
     # TODO: Check if user already reviewed this place
-    
-    # TODO: Add Perspective API moderation
-    toxicity_score = None  # await check_toxicity(review_data.text)
-    
+
     review = Review(
         **review_data.model_dump(),
         user_id=user_id,
         status=ReviewStatus.PENDING,
-        toxicity_score=toxicity_score
     )
-    
+
     db.add(review)
-    db.commit()
-    db.refresh(review)
-    
-    # TODO: Update place ratings
-    # await update_place_ratings(place_id=review_data.place_id, db=db)
-    
+    await db.commit()
+    await db.refresh(review)
+
+    # Scored and settled by the moderation workers; pending reviews do not
+    # count towards place ratings until approved
+    await submit_for_moderation(queue, review.id)
     return review
 
 
-@router.put("/{review_id}", response_model=ReviewResponse)
+@router.put("/{review_id}", response_model=ReviewResponse, dependencies=[Depends(RateLimit("review_update"))])
 async def update_review(
     review_id: int,
     review_data: ReviewUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    queue=Depends(get_moderation_queue),
     # TODO: user_id: int = Depends(get_current_user_id)
 ):
     """Update a review (owner only)"""
     # TODO: Add user authentication
     user_id = 1  # Temporary placeholder
-    
-    review = db.query(Review).filter(Review.id == review_id).first()
+
+    review = await db.get(Review, review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
-    
+
     if review.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to update this review")
-    
+
     if review.status != ReviewStatus.PENDING:
         raise HTTPException(status_code=400, detail="Cannot update approved/rejected review")
-    
+
     update_data = review_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(review, field, value)
-    
-    # TODO: Re-check toxicity if text changed
-    if "text" in update_data:
-        toxicity_score = None  # await check_toxicity(review_data.text)
-        review.toxicity_score = toxicity_score
-        review.status = ReviewStatus.PENDING  # Reset to pending for re-moderation
-    
-    db.commit()
-    db.refresh(review)
+
+    remoderate = "text" in update_data
+    if remoderate:
+        # Unscored pending reviews are what the moderation workers pick up
+        review.toxicity_score = None
+        review.spam_score = None
+        review.moderation_notes = None
+        review.status = ReviewStatus.PENDING
+
+    await db.commit()
+    await db.refresh(review)
+    if remoderate:
+        await submit_for_moderation(queue, review.id)
     return review
 
 
 @router.delete("/{review_id}")
 async def delete_review(
     review_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    cache: ResponseCache = Depends(get_cache),
     # TODO: user_id: int = Depends(get_current_user_id)
 ):
     """Delete a review (owner or admin only)"""
     # TODO: Add user authentication
     user_id = 1  # Temporary placeholder
-    
-    review = db.query(Review).filter(Review.id == review_id).first()
+
+    review = await db.get(Review, review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
-    
+
     if review.user_id != user_id:
         # TODO: Check if user is admin
         raise HTTPException(status_code=403, detail="Not authorized to delete this review")
-    
-    db.delete(review)
-    db.commit()
-    
-    # TODO: Update place ratings
-    # await update_place_ratings(place_id=review.place_id, db=db)
-    
+
+    ratings_changed = await apply_review_transition(db, review, review.status, None)
+    await db.delete(review)
+    await db.commit()
+
+    if ratings_changed:
+        await invalidate_place(cache, review.place_id)
+
     return {"message": "Review deleted successfully"}
 
 
-@router.post("/{review_id}/report")
+@router.post("/{review_id}/report", dependencies=[Depends(RateLimit("review_report"))])
 async def report_review(
     review_id: int,
     reason: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    cache: ResponseCache = Depends(get_cache),
     # TODO: user_id: int = Depends(get_current_user_id)
 ):
-    """Report a review for moderation"""
+    """Report a review for moderation (once per user); hidden after REPORTS_TO_HIDE reports"""
     # TODO: Add user authentication
-    
-    review = db.query(Review).filter(Review.id == review_id).first()
-    if not review:
-        raise HTTPException(status_code=404, detail="Review not found")
-    
-    review.reports_count += 1
-    
-    # Auto-hide if too many reports
-    if review.reports_count >= 3:
-        review.status = ReviewStatus.HIDDEN
-    
-    db.commit()
-    return {"message": "Review reported successfully"}
\ No newline at end of file
+    user_id = 1  # Temporary placeholder
+
+    result = await record_report(db, review_id, user_id, reason)
+    if result is None:
+        if not await db.scalar(select(Review.id).where(Review.id == review_id)):
+            raise HTTPException(status_code=404, detail="Review not found")
+        return {"message": "Review already reported"}
+
+    await db.commit()
+    if result.ratings_changed:
+        await invalidate_place(cache, result.place_id)
+    return {"message": "Review reported successfully"}
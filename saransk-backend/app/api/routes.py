@@ -0,0 +1,175 @@
+from datetime import datetime, timezone
+from typing import List
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.core.conditional import Conditional, get_conditional, strong_etag
+from app.core.config import settings
+from app.core.db import get_db
+from app.core.hours import week_minute
+from app.core.images import PhotoSize, get_photo_size
+from app.core.ratelimit import RateLimit
+from app.models.route import GeneratedRoute, RouteTemplate
+from app.schemas.route import (
+    GeneratedRouteResponse, RouteGenerateRequest, RouteTemplateCreate, RouteTemplateResponse, RouteTemplateUpdate,
+)
+from app.services.routing import describe_route, distance_matrix_cache, plan_route
+
+router = APIRouter()
+
+
+def templates_payload(templates: List[RouteTemplate], photo_size: PhotoSize) -> bytes:
+    context = photo_size.context()
+    return orjson.dumps([
+        RouteTemplateResponse.model_validate(template, context=context).model_dump() for template in templates
+    ])
+
+
+@router.get("/templates", response_model=List[RouteTemplateResponse])
+async def get_route_templates(
+    db: AsyncSession = Depends(get_db),
+    photo_size: PhotoSize = Depends(get_photo_size),
+):
+    """Active curated routes, featured first, with every stop embedded"""
+    templates = (await db.scalars(
+        select(RouteTemplate)
+        .where(RouteTemplate.is_active == True)
+        .order_by(RouteTemplate.is_featured.desc(), RouteTemplate.id)
+    )).all()
+    return Response(content=templates_payload(templates, photo_size), media_type="application/json")
+
+
+@router.get("/templates/{template_id}", response_model=RouteTemplateResponse)
+async def get_route_template(
+    template_id: int,
+    db: AsyncSession = Depends(get_db),
+    conditional: Conditional = Depends(get_conditional),
+    photo_size: PhotoSize = Depends(get_photo_size),
+):
+    """Get a curated route with every stop embedded.
+
+    Stops, legs and the polyline are materialized on the row, so this is one
+    primary-key lookup; updated_at moves whenever a stop's place changes.
+    """
+    template = await db.scalar(
+        select(RouteTemplate).where(RouteTemplate.id == template_id, RouteTemplate.is_active == True)
+    )
+    if not template:
+        raise HTTPException(status_code=404, detail="Route template not found")
+    conditional.check(
+        strong_etag("route_template", template_id, template.updated_at.isoformat(), *photo_size.params().values()),
+        last_modified=template.updated_at,
+    )
+    payload = RouteTemplateResponse.model_validate(template, context=photo_size.context()).model_dump()
+    return Response(content=orjson.dumps(payload), media_type="application/json")
+
+
+@router.post(
+    "/templates",
+    response_model=RouteTemplateResponse,
+    status_code=201,
+    dependencies=[Depends(RateLimit("route_template_write"))],
+)
+async def create_route_template(
+    template_data: RouteTemplateCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Create a curated route (admin only); its stops are materialized on write"""
+    # TODO: Add admin authentication
+    template = RouteTemplate(**template_data.model_dump())
+    db.add(template)
+    await db.commit()
+    # Pick up the columns the materialize trigger filled in
+    await db.refresh(template)
+    return template
+
+
+@router.put(
+    "/templates/{template_id}",
+    response_model=RouteTemplateResponse,
+    dependencies=[Depends(RateLimit("route_template_write"))],
+)
+async def update_route_template(
+    template_id: int,
+    template_data: RouteTemplateUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Update a curated route (admin only); new place_ids are re-materialized"""
+    # TODO: Add admin authentication
+    template = await db.get(RouteTemplate, template_id)
+    if not template:
+        raise HTTPException(status_code=404, detail="Route template not found")
+
+    for field, value in template_data.model_dump(exclude_unset=True).items():
+        setattr(template, field, value)
+    await db.commit()
+    await db.refresh(template)
+    return template
+
+
+@router.delete("/templates/{template_id}", dependencies=[Depends(RateLimit("route_template_write"))])
+async def delete_route_template(template_id: int, db: AsyncSession = Depends(get_db)):
+    """Delete a curated route (admin only)"""
+    # TODO: Add admin authentication
+    template = await db.get(RouteTemplate, template_id)
+    if not template:
+        raise HTTPException(status_code=404, detail="Route template not found")
+
+    await db.delete(template)
+    await db.commit()
+    return {"message": "Route template deleted successfully"}
+
+
+@router.post(
+    "/generate",
+    response_model=GeneratedRouteResponse,
+    status_code=201,
+    dependencies=[Depends(RateLimit("route_generate"))],
+)
+async def generate_route(
+    request: RouteGenerateRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Build a walking route from the start point that fits the time budget.
+
+    Stops are limited to places open when the walk reaches them.
+    """
+    # TODO: Get user_id from JWT token
+    user_id = 1
+    start_at = request.start_at or datetime.now(timezone.utc)
+
+    matrix = await distance_matrix_cache.get(db)
+    # The local search is CPU-bound; keep it off the event loop
+    planned = await run_in_threadpool(
+        plan_route,
+        matrix,
+        request.start_lat,
+        request.start_lng,
+        request.duration_minutes,
+        request.interests,
+        request.max_stops,
+        settings.route_max_candidates,
+        week_minute(start_at, settings.app_timezone),
+    )
+
+    route = GeneratedRoute(
+        user_id=user_id,
+        duration_minutes=round(planned.total_minutes),
+        distance_km=round(planned.distance_m / 1000, 2),
+        place_ids=planned.place_ids,
+        interests=request.interests,
+        constraints={
+            "start_lat": request.start_lat,
+            "start_lng": request.start_lng,
+            "duration_minutes": request.duration_minutes,
+            "max_stops": request.max_stops,
+            "start_at": start_at.isoformat(),
+        },
+        route_data=describe_route(matrix, planned, request.start_lat, request.start_lng),
+    )
+    db.add(route)
+    await db.commit()
+    await db.refresh(route)
+    return route
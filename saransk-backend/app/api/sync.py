@@ -0,0 +1,34 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.core.db import SessionLocal
+from app.services.sync import iter_sync
+
+router = APIRouter()
+
+
+@router.get("")
+async def sync(
+    since: Optional[str] = Query(None, description="Token from the last line of the previous sync; omit for a full sync"),
+):
+    """Places and route templates created, updated or deleted since ``since``, as NDJSON.
+
+    The first line is a header (``full`` is true when the client should
+    replace its catalog), then one line per entity: ``upsert`` with the
+    current ``data`` or a ``delete`` tombstone. The last line carries the
+    token for the next call; a stream without it was cut short and should
+    be retried with the old token.
+    """
+    since_xid = None
+    if since is not None:
+        if not since.isdigit():
+            raise HTTPException(status_code=422, detail="Invalid sync token")
+        since_xid = int(since)
+
+    async def stream():
+        # Own session: the response body outlives the request's dependencies
+        async with SessionLocal() as db:
+            async for chunk in iter_sync(db, since_xid):
+                yield chunk
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -0,0 +1,50 @@
+from typing import Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_db
+from app.core.images import PhotoSize, get_photo_size
+from app.models.user import User
+from app.schemas.user import RecommendationListResponse
+from app.services.recommendations import place_index_cache
+
+router = APIRouter()
+
+
+@router.get("/{user_id}/recommendations", response_model=RecommendationListResponse)
+async def get_recommendations(
+    user_id: int,
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Current position, to favour nearby places"),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    photo_size: PhotoSize = Depends(get_photo_size),
+):
+    """Active places ranked for a user.
+
+    Scores interest match (the user's categories/subcategories), rating,
+    walking distance from ``lat``/``lng`` and popularity. The user's
+    ``preferences`` may restrict candidates: ``wheelchair_accessible: true``
+    and ``price_tiers: [...]``. Places are scored from the in-process index
+    (app.services.recommendations); only the user row is read.
+    """
+    # TODO: Check the JWT subject is user_id
+    if (lat is None) != (lng is None):
+        raise HTTPException(status_code=422, detail="lat and lng go together")
+    user = (await db.execute(
+        select(User.interests, User.preferences).where(User.id == user_id, User.is_active == True)
+    )).one_or_none()
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    interests = [str(i) for i in user.interests or []]
+    index = await place_index_cache.get(db)
+    preferences = user.preferences if isinstance(user.preferences, dict) else {}
+    recommended = index.recommend(interests, preferences, limit, lat, lng)
+    payload = {
+        "user_id": user_id,
+        "interests": interests,
+        "places": [index.item(rec, photo_size) for rec in recommended],
+    }
+    return Response(content=orjson.dumps(payload), media_type="application/json")
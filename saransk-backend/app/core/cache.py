@@ -0,0 +1,216 @@
+import asyncio
+import enum
+import hashlib
+import logging
+import secrets
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from .config import settings
+from .metrics import record_cache
+from .redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[bytes]]
+
+# Deletes the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _normalize(value) -> str:
+    if isinstance(value, enum.Enum):
+        return str(value.value)
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (list, tuple, set)):
+        return ",".join(sorted(_normalize(v) for v in value))
+    return str(value)
+
+
+class ResponseCache:
+    """Read-through cache of serialized JSON payloads in Redis.
+
+    Entries carry tags (Redis sets of keys) so writers can drop every
+    cached variant of a resource at once. Concurrent misses for one key are
+    collapsed: within a process they share one in-flight load, across
+    processes a short Redis lock lets a single worker run the loader while
+    the others poll for its result.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        ttl: int,
+        lock_ttl_ms: int,
+        lock_wait_ms: int,
+        enabled: bool = True,
+        prefix: str = "cache",
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.lock_ttl_ms = lock_ttl_ms
+        self.lock_wait_ms = lock_wait_ms
+        self.enabled = enabled
+        self.prefix = prefix
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._release_lock = client.register_script(_RELEASE_LOCK)
+
+    def key(self, namespace: str, *parts, **params) -> str:
+        """Cache key from an endpoint namespace, path parts and filter params.
+
+        Params are normalized (None dropped, sorted, enums by value) so that
+        equivalent requests share one entry.
+        """
+        key = ":".join([self.prefix, namespace, *(str(p) for p in parts)])
+        normalized = "&".join(
+            f"{name}={_normalize(value)}" for name, value in sorted(params.items()) if value is not None
+        )
+        if normalized:
+            key += ":" + hashlib.sha1(normalized.encode()).hexdigest()[:20]
+        return key
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    async def get_or_set(self, key: str, loader: Loader, tags: Iterable[str] = ()) -> bytes:
+        if not self.enabled:
+            return await loader()
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            record_cache(key, "shared")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            payload = await self._fetch(key, loader, tuple(tags))
+            future.set_result(payload)
+            return payload
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Nobody else may be awaiting it; avoid "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _fetch(self, key: str, loader: Loader, tags) -> bytes:
+        try:
+            cached = await self.client.get(key)
+        except RedisError as exc:
+            logger.warning("cache read failed for %s: %s", key, exc)
+            record_cache(key, "miss")
+            return await loader()
+        if cached is not None:
+            record_cache(key, "hit")
+            return cached
+
+        lock_key = f"{key}:lock"
+        token = secrets.token_hex(8)
+        try:
+            acquired = await self.client.set(lock_key, token, nx=True, px=self.lock_ttl_ms)
+        except RedisError:
+            acquired = False
+
+        if not acquired:
+            # Another process is loading this key; wait briefly for its result
+            waited = 0
+            while waited < self.lock_wait_ms:
+                await asyncio.sleep(0.025)
+                waited += 25
+                try:
+                    cached = await self.client.get(key)
+                except RedisError:
+                    break
+                if cached is not None:
+                    record_cache(key, "shared")
+                    return cached
+            record_cache(key, "miss")
+            return await loader()
+
+        record_cache(key, "miss")
+        try:
+            payload = await loader()
+            await self._store(key, payload, tags)
+            return payload
+        finally:
+            try:
+                await self._release_lock(keys=[lock_key], args=[token])
+            except RedisError:
+                pass
+
+    async def _store(self, key: str, payload: bytes, tags) -> None:
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.set(key, payload, ex=self.ttl)
+                for tag in tags:
+                    tag_key = self._tag_key(tag)
+                    pipe.sadd(tag_key, key)
+                    pipe.expire(tag_key, self.ttl * 2)
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning("cache write failed for %s: %s", key, exc)
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        """Drop every entry stored under any of the tags"""
+        if not self.enabled or not tags:
+            return
+        try:
+            tag_keys = [self._tag_key(tag) for tag in tags]
+            async with self.client.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                members = await pipe.execute()
+            keys = set().union(*members)
+            await self.client.delete(*keys, *tag_keys)
+        except RedisError as exc:
+            logger.warning("cache invalidation failed for %s: %s", tags, exc)
+
+
+response_cache = ResponseCache(
+    redis_client,
+    ttl=settings.cache_ttl_seconds,
+    lock_ttl_ms=settings.cache_lock_ttl_ms,
+    lock_wait_ms=settings.cache_lock_wait_ms,
+    enabled=settings.cache_enabled,
+)
+
+
+def get_cache() -> ResponseCache:
+    return response_cache
+
+
+# Tags for place payloads: list pages, every single-place payload, and one per place
+PLACES_TAG = "places"
+PLACE_ITEMS_TAG = "places:items"
+# Map cluster tiles: all of them, and one per (zoom, x, y) tile
+CLUSTERS_TAG = "clusters"
+
+
+def place_tag(place_id: int) -> str:
+    return f"place:{place_id}"
+
+
+def cluster_tile_tag(zoom: int, x: int, y: int) -> str:
+    return f"clusters:{zoom}:{x}:{y}"
+
+
+async def invalidate_place(cache: ResponseCache, place_id: Optional[int] = None) -> None:
+    """Drop cached payloads affected by a change to one place, or to all places.
+
+    Cluster tiles are only dropped with all places; single-place writers
+    drop the tiles around the place (app.services.clusters.invalidate_cluster_tiles).
+    """
+    if place_id is None:
+        await cache.invalidate_tags(PLACES_TAG, PLACE_ITEMS_TAG, CLUSTERS_TAG)
+    else:
+        await cache.invalidate_tags(PLACES_TAG, place_tag(place_id))
@@ -0,0 +1,124 @@
+"""Conditional GET for API resources (ETag / Last-Modified, 304 Not Modified).
+
+Every API router gets a per-request Conditional through a router-level
+dependency (see app.api). Endpoints that can compute a cheap validator (an
+``updated_at``, or max(updated_at) and count for a filter set) call
+``check()`` before loading the representation: a matching If-None-Match,
+or If-Modified-Since when no If-None-Match was sent, ends the request with
+304. Otherwise ConditionalMiddleware stamps the validators on the 2xx
+response, whichever response class the endpoint returned.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .http import etag_matches
+
+# Bump when response schemas change so clients do not keep old shapes
+ETAG_VERSION = "2"
+# Clients may store responses but must revalidate before reuse
+REVALIDATE = "no-cache"
+
+
+def _digest(parts) -> str:
+    raw = ":".join([ETAG_VERSION, *(str(p) for p in parts)])
+    return hashlib.sha1(raw.encode()).hexdigest()[:32]
+
+
+def strong_etag(*parts) -> str:
+    """Strong validator for a representation fully determined by ``parts``"""
+    return f'"{_digest(parts)}"'
+
+
+def weak_etag(*parts) -> str:
+    """Weak validator: semantically equivalent representations share it"""
+    return f'W/"{_digest(parts)}"'
+
+
+def http_date(moment: datetime) -> str:
+    # updated_at columns hold naive UTC
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class Conditional:
+    """Validators for the current request and the preconditions it carries"""
+
+    def __init__(self, request: Request):
+        self.enabled = request.method in ("GET", "HEAD")
+        self.if_none_match = request.headers.get("if-none-match")
+        self.if_modified_since = request.headers.get("if-modified-since")
+        self.headers: Dict[str, str] = {}
+
+    def check(self, etag: str, last_modified: Optional[datetime] = None) -> None:
+        """Record the validators; raise a 304 if the client's copy is current.
+
+        ``last_modified`` should only be given when every change to the
+        representation moves it forward (not for lists, where deleted rows
+        leave max(updated_at) as it was).
+        """
+        self.headers["ETag"] = etag
+        self.headers["Cache-Control"] = REVALIDATE
+        if last_modified is not None:
+            self.headers["Last-Modified"] = http_date(last_modified)
+        if not self.enabled:
+            return
+
+        if self.if_none_match is not None:
+            # RFC 9110: If-Modified-Since is ignored when If-None-Match is present
+            fresh = etag_matches(self.if_none_match, etag, weak=True)
+        elif self.if_modified_since and last_modified is not None:
+            since = _parse_http_date(self.if_modified_since)
+            modified = last_modified if last_modified.tzinfo else last_modified.replace(tzinfo=timezone.utc)
+            fresh = since is not None and modified.replace(microsecond=0) <= since
+        else:
+            fresh = False
+        if fresh:
+            raise HTTPException(status_code=304, headers=self.headers)
+
+
+def get_conditional(request: Request) -> Conditional:
+    """Per-request Conditional, shared by the router dependency and the endpoint"""
+    conditional = getattr(request.state, "conditional", None)
+    if conditional is None:
+        conditional = request.state.conditional = Conditional(request)
+    return conditional
+
+
+class ConditionalMiddleware:
+    """Adds the validators recorded by Conditional.check() to successful GET responses"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and 200 <= message["status"] < 300:
+                conditional = scope.get("state", {}).get("conditional")
+                if conditional is not None and conditional.headers:
+                    headers = MutableHeaders(scope=message)
+                    for name, value in conditional.headers.items():
+                        # Endpoints with their own validators (offline packs) win
+                        if name not in headers:
+                            headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
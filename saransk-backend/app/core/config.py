@@ -8,9 +8,44 @@ class Settings(BaseSettings):
     app_name: str = "SaranskAPI"
     app_host: str = "0.0.0.0"
     app_port: int = 8000
+    app_timezone: str = "Europe/Moscow"  # Local time for opening hours
 
     database_url: str
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_echo: bool = False
+
     redis_url: str = "redis://localhost:6379/0"
+    redis_socket_timeout: float = 0.5
+
+    cache_enabled: bool = True
+    cache_ttl_seconds: int = 300
+    cache_lock_ttl_ms: int = 5000
+    cache_lock_wait_ms: int = 2000
+
+    metrics_enabled: bool = True  # Per-request metrics and GET /metrics
+    log_format: str = "console"  # structlog renderer: "console" or "json"
+    slow_request_ms: float = 500.0  # Log requests slower than this with their SQL
+    slow_request_max_statements: int = 10  # Slowest statements kept per slow-request log
+
+    rate_limit_enabled: bool = True
+    rate_limit_redis_retry_seconds: float = 5.0  # In-process buckets meanwhile after a Redis failure
+
+    route_matrix_max_age_seconds: int = 600
+    route_max_candidates: int = 150
+
+    recommendations_refresh_seconds: float = 5.0  # Catch up with other workers' place and rating changes
+    recommendations_rebuild_seconds: int = 3600  # Full index rebuild, dropping deactivated places
+
+    catalog_snapshot_enabled: bool = False  # Serve place reads from an in-process snapshot
+    catalog_snapshot_poll_seconds: float = 2.0  # Version check interval (other processes' writes)
+
+    offline_dir: str = "var/offline"
+    offline_media_root: str = ".."  # Repository root holding images/ and audio/
+    offline_storage: str = "local"  # "local" (OFFLINE_DIR) or "s3"
+    offline_s3_prefix: str = "offline/"
 
     jwt_secret: str
     jwt_alg: str = "HS256"
@@ -21,9 +56,25 @@ class Settings(BaseSettings):
     s3_bucket: str
     s3_access_key: str
     s3_secret_key: str
+    s3_public_url: str | None = None  # Public base for object URLs; defaults to S3_ENDPOINT/S3_BUCKET
+
+    media_prefix: str = "media/"
+    media_upload_max_bytes: int = 20 * 1024 * 1024
+    media_upload_expires_seconds: int = 900  # Lifetime of presigned PUT URLs
+    media_thumbnail_widths: list[int] = [160, 320, 640, 1280]  # Env: JSON list, e.g. [160,320]
+    media_thumbnail_workers: int = 2  # Thumbnail process pool size; 0 disables the in-process pipeline
+    media_thumbnail_claim_seconds: int = 600  # A claimed asset is retried by others after this
 
     perspective_api_key: str | None = None
 
+    moderation_queue: str = "redis"  # "redis" or "local" (in-process, single API process only)
+    moderation_scorer: str = "heuristic"  # or "perspective" (needs PERSPECTIVE_API_KEY)
+    moderation_workers: int = 2  # In-process workers; 0 when scripts/moderation_worker.py runs them
+    moderation_batch_size: int = 20
+    moderation_enqueue_timeout_ms: int = 50  # Latency budget for the enqueue in review POST/PUT
+    moderation_approve_below: float = 0.3  # Auto-approve when toxicity and spam are both below
+    moderation_reject_above: float = 0.8  # Auto-reject when either reaches this; else a human decides
+
 
 settings = Settings()  # type: ignore[call-arg]
 
@@ -0,0 +1,88 @@
+import math
+from typing import List, Tuple
+
+EARTH_RADIUS_M = 6371008.8
+
+# Places are bucketed into a fixed lat/lng grid so that "near me" lookups
+# become a handful of B-tree range scans on places.grid_cell. At Saransk's
+# latitude a cell is roughly 1.1 km x 0.65 km.
+CELL_DEG = 0.01
+GRID_COLS = int(round(360 / CELL_DEG))
+
+
+def grid_cell(lat: float, lng: float) -> int:
+    """Grid cell id for a coordinate (row-major, rows by latitude).
+
+    Must stay in sync with the SQL backfill in the grid_cell migration.
+    """
+    row = math.floor((lat + 90.0) / CELL_DEG)
+    col = min(math.floor((lng + 180.0) / CELL_DEG), GRID_COLS - 1)
+    return row * GRID_COLS + col
+
+
+# Web Mercator (slippy map) tiles, for map clusters. Must stay in sync with
+# the tile_x/tile_y SQL functions in the place_clusters migration.
+MAX_MERCATOR_LAT = 85.0511287798
+
+
+def tile_xy(lat: float, lng: float, level: int) -> Tuple[int, int]:
+    """Column and row of the tile containing a coordinate at a zoom level"""
+    n = 1 << level
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat))
+    rad = math.radians(lat)
+    x = math.floor((lng + 180.0) / 360.0 * n)
+    y = math.floor((1.0 - math.log(math.tan(rad) + 1.0 / math.cos(rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(x: int, y: int, level: int) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lng, max_lng) of a tile"""
+    n = 1 << level
+
+    def lat(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return lat(y + 1), lat(y), x / n * 360.0 - 180.0, (x + 1) / n * 360.0 - 180.0
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in meters"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lng: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a circle, clamped to valid ranges"""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    coslat = math.cos(math.radians(lat))
+    dlng = 180.0 if coslat < 1e-6 else min(180.0, dlat / coslat)
+    return (
+        max(-90.0, lat - dlat),
+        min(90.0, lat + dlat),
+        max(-180.0, lng - dlng),
+        min(180.0, lng + dlng),
+    )
+
+
+def cell_ranges(lat: float, lng: float, radius_m: float) -> List[Tuple[int, int]]:
+    """Inclusive grid_cell ranges covering the bounding box of a circle"""
+    return box_cell_ranges(*bounding_box(lat, lng, radius_m))
+
+
+def box_cell_ranges(min_lat: float, max_lat: float, min_lng: float, max_lng: float) -> List[Tuple[int, int]]:
+    """Inclusive grid_cell ranges covering a box.
+
+    Cells of one grid row are consecutive integers, so the box maps to one
+    contiguous range per row.
+    """
+    first = grid_cell(min_lat, min_lng)
+    last = grid_cell(max_lat, max_lng)
+    first_row, first_col = divmod(first, GRID_COLS)
+    last_row, last_col = divmod(last, GRID_COLS)
+    return [
+        (row * GRID_COLS + first_col, row * GRID_COLS + last_col)
+        for row in range(first_row, last_row + 1)
+    ]
@@ -0,0 +1,197 @@
+"""Opening hours compiled into week-minute intervals.
+
+A week is minutes 0..10079 starting Monday 00:00 local time. Schedules are
+sorted, merged half-open ``(start, end)`` intervals; a range crossing
+midnight spills into the next day and Sunday night wraps to Monday.
+``None`` means the hours are unknown (missing or unparseable), which
+callers treat as open, like the old ``isPOIOpen``.
+"""
+import json
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+DAY_MIN = 24 * 60
+WEEK_MIN = 7 * DAY_MIN
+DAYS = ("mo", "tu", "we", "th", "fr", "sa", "su")
+
+Intervals = List[Tuple[int, int]]
+
+_ALIASES = [
+    (r"понедельник|пн", "mo"), (r"вторник|вт", "tu"), (r"среда|ср", "we"), (r"четверг|чт", "th"),
+    (r"пятница|пт", "fr"), (r"суббота|сб", "sa"), (r"воскресенье|вс", "su"),
+    (r"monday|mon", "mo"), (r"tuesday|tue", "tu"), (r"wednesday|wed", "we"), (r"thursday|thu", "th"),
+    (r"friday|fri", "fr"), (r"saturday|sat", "sa"), (r"sunday|sun", "su"),
+    (r"ежедневно|каждый день|daily|every day", "mo-su"),
+    (r"обеденный перерыв|перерыв на обед|перерыв|обед|lunch break|lunch|break", "break"),
+    (r"выходные дни|выходной|выходные|закрыто|closed|off", "off"),
+]
+_DAY = r"(?:mo|tu|we|th|fr|sa|su)"
+_TIME = r"\d{1,2}[:.]\d{2}\s*-\s*\d{1,2}[:.]\d{2}"
+_RULE = re.compile(
+    rf"(?P<pause>break\s*:?\s*)?(?P<days>{_DAY}(?:\s*-\s*{_DAY})?(?:\s*,\s*{_DAY}(?:\s*-\s*{_DAY})?)*)?\s*:?\s*"
+    rf"(?P<times>{_TIME}(?:\s*,\s*{_TIME})*|off)"
+)
+
+
+def _normalize(text: str) -> str:
+    text = text.lower().replace("–", "-").replace("—", "-")
+    # "с 9:00 до 18:00" -> "9:00-18:00"
+    text = re.sub(r"(?<![a-zа-яё])с\s+(?=\d)", "", text).replace(" до ", "-")
+    for pattern, replacement in _ALIASES:
+        text = re.sub(rf"(?<![a-zа-яё]){pattern}(?![a-zа-яё])", replacement, text)
+    # "пн - выходной" -> "mo off"
+    return re.sub(r"-\s*off", " off", text)
+
+
+def _expand_days(spec: Optional[str]) -> List[int]:
+    if not spec:
+        return list(range(7))
+    days: List[int] = []
+    for part in spec.replace(" ", "").split(","):
+        if "-" in part:
+            first, last = (DAYS.index(d) for d in part.split("-"))
+            days.extend(DAYS.index(DAYS[(first + i) % 7]) for i in range((last - first) % 7 + 1))
+        else:
+            days.append(DAYS.index(part))
+    return days
+
+
+def _minutes(value: str) -> int:
+    hours, minutes = re.split(r"[:.]", value.strip())
+    hours, minutes = int(hours), int(minutes)
+    if hours > 24 or minutes > 59:
+        raise ValueError(f"invalid time {value!r}")
+    return hours * 60 + minutes
+
+
+def _day_ranges(times: str) -> List[Tuple[int, int]]:
+    ranges = []
+    for chunk in times.split(","):
+        start, end = (_minutes(v) for v in chunk.split("-"))
+        if end <= start:
+            end += DAY_MIN  # Past midnight
+        ranges.append((start, min(end, 2 * DAY_MIN)))
+    return ranges
+
+
+def _subtract(ranges: List[Tuple[int, int]], cuts: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    for cut_start, cut_end in cuts:
+        kept = []
+        for start, end in ranges:
+            if cut_end <= start or cut_start >= end:
+                kept.append((start, end))
+                continue
+            if start < cut_start:
+                kept.append((start, cut_start))
+            if cut_end < end:
+                kept.append((cut_end, end))
+        ranges = kept
+    return ranges
+
+
+def _from_json(text: str) -> Optional[Dict[int, List[Tuple[int, int]]]]:
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    week: Dict[int, List[Tuple[int, int]]] = {}
+    for key, value in data.items():
+        # An unknown day or an unreadable time drops that entry only
+        try:
+            days = _expand_days(_normalize(str(key)).strip())
+            values = value if isinstance(value, list) else [value]
+            ranges = []
+            for item in values:
+                item = _normalize(str(item or "off")).strip()
+                if item != "off":
+                    ranges.extend(_day_ranges(item))
+        except ValueError:
+            continue
+        for day in days:
+            week[day] = ranges
+    return week or None
+
+
+def _merge(intervals: Intervals) -> Intervals:
+    merged: Intervals = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def parse_hours(text: Optional[str]) -> Optional[Intervals]:
+    """Compile opening hours text into week-minute intervals.
+
+    Accepts OSM-style rules ("Mo-Fr 09:00-18:00; Sa 10:00-16:00", "24/7"),
+    the Russian phrasing used in content/ ("Вт–Вс 10:00–18:00, Пн — выходной",
+    "ежедневно 08:00–20:00") and a JSON object of day -> "HH:MM-HH:MM".
+    Later rules override earlier ones for the days they name. Breaks
+    ("обед 13:00-14:00") are cut out of the days named so far; other times
+    without days only count when they come first ("10:00-18:00" = daily).
+    Rules that cannot be read are skipped.
+    """
+    if not text or not text.strip():
+        return None
+    raw = text.strip()
+    if raw.startswith("{"):
+        week = _from_json(raw)
+    else:
+        normalized = _normalize(raw)
+        if re.search(r"24\s*/\s*7|круглосуточно", normalized):
+            return [(0, WEEK_MIN)]
+        week = {}
+        for rule in _RULE.finditer(normalized):
+            if rule["pause"] and rule["times"] == "off":
+                continue
+            if not rule["pause"] and not rule["days"] and week:
+                continue
+            try:
+                ranges = [] if rule["times"] == "off" else _day_ranges(rule["times"])
+                days = _expand_days(rule["days"]) if rule["days"] or not rule["pause"] else list(week)
+            except ValueError:
+                continue
+            for day in days:
+                week[day] = _subtract(week.get(day, []), ranges) if rule["pause"] else ranges
+        if not week:
+            week = None
+    if week is None:
+        return None
+
+    intervals: Intervals = []
+    for day, ranges in week.items():
+        for start, end in ranges:
+            start, end = day * DAY_MIN + start, day * DAY_MIN + end
+            if end > WEEK_MIN:
+                intervals.append((0, end - WEEK_MIN))  # Sunday night into Monday
+                end = WEEK_MIN
+            intervals.append((start, end))
+    return _merge(intervals)
+
+
+def week_minute(moment: datetime, tz: str) -> int:
+    """Minute of the local week (Monday 00:00 = 0) for an aware or local-naive datetime"""
+    local = moment.astimezone(ZoneInfo(tz)) if moment.tzinfo else moment
+    return local.weekday() * DAY_MIN + local.hour * 60 + local.minute
+
+
+def is_open_for(intervals: Optional[Intervals], minute: float, duration: float = 0.0) -> bool:
+    """Whether a place stays open from ``minute`` for ``duration`` minutes (unknown hours count as open)"""
+    if intervals is None:
+        return True
+    minute %= WEEK_MIN
+    for start, end in intervals:
+        if start <= minute < end:
+            if minute + duration <= end:
+                return True
+            # A visit running past Sunday midnight continues in the Monday interval
+            first_start, first_end = intervals[0]
+            return end == WEEK_MIN and first_start == 0 and minute + duration - WEEK_MIN <= first_end
+    return False
+
@@ -0,0 +1,57 @@
+import re
+from typing import Optional, Tuple
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) byte range for a ``Range`` header, or None for the whole body.
+
+    Only single ranges are served; multi-range and malformed headers fall
+    back to the full body, which RFC 9110 allows. Raises
+    RangeNotSatisfiable when the range lies outside the resource.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip().replace(" ", ""))
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or (last and int(last) < start):
+            raise RangeNotSatisfiable()
+    else:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        start, end = max(size - length, 0), size - 1
+    return start, end
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """Whether an If-None-Match / If-Range value matches ``etag``.
+
+    ``weak`` selects weak comparison (If-None-Match); If-Range requires
+    strong comparison, where W/ tags never match.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == target and (weak or not etag.startswith("W/")):
+            return True
+    return False
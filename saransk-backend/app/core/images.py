@@ -0,0 +1,110 @@
+"""Picking photo variants for the client's screen.
+
+Uploaded photos are resized into MEDIA_THUMBNAIL_WIDTHS (see
+app.services.thumbnails); a place keeps the variant URLs per original in
+``photo_variants``: ``{original_url: {"320": {"webp": url, "jpeg": url}}}``.
+Read endpoints take the size the client displays photos at (CSS pixels
+times device pixel ratio) and return, per photo, the smallest variant that
+covers it.
+"""
+import enum
+import io
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Query
+
+from .config import settings
+
+
+class PhotoFormat(str, enum.Enum):
+    WEBP = "webp"
+    JPEG = "jpeg"
+
+
+@dataclass(frozen=True)
+class PhotoSize:
+    width_px: int  # Device pixels, already snapped to a variant width
+    format: PhotoFormat = PhotoFormat.WEBP
+
+    def params(self) -> dict:
+        """Cache key / ETag parts: requests that pick the same variants share them"""
+        return {"photo_px": self.width_px, "photo_format": self.format}
+
+    def context(self) -> dict:
+        return {"photo_size": self}
+
+
+def snap_width(width_px: int) -> int:
+    """Smallest configured variant width covering ``width_px`` (the largest if none does)"""
+    widths = sorted(settings.media_thumbnail_widths)
+    return next((w for w in widths if w >= width_px), widths[-1])
+
+
+# Map pins and list rows: 160 CSS px on a 2x screen
+DEFAULT_PHOTO_SIZE = PhotoSize(snap_width(320))
+
+
+def pick_variant(variants: Optional[Dict[str, Dict[str, str]]], size: PhotoSize) -> Optional[str]:
+    """URL of the smallest variant at least ``size.width_px`` wide, else the largest one"""
+    if not variants:
+        return None
+    widths = sorted(int(w) for w in variants)
+    width = next((w for w in widths if w >= size.width_px), widths[-1])
+    formats = variants[str(width)]
+    return formats.get(size.format.value) or next(iter(formats.values()), None)
+
+
+def get_photo_size(
+    dpr: float = Query(2.0, ge=1, le=4, description="Device pixel ratio of the client screen"),
+    photo_width: int = Query(160, ge=32, le=2048, description="Width photos are displayed at, in CSS px"),
+    photo_format: PhotoFormat = PhotoFormat.WEBP,
+) -> PhotoSize:
+    return PhotoSize(snap_width(math.ceil(photo_width * dpr)), photo_format)
+
+
+# Refuse images that would decompress into more pixels than this (Pillow raises above 2x)
+MAX_IMAGE_PIXELS = 40_000_000
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+Rendered = Tuple[int, PhotoFormat, bytes]
+
+
+def render_variants(data: bytes, widths: Sequence[int]) -> Tuple[int, int, List[Rendered]]:
+    """Resize an uploaded photo to ``widths`` in WebP and JPEG.
+
+    CPU-bound; runs in the thumbnail process pool. Widths at or above the
+    original collapse into one variant at the original width (never
+    upscaled). EXIF orientation is applied and metadata is not copied.
+    Returns the original size and (width, format, bytes) per variant.
+    """
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+    width, height = image.size
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+    targets = sorted({min(w, width) for w in widths})
+    rendered: List[Rendered] = []
+    for target in targets:
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.LANCZOS, reducing_gap=3.0
+        )
+        webp = io.BytesIO()
+        resized.save(webp, "WEBP", quality=WEBP_QUALITY, method=4)
+        rendered.append((target, PhotoFormat.WEBP, webp.getvalue()))
+
+        if resized.mode == "RGBA":
+            flat = Image.new("RGB", resized.size, (255, 255, 255))
+            flat.paste(resized, mask=resized.getchannel("A"))
+            resized = flat
+        jpeg = io.BytesIO()
+        resized.save(jpeg, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        rendered.append((target, PhotoFormat.JPEG, jpeg.getvalue()))
+    return width, height, rendered
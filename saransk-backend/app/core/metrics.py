@@ -0,0 +1,237 @@
+"""Request metrics in Prometheus format and structured slow-request logs.
+
+MetricsMiddleware opens a RequestStats for every HTTP request in a context
+variable. SQLAlchemy cursor events (instrument_engine) and ResponseCache
+(record_cache) add the queries and cache lookups made on the request's
+behalf, so one request yields its latency, response size, query count and
+time, and cache hits per route template. Requests slower than
+SLOW_REQUEST_MS are logged through structlog with their slowest statements.
+
+GET /metrics renders the default registry, or the aggregate of every
+worker process when PROMETHEUS_MULTIPROC_DIR is set.
+"""
+import heapq
+import itertools
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import structlog
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+logger = structlog.get_logger("app.requests")
+
+# Longer statements are cut in slow-request logs
+MAX_STATEMENT_CHARS = 2000
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size by route template",
+    ["method", "route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100, 250),
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed, inside requests or not")
+DB_TIME = Counter("db_query_seconds_total", "Time spent in SQL statements, inside requests or not")
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Response cache lookups by namespace; hit ratio is rate(result=hit) / rate(all)",
+    ["namespace", "result"],
+)
+
+
+@dataclass
+class RequestStats:
+    """What one request did; filled in by the hooks below while it runs"""
+
+    queries: int = 0
+    db_seconds: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # Min-heap of the slowest (seconds, seq, statement), at most SLOW_REQUEST_MAX_STATEMENTS
+    statements: List[Tuple[float, int, str]] = field(default_factory=list)
+
+    def add_query(self, seconds: float, statement: str, seq: int) -> None:
+        self.queries += 1
+        self.db_seconds += seconds
+        item = (seconds, seq, statement)
+        if len(self.statements) < settings.slow_request_max_statements:
+            heapq.heappush(self.statements, item)
+        elif self.statements and seconds > self.statements[0][0]:
+            heapq.heapreplace(self.statements, item)
+
+    def slowest(self) -> List[dict]:
+        return [
+            {"ms": round(seconds * 1000, 2), "sql": " ".join(statement.split())[:MAX_STATEMENT_CHARS]}
+            for seconds, _, statement in sorted(self.statements, reverse=True)
+        ]
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+_statement_seq = itertools.count()
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    DB_QUERIES.inc()
+    DB_TIME.inc(seconds)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.add_query(seconds, statement, next(_statement_seq))
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Count and time every statement run through ``engine``"""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def record_cache(key: str, result: str) -> None:
+    """Count a response cache lookup: ``hit``, ``miss`` (loader ran) or ``shared`` (another load's result)"""
+    parts = key.split(":", 2)
+    CACHE_LOOKUPS.labels(parts[1] if len(parts) > 1 else key, result).inc()
+    stats = _request_stats.get()
+    if stats is not None:
+        if result == "miss":
+            stats.cache_misses += 1
+        else:
+            stats.cache_hits += 1
+
+
+def _route_template(scope: Scope) -> str:
+    # The router stores the matched route in the scope; paths of unmatched requests
+    # would give every 404 its own series
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Times each HTTP request and records its response size, SQL and cache use"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+        size = 0
+
+        async def send_counting(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_counting)
+        finally:
+            duration = time.perf_counter() - started
+            _request_stats.reset(token)
+            self._observe(scope, stats, status, size, duration)
+
+    @staticmethod
+    def _observe(scope: Scope, stats: RequestStats, status: int, size: int, duration: float) -> None:
+        method = scope["method"]
+        route = _route_template(scope)
+        REQUEST_LATENCY.labels(method, route, f"{status // 100}xx").observe(duration)
+        RESPONSE_SIZE.labels(method, route).observe(size)
+        REQUEST_QUERIES.labels(method, route).observe(stats.queries)
+        REQUEST_DB_TIME.labels(method, route).observe(stats.db_seconds)
+
+        duration_ms = duration * 1000
+        if duration_ms >= settings.slow_request_ms:
+            query = scope.get("query_string", b"").decode("latin-1")
+            logger.warning(
+                "slow_request",
+                method=method,
+                path=scope["path"] + (f"?{query}" if query else ""),
+                route=route,
+                status=status,
+                duration_ms=round(duration_ms, 1),
+                db_queries=stats.queries,
+                db_ms=round(stats.db_seconds * 1000, 1),
+                cache_hits=stats.cache_hits,
+                cache_misses=stats.cache_misses,
+                response_bytes=size,
+                sql=stats.slowest(),
+            )
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus exposition of this process, or of all workers in multiprocess mode"""
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def configure_logging(log_format: Optional[str] = None) -> None:
+    """structlog output: key=value lines for development, JSON lines for log shipping"""
+    renderer = (
+        structlog.processors.JSONRenderer()
+        if (log_format or settings.log_format) == "json"
+        else structlog.dev.ConsoleRenderer(colors=False)
+    )
+    structlog.configure(
+        processors=[
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            renderer,
+        ],
+        cache_logger_on_first_use=True,
+    )
@@ -0,0 +1,56 @@
+import base64
+import binascii
+from typing import Any, List, Optional
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+
+
+def encode_cursor(sort: str, key: List[Any]) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor"""
+    raw = orjson.dumps({"s": sort, "k": key})
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor for the given sort order"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = orjson.loads(base64.urlsafe_b64decode(padded))
+        key = data["k"]
+        cursor_sort = data["s"]
+    except (binascii.Error, orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort or not isinstance(key, list):
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+    return key
+
+
+def check_key(key: List[Any], columns) -> None:
+    """Reject a decoded key that does not fit the sort columns (forged or stale cursors)"""
+    if len(key) != len(columns):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    for value, column in zip(key, columns):
+        expected = column.type.python_type
+        # JSON has no separate float type for whole numbers; bool is an int subclass
+        allowed = (int, float) if expected is float else (expected,)
+        if isinstance(value, bool) or not isinstance(value, allowed):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(query: Select, columns, key: Optional[List[Any]], descending: bool = False) -> Select:
+    """Order by the given columns and start right after the row identified by key.
+
+    The last column must be unique (normally the primary key) so that the
+    order is total and no row is skipped or repeated between pages. The
+    columns must be NOT NULL: row comparisons never match a NULL.
+    """
+    if key is not None:
+        check_key(key, columns)
+        # Row-value comparison lets Postgres seek straight into a matching
+        # composite B-tree index instead of skipping rows like OFFSET does.
+        row, bound = tuple_(*columns), tuple_(*key)
+        query = query.where(row < bound if descending else row > bound)
+    order = [c.desc() for c in columns] if descending else [c.asc() for c in columns]
+    return query.order_by(*order)
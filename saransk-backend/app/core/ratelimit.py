@@ -0,0 +1,189 @@
+"""Per-client rate limiting for write endpoints (token buckets in Redis).
+
+Each policy is a bucket of ``burst`` tokens refilled at ``limit`` per
+``period`` seconds; a request takes one token or is answered with 429 and
+a Retry-After of the time until the next token. The check is one EVALSHA
+round trip: the Lua script refills, takes and stores the bucket atomically
+using the Redis clock, so every API process shares one view of it.
+
+When Redis is unreachable the limiter falls back to the same buckets in
+process memory (limits then hold per process rather than globally) and
+retries Redis after ``RATE_LIMIT_REDIS_RETRY_SECONDS``, so an outage does
+not add a socket timeout to every write.
+"""
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import redis.asyncio as redis
+from fastapi import HTTPException, Request, Response
+from redis.exceptions import RedisError
+
+from .config import settings
+from .redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] bucket; ARGV: burst, tokens per ms, cost. Returns {allowed, tokens left, retry after ms}
+_TAKE_TOKEN = """
+local burst = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil then
+    tokens = burst
+else
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+end
+
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = math.ceil((cost - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 1000)
+return {allowed, math.floor(tokens), retry}
+"""
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    name: str
+    limit: int  # Tokens refilled per period
+    period: float  # Seconds
+    burst: Optional[int] = None  # Bucket size; defaults to limit
+
+    @property
+    def capacity(self) -> int:
+        return self.burst or self.limit
+
+    @property
+    def rate_per_ms(self) -> float:
+        return self.limit / (self.period * 1000)
+
+
+DAY = 24 * 3600
+
+# Review quotas follow the Firebase checkSpamQuota (10 reviews a day per user)
+POLICIES: Dict[str, RatePolicy] = {
+    policy.name: policy for policy in (
+        RatePolicy("review_create", limit=10, period=DAY),
+        RatePolicy("review_update", limit=30, period=3600, burst=10),
+        RatePolicy("review_report", limit=20, period=3600, burst=5),
+        RatePolicy("place_write", limit=120, period=60),
+        RatePolicy("place_import", limit=10, period=60, burst=3),
+        RatePolicy("route_generate", limit=30, period=60, burst=10),
+        RatePolicy("route_template_write", limit=60, period=60),
+        RatePolicy("media_upload", limit=60, period=3600, burst=20),
+    )
+}
+
+
+@dataclass
+class RateDecision:
+    allowed: bool
+    remaining: int
+    retry_after_ms: int
+
+
+class LocalBuckets:
+    """The Lua script's bucket math over a bounded in-process LRU"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, policy: RatePolicy, cost: int = 1) -> RateDecision:
+        now = time.monotonic() * 1000
+        burst, rate = policy.capacity, policy.rate_per_ms
+        tokens, ts = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + max(0.0, now - ts) * rate)
+        if tokens >= cost:
+            tokens -= cost
+            decision = RateDecision(True, math.floor(tokens), 0)
+        else:
+            decision = RateDecision(False, math.floor(tokens), math.ceil((cost - tokens) / rate))
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return decision
+
+
+class RateLimiter:
+    def __init__(self, client: redis.Redis, enabled: bool = True, redis_retry_seconds: float = 5.0,
+                 prefix: str = "rl"):
+        self.client = client
+        self.enabled = enabled
+        self.redis_retry_seconds = redis_retry_seconds
+        self.prefix = prefix
+        self.local = LocalBuckets()
+        self._take_token = client.register_script(_TAKE_TOKEN)
+        self._redis_down_until = 0.0
+
+    async def take(self, policy: RatePolicy, identity: str, cost: int = 1) -> RateDecision:
+        key = f"{self.prefix}:{policy.name}:{identity}"
+        if time.monotonic() >= self._redis_down_until:
+            try:
+                allowed, remaining, retry = await self._take_token(
+                    keys=[key], args=[policy.capacity, repr(policy.rate_per_ms), cost]
+                )
+                return RateDecision(bool(allowed), int(remaining), int(retry))
+            except (RedisError, OSError) as exc:
+                logger.warning("rate limiter falling back to in-process buckets: %s", exc)
+                self._redis_down_until = time.monotonic() + self.redis_retry_seconds
+        return self.local.take(key, policy, cost)
+
+
+rate_limiter = RateLimiter(
+    redis_client,
+    enabled=settings.rate_limit_enabled,
+    redis_retry_seconds=settings.rate_limit_redis_retry_seconds,
+)
+
+
+def get_rate_limiter() -> RateLimiter:
+    return rate_limiter
+
+
+def client_identity(request: Request) -> str:
+    """Who a bucket belongs to: the authenticated user, else the client address"""
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is not None:
+        return f"u{user_id}"
+    return f"ip{request.client.host if request.client else 'unknown'}"
+
+
+class RateLimit:
+    """Route dependency taking one token from ``policy``'s bucket for the caller.
+
+        @router.post("/", dependencies=[Depends(RateLimit("review_create"))])
+    """
+
+    def __init__(self, policy: str):
+        self.policy = POLICIES[policy]
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        limiter = get_rate_limiter()
+        if not limiter.enabled:
+            return
+        decision = await limiter.take(self.policy, client_identity(request))
+        headers = {
+            "X-RateLimit-Limit": str(self.policy.capacity),
+            "X-RateLimit-Remaining": str(decision.remaining),
+        }
+        if not decision.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(decision.retry_after_ms / 1000)))
+            raise HTTPException(status_code=429, detail="Too many requests, try again later", headers=headers)
+        response.headers.update(headers)
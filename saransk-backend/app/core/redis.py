@@ -0,0 +1,14 @@
+import redis.asyncio as redis
+from .config import settings
+
+
+# Connections are opened lazily on first command
+redis_client = redis.from_url(
+    settings.redis_url,
+    socket_timeout=settings.redis_socket_timeout,
+    socket_connect_timeout=settings.redis_socket_timeout,
+)
+
+
+def get_redis() -> redis.Redis:
+    return redis_client
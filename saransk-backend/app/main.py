@@ -1,14 +1,65 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.responses import ORJSONResponse
 from app.api import api_router
+from app.core.cache import response_cache
+from app.core.conditional import ConditionalMiddleware
+from app.core.config import settings
+from app.core.db import SessionLocal, engine
+from app.core.metrics import MetricsMiddleware, configure_logging, instrument_engine, render_metrics
+from app.core.redis import redis_client
+from app.services.catalog import catalog_cache
+from app.services.moderation import ModerationWorkerPool, create_scorer, moderation_queue
+from app.services.media import media_storage
+from app.services.pack_storage import pack_storage
+from app.services.thumbnails import thumbnail_pipeline
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    moderation = None
+    if settings.moderation_workers > 0:
+        moderation = ModerationWorkerPool(
+            SessionLocal, moderation_queue, create_scorer(), response_cache,
+            settings.moderation_workers, settings.moderation_batch_size,
+        )
+        await moderation.start()
+    if settings.media_thumbnail_workers > 0:
+        await thumbnail_pipeline.start()
+    if settings.catalog_snapshot_enabled:
+        await catalog_cache.start(SessionLocal)
+    yield
+    await catalog_cache.stop()
+    if moderation is not None:
+        await moderation.stop()
+    await thumbnail_pipeline.stop()
+    await media_storage.aclose()
+    await pack_storage.aclose()
+    await redis_client.aclose()
+    await engine.dispose()
+
 
 app = FastAPI(
     title="Saransk for Tourists API",
     description="Backend API for the Saransk for Tourists mobile application",
     version="0.1.0",
     default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
+app.add_middleware(ConditionalMiddleware)
+
+configure_logging()
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    # Added last, so it is the outermost middleware and times the whole stack
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        body, content_type = render_metrics()
+        return Response(body, media_type=content_type)
+
 # Include API routes
 app.include_router(api_router)
 
@@ -22,4 +73,4 @@ async def root() -> dict:
         "message": "Saransk for Tourists API",
         "docs": "/docs",
         "health": "/health"
-    }
\ No newline at end of file
+    }
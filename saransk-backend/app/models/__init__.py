@@ -1,6 +1,11 @@
 from .place import Place
-from .review import Review
+from .review import Review, ReviewReport
 from .user import User
 from .route import RouteTemplate, GeneratedRoute
+from .sync import SyncChange
+from .media import MediaAsset
+from .cluster import PlaceCluster
+from .catalog import CatalogVersion
 
-__all__ = ["Place", "Review", "User", "RouteTemplate", "GeneratedRoute"]
\ No newline at end of file
+__all__ = ["Place", "Review", "ReviewReport", "User", "RouteTemplate", "GeneratedRoute", "SyncChange", "MediaAsset",
+           "PlaceCluster", "CatalogVersion"]
\ No newline at end of file
@@ -10,4 +10,9 @@ class BaseModel(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+def enum_values(enum_cls):
+    """Store enum members by value to match the Postgres enum types from migrations"""
+    return [member.value for member in enum_cls]
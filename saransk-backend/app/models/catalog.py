@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, String
+from .base import Base
+
+
+class CatalogVersion(Base):
+    """Change counter per catalog table, for in-process snapshots.
+
+    Bumped by statement-level triggers (migration 7c2e5a9d3f18) in the
+    writing transaction, so a reader that sees a version also sees every
+    write it counts. See app.services.catalog.
+    """
+
+    __tablename__ = "catalog_versions"
+
+    name = Column(String(32), primary_key=True)  # Table name
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Enum, Float, Index, Integer, SmallInteger, text
+from .base import Base, enum_values
+from .place import PlaceCategory
+
+
+class PlaceCluster(Base):
+    """Active places per map cell and category, at every clustered zoom level.
+
+    A cell is a Web Mercator tile at ``level`` (see app.services.clusters).
+    Maintained only by the statement-level triggers from migration
+    5b9d3f7e2a68, which apply the count and coordinate-sum deltas of every
+    insert, delete and position/category/is_active change on places.
+    """
+
+    __tablename__ = "place_clusters"
+
+    level = Column(SmallInteger, primary_key=True)
+    x = Column(Integer, primary_key=True)
+    y = Column(Integer, primary_key=True)
+    category = Column(Enum(PlaceCategory, values_callable=enum_values), primary_key=True)
+    count = Column(Integer, nullable=False)
+    sum_lat = Column(Float, nullable=False)  # Centroid = sum / count
+    sum_lng = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_place_clusters_empty", "level", postgresql_where=text("count <= 0")),
+    )
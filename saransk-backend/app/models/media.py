@@ -0,0 +1,37 @@
+from sqlalchemy import Column, DateTime, Enum, Integer, JSON, String, Text
+import enum
+from .base import BaseModel, enum_values
+
+
+class MediaKind(str, enum.Enum):
+    PLACE = "place"
+    REVIEW = "review"
+
+
+class MediaStatus(str, enum.Enum):
+    UPLOADING = "uploading"  # Presigned URL issued, upload not confirmed yet
+    PROCESSING = "processing"  # Original landed, thumbnails pending
+    READY = "ready"
+    FAILED = "failed"
+
+
+class MediaAsset(BaseModel):
+    """An uploaded photo (original in S3) and its resized variants.
+
+    Uploads go straight to S3 through a presigned PUT; see app.api.media
+    and app.services.thumbnails.
+    """
+
+    __tablename__ = "media_assets"
+
+    kind = Column(Enum(MediaKind, values_callable=enum_values), nullable=False)
+    key = Column(String(512), nullable=False, unique=True)  # Object key of the original
+    url = Column(String(1024), nullable=False, index=True)  # Public URL stored in photos arrays
+    content_type = Column(String(64), nullable=False)
+    size = Column(Integer, nullable=False)
+    status = Column(Enum(MediaStatus, values_callable=enum_values), nullable=False, default=MediaStatus.UPLOADING)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    variants = Column(JSON, nullable=False, default=dict)  # {"320": {"webp": url, "jpeg": url}}
+    error = Column(Text, nullable=True)
+    claimed_at = Column(DateTime, nullable=True)  # A pipeline is rendering it (see app.services.thumbnails)
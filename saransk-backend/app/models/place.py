@@ -1,7 +1,10 @@
-from sqlalchemy import Column, String, Float, Integer, Boolean, Text, ARRAY, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Index, JSON, String, Float, Integer, BigInteger, Boolean, Text, ARRAY, Enum, event, text
+from sqlalchemy.dialects.postgresql import INT4MULTIRANGE, TSVECTOR, Range
+from sqlalchemy.orm import deferred, relationship
 import enum
-from .base import BaseModel
+from app.core.geo import grid_cell
+from app.core.hours import parse_hours
+from .base import BaseModel, enum_values
 
 
 class PlaceCategory(str, enum.Enum):
@@ -46,9 +49,39 @@ class PriceTier(str, enum.Enum):
     PREMIUM = "premium"
 
 
+# Weighted search documents: title A, tags B, address C, description D.
+# places_tags_text() is an IMMUTABLE wrapper around array_to_string (created
+# by migration 5d8e2a9c4b17) so the expressions can back generated columns.
+SEARCH_RU_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title_ru, '')), 'A') || "
+    "setweight(to_tsvector('russian', places_tags_text(tags::text[])), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(address_ru, '')), 'C') || "
+    "setweight(to_tsvector('russian', coalesce(description_ru, '')), 'D')"
+)
+SEARCH_EN_SQL = (
+    "setweight(to_tsvector('english', coalesce(title_en, '')), 'A') || "
+    "setweight(to_tsvector('english', places_tags_text(tags::text[])), 'B') || "
+    "setweight(to_tsvector('english', coalesce(address_en, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description_en, '')), 'D')"
+)
+# Title and tags only (the heaviest weights), to rank every match of a broad
+# query cheaply before the full documents (see app.services.search)
+TITLE_TAGS_SEARCH_RU_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title_ru, '')), 'A') || "
+    "setweight(to_tsvector('russian', places_tags_text(tags::text[])), 'B')"
+)
+TITLE_TAGS_SEARCH_EN_SQL = (
+    "setweight(to_tsvector('english', coalesce(title_en, '')), 'A') || "
+    "setweight(to_tsvector('english', places_tags_text(tags::text[])), 'B')"
+)
+
+
 class Place(BaseModel):
     __tablename__ = "places"
 
+    # Stable id from the content source (e.g. "poi-saransk-kremlin"), used by bulk import upserts
+    external_id = Column(String(255), nullable=True, unique=True, index=True)
+
     # Basic info (bilingual)
     title_ru = Column(String(255), nullable=False)
     title_en = Column(String(255), nullable=False)
@@ -56,27 +89,32 @@ class Place(BaseModel):
     description_en = Column(Text, nullable=False)
     
     # Categories
-    category = Column(Enum(PlaceCategory), nullable=False)
-    subcategory = Column(Enum(PlaceSubcategory), nullable=False)
+    category = Column(Enum(PlaceCategory, values_callable=enum_values), nullable=False)
+    subcategory = Column(Enum(PlaceSubcategory, values_callable=enum_values), nullable=False)
     tags = Column(ARRAY(String), default=[])
     
     # Location
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    grid_cell = Column(BigInteger, nullable=True, index=True)  # See app.core.geo
     address_ru = Column(String(500), nullable=True)
     address_en = Column(String(500), nullable=True)
     
     # Business info
-    price_tier = Column(Enum(PriceTier), default=PriceTier.FREE)
+    price_tier = Column(Enum(PriceTier, values_callable=enum_values), default=PriceTier.FREE)
     is_commercial = Column(Boolean, default=False)
     website = Column(String(500), nullable=True)
     phone = Column(String(50), nullable=True)
     
-    # Hours (JSON string for now, could be separate table)
+    # Hours as entered (OSM-style rules, Russian text or a JSON object), and the same
+    # schedule compiled into week-minute ranges (see app.core.hours); NULL = unknown
     hours_json = Column(Text, nullable=True)
+    open_intervals = Column(INT4MULTIRANGE, nullable=True)
     
     # Media
     photos = Column(ARRAY(String), default=[])  # S3 URLs
+    # Resized copies per photo URL, filled once thumbnails exist (see app.core.images)
+    photo_variants = Column(JSON, nullable=False, default=dict, server_default="{}")
     audio_url_ru = Column(String(500), nullable=True)
     audio_url_en = Column(String(500), nullable=True)
     
@@ -84,15 +122,61 @@ class Place(BaseModel):
     wheelchair_accessible = Column(Boolean, default=False)
     audio_description = Column(Boolean, default=False)
     
-    # Ratings (calculated from reviews)
-    rating_overall = Column(Float, default=0.0)
+    # Ratings (maintained incrementally from approved reviews, see app.services.ratings)
+    rating_overall = Column(Float, default=0.0, server_default="0", nullable=False)
     rating_interest = Column(Float, default=0.0)
     rating_informativeness = Column(Float, default=0.0)
     rating_convenience = Column(Float, default=0.0)
     reviews_count = Column(Integer, default=0)
+    rating_interest_sum = Column(Float, default=0.0, nullable=False)
+    rating_informativeness_sum = Column(Float, default=0.0, nullable=False)
+    rating_convenience_sum = Column(Float, default=0.0, nullable=False)
     
     # Status
     is_active = Column(Boolean, default=True)
-    
+
+    # Full-text search documents, computed by Postgres on every write (see app.services.search)
+    search_ru = deferred(Column(TSVECTOR, Computed(SEARCH_RU_SQL, persisted=True)))
+    search_en = deferred(Column(TSVECTOR, Computed(SEARCH_EN_SQL, persisted=True)))
+    title_tags_search_ru = deferred(Column(TSVECTOR, Computed(TITLE_TAGS_SEARCH_RU_SQL, persisted=True)))
+    title_tags_search_en = deferred(Column(TSVECTOR, Computed(TITLE_TAGS_SEARCH_EN_SQL, persisted=True)))
+
     # Relationships
-    reviews = relationship("Review", back_populates="place", cascade="all, delete-orphan")
\ No newline at end of file
+    reviews = relationship("Review", back_populates="place", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_places_search_ru", "search_ru", postgresql_using="gin"),
+        Index("ix_places_search_en", "search_en", postgresql_using="gin"),
+        Index("ix_places_title_tags_search_ru", "title_tags_search_ru", postgresql_using="gin"),
+        Index("ix_places_title_tags_search_en", "title_tags_search_en", postgresql_using="gin"),
+        # Public listings only ever read active places (see migration 3b7f9d2e6a41)
+        Index("ix_places_active_id", "id", postgresql_where=text("is_active")),
+        Index("ix_places_active_category_id", "category", "id", postgresql_where=text("is_active")),
+        Index("ix_places_active_subcategory_id", "subcategory", "id", postgresql_where=text("is_active")),
+        Index("ix_places_active_price_tier_id", "price_tier", "id", postgresql_where=text("is_active")),
+        Index(
+            "ix_places_active_rating_id",
+            text("rating_overall DESC"),
+            text("id DESC"),
+            postgresql_where=text("is_active"),
+        ),
+    )
+
+
+def derived_columns(values: dict) -> dict:
+    """Columns computed from other place fields, for both ORM and Core writes"""
+    derived = {}
+    if values.get("latitude") is not None and values.get("longitude") is not None:
+        derived["grid_cell"] = grid_cell(values["latitude"], values["longitude"])
+    if "hours_json" in values:
+        intervals = parse_hours(values["hours_json"])
+        derived["open_intervals"] = None if intervals is None else [Range(lo, hi) for lo, hi in intervals]
+    return derived
+
+
+@event.listens_for(Place, "before_insert")
+@event.listens_for(Place, "before_update")
+def _sync_derived_columns(mapper, connection, target):
+    values = {"latitude": target.latitude, "longitude": target.longitude, "hours_json": target.hours_json}
+    for field, value in derived_columns(values).items():
+        setattr(target, field, value)
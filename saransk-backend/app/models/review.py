@@ -1,7 +1,9 @@
-from sqlalchemy import Column, String, Float, Integer, Boolean, Text, ARRAY, Enum, ForeignKey
+from datetime import datetime
+from sqlalchemy import Column, String, Float, Integer, Boolean, Text, ARRAY, DateTime, Enum, ForeignKey, Index
+from sqlalchemy import text as sql_text  # `text` is a column name below
 from sqlalchemy.orm import relationship
 import enum
-from .base import BaseModel
+from .base import Base, BaseModel, enum_values
 
 
 class ReviewStatus(str, enum.Enum):
@@ -15,7 +17,7 @@ class Review(BaseModel):
     __tablename__ = "reviews"
 
     # Relationships
-    place_id = Column(Integer, ForeignKey("places.id"), nullable=False)
+    place_id = Column(Integer, ForeignKey("places.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     # Content
@@ -28,9 +30,9 @@ class Review(BaseModel):
     rating_convenience = Column(Float, nullable=False)
     
     # Moderation
-    status = Column(Enum(ReviewStatus), default=ReviewStatus.PENDING)
+    status = Column(Enum(ReviewStatus, values_callable=enum_values), default=ReviewStatus.PENDING)
     moderation_notes = Column(Text, nullable=True)
-    reports_count = Column(Integer, default=0)
+    reports_count = Column(Integer, default=0, server_default="0", nullable=False)  # Distinct reporters
     
     # AI moderation
     toxicity_score = Column(Float, nullable=True)  # Perspective API score
@@ -38,4 +40,28 @@ class Review(BaseModel):
     
     # Relationships
     place = relationship("Place", back_populates="reviews")
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+    __table_args__ = (
+        # get_place_reviews: approved reviews of one place, newest first
+        Index(
+            "ix_reviews_place_approved_id",
+            "place_id",
+            sql_text("id DESC"),
+            postgresql_where=sql_text("status = 'approved'"),
+        ),
+    )
+
+class ReviewReport(Base):
+    """One report of a review per user; the primary key deduplicates reporters.
+
+    ``reviews.reports_count`` counts these rows and is maintained by
+    app.services.reports in the same statement that inserts one.
+    """
+
+    __tablename__ = "review_reports"
+
+    review_id = Column(Integer, ForeignKey("reviews.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    reason = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, String, Integer, Boolean, JSON, ForeignKey, Float
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -14,9 +15,19 @@ class RouteTemplate(BaseModel):
     
     # Route properties
     duration_minutes = Column(Integer, nullable=False)  # Estimated duration
+    place_ids = Column(ARRAY(Integer), nullable=False)  # Place IDs in order (GIN-indexed)
+
+    # Materialized from place_ids by the route_templates_materialize trigger on
+    # write, and refreshed by triggers on places when a stop's place changes
+    # (see the 6a3e8c1f4b29 migration); read-only here
+    stops = Column(JSONB, nullable=False, server_default="[]")  # Place summaries with legs, see RouteTemplateStop
+    polyline = Column(JSONB, nullable=False, server_default="[]")  # [lat, lng] per stop
+    missing_place_ids = Column(ARRAY(Integer), nullable=False, server_default="{}")  # Deleted or inactive places
+    distance_m = Column(Float, nullable=False, server_default="0")
     distance_km = Column(Float, nullable=True)
-    place_ids = Column(JSON, nullable=False)  # List of place IDs in order
-    
+    walk_minutes = Column(Float, nullable=False, server_default="0")
+    dwell_minutes = Column(Float, nullable=False, server_default="0")
+
     # Categories and tags
     categories = Column(JSON, default=list)  # List of categories
     tags = Column(JSON, default=list)  # List of tags
@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, Integer, String, text
+from .base import Base
+
+
+class SyncChange(Base):
+    """One row per place/route template write, appended by database triggers.
+
+    Written only by the triggers from migration 8d2f4a6c1e93, so bulk Core
+    writes, rating updates and scripts are all captured; hard deletes leave
+    a 'delete' row behind as the tombstone. See app.services.sync.
+    """
+
+    __tablename__ = "sync_changes"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    xid = Column(BigInteger, server_default=text("pg_current_xact_id()::text::bigint"), nullable=False)
+    entity = Column(String(32), nullable=False)  # "place" | "route_template"
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(8), nullable=False)  # "upsert" | "delete"
+    changed_at = Column(DateTime, server_default=text("timezone('utc', now())"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_sync_changes_xid", "xid"),
+        Index("ix_sync_changes_entity", "entity", "entity_id"),
+    )
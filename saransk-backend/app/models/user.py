@@ -1,6 +1,6 @@
 from sqlalchemy import Column, String, Boolean, JSON, Enum
 import enum
-from .base import BaseModel
+from .base import BaseModel, enum_values
 
 
 class AuthProvider(str, enum.Enum):
@@ -12,7 +12,7 @@ class User(BaseModel):
     __tablename__ = "users"
 
     # Auth
-    auth_provider = Column(Enum(AuthProvider), nullable=False)
+    auth_provider = Column(Enum(AuthProvider, values_callable=enum_values), nullable=False)
     auth_id = Column(String(255), nullable=False, unique=True)  # Apple ID or email
     email = Column(String(255), nullable=True, unique=True)
     
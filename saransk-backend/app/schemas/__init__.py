@@ -1,7 +1,27 @@
-from .place import PlaceResponse, PlaceListResponse, PlaceCreate, PlaceUpdate
+from .place import (
+    PlaceResponse, PlaceListResponse, PlaceCreate, PlaceUpdate, PlaceSort, PlaceNearbyResponse,
+    PlaceImport, PlaceImportError, PlaceImportReport, PlaceSearchResponse, SearchLang,
+    PlaceBatchRequest, PlaceBatchResponse, PlaceView, PlaceMapResponse, PlaceCompactResponse,
+    PlaceProjectionListResponse, PlaceClusterItem, PlaceClustersResponse,
+)
+from .media import MediaUploadRequest, MediaUploadTicket, MediaAssetResponse
+from .offline import OfflineLatestResponse
 from .review import ReviewResponse, ReviewCreate, ReviewUpdate
+from .user import PlaceRecommendation, RecommendationListResponse
+from .route import (
+    RouteGenerateRequest, RouteStop, GeneratedRouteResponse, RouteTemplateStop, RouteTemplateCreate,
+    RouteTemplateUpdate, RouteTemplateResponse,
+)
 
 __all__ = [
-    "PlaceResponse", "PlaceListResponse", "PlaceCreate", "PlaceUpdate",
-    "ReviewResponse", "ReviewCreate", "ReviewUpdate"
+    "PlaceResponse", "PlaceListResponse", "PlaceCreate", "PlaceUpdate", "PlaceSort",
+    "PlaceNearbyResponse", "PlaceImport", "PlaceImportError", "PlaceImportReport",
+    "PlaceSearchResponse", "SearchLang", "PlaceBatchRequest", "PlaceBatchResponse",
+    "PlaceView", "PlaceMapResponse", "PlaceCompactResponse", "PlaceProjectionListResponse",
+    "PlaceClusterItem", "PlaceClustersResponse",
+    "ReviewResponse", "ReviewCreate", "ReviewUpdate",
+    "RouteGenerateRequest", "RouteStop", "GeneratedRouteResponse", "RouteTemplateStop", "RouteTemplateCreate",
+    "RouteTemplateUpdate", "RouteTemplateResponse",
+    "PlaceRecommendation", "RecommendationListResponse",
+    "OfflineLatestResponse", "MediaUploadRequest", "MediaUploadTicket", "MediaAssetResponse",
 ]
\ No newline at end of file
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Literal, Optional
+from app.models.media import MediaKind, MediaStatus
+
+
+class MediaUploadRequest(BaseModel):
+    kind: MediaKind
+    content_type: Literal["image/jpeg", "image/png", "image/webp"]
+    size: int = Field(..., gt=0, description="Exact size of the file in bytes")
+
+
+class MediaUploadTicket(BaseModel):
+    id: int
+    url: str  # Public URL of the original, for photos arrays
+    upload_url: str  # Presigned; PUT the file here with the headers below
+    method: str = "PUT"
+    headers: Dict[str, str]
+    expires_in: int
+
+
+class MediaAssetResponse(BaseModel):
+    id: int
+    kind: MediaKind
+    url: str
+    status: MediaStatus
+    width: Optional[int] = None
+    height: Optional[int] = None
+    variants: Dict[str, Dict[str, str]] = Field(default_factory=dict)  # width -> format -> URL
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
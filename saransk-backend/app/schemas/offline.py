@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class OfflineLatestResponse(BaseModel):
+    version: int
+    pack_id: str            # Full pack of the latest version
+    download_pack_id: str   # Delta from the client's version when available, else pack_id
+    size: int               # Size of the download archive in bytes
+    etag: str
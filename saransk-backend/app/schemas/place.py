@@ -1,9 +1,16 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, ValidationInfo, model_validator
+from typing import Any, Dict, List, Optional
 from datetime import datetime
+import enum
+from app.core.images import DEFAULT_PHOTO_SIZE, pick_variant
 from app.models.place import PlaceCategory, PlaceSubcategory, PriceTier
 
 
+class PlaceSort(str, enum.Enum):
+    ID = "id"
+    RATING = "rating"
+
+
 class PlaceBase(BaseModel):
     title_ru: str = Field(..., min_length=1, max_length=255)
     title_en: str = Field(..., min_length=1, max_length=255)
@@ -32,6 +39,25 @@ class PlaceCreate(PlaceBase):
     pass
 
 
+class PlaceImport(PlaceCreate):
+    external_id: str = Field(..., min_length=1, max_length=255)
+
+
+class PlaceImportError(BaseModel):
+    line: int
+    external_id: Optional[str] = None
+    error: str
+
+
+class PlaceImportReport(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    errors: List[PlaceImportError] = Field(default_factory=list)  # First errors only
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+
 class PlaceUpdate(BaseModel):
     title_ru: Optional[str] = Field(None, min_length=1, max_length=255)
     title_en: Optional[str] = Field(None, min_length=1, max_length=255)
@@ -58,6 +84,7 @@ class PlaceUpdate(BaseModel):
 
 class PlaceResponse(PlaceBase):
     id: int
+    external_id: Optional[str] = None
     rating_overall: float = 0.0
     rating_interest: float = 0.0
     rating_informativeness: float = 0.0
@@ -66,14 +93,102 @@ class PlaceResponse(PlaceBase):
     is_active: bool = True
     created_at: datetime
     updated_at: datetime
+    # One URL per photo: the variant sized for the request (dpr, photo_width), else the original
+    thumbnails: List[str] = Field(default_factory=list)
+    photo_variants: Optional[Dict[str, Dict[str, Dict[str, str]]]] = Field(None, exclude=True)
 
     class Config:
         from_attributes = True
 
+    @model_validator(mode="after")
+    def _pick_thumbnails(self, info: ValidationInfo):
+        # Kept when re-validated from a dump (e.g. into PlaceNearbyResponse)
+        if self.photos and not self.thumbnails:
+            size = (info.context or {}).get("photo_size", DEFAULT_PHOTO_SIZE)
+            variants = self.photo_variants or {}
+            self.thumbnails = [pick_variant(variants.get(url), size) or url for url in self.photos]
+        return self
+
+
+class PlaceNearbyResponse(PlaceResponse):
+    distance_m: float
+
+
+class SearchLang(str, enum.Enum):
+    RU = "ru"
+    EN = "en"
+
+
+class PlaceSearchResponse(PlaceResponse):
+    rank: float
+
+
+class PlaceBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class PlaceBatchResponse(BaseModel):
+    places: List[PlaceResponse]  # In request order
+    missing: List[int] = Field(default_factory=list)  # Unknown or inactive ids
+
+
+class PlaceView(str, enum.Enum):
+    FULL = "full"
+    COMPACT = "compact"  # List rows
+    MAP = "map"  # Map pins
+
+
+class PlaceMapResponse(BaseModel):
+    """A place as a map pin (view=map)"""
+    id: int
+    title_ru: str
+    title_en: str
+    category: PlaceCategory
+    subcategory: PlaceSubcategory
+    latitude: float
+    longitude: float
+    rating_overall: float = 0.0
+
+
+class PlaceCompactResponse(PlaceMapResponse):
+    """A place as a list row (view=compact): no descriptions, hours or photo lists"""
+    address_ru: Optional[str] = None
+    address_en: Optional[str] = None
+    tags: List[str] = Field(default_factory=list)
+    price_tier: PriceTier = PriceTier.FREE
+    is_commercial: bool = False
+    wheelchair_accessible: bool = False
+    reviews_count: int = 0
+    thumbnail: Optional[str] = None  # First photo, sized like PlaceResponse.thumbnails
+
 
 class PlaceListResponse(BaseModel):
     places: List[PlaceResponse]
-    total: int
+    total: Optional[int] = None  # Omitted in cursor mode unless with_total=true
+    page: int
+    per_page: int
+    has_next: bool
+    next_cursor: Optional[str] = None
+
+
+class PlaceProjectionListResponse(BaseModel):
+    """Place list with view=compact|map, fields= or lang= (see app.services.projection)"""
+    places: List[Dict[str, Any]]
+    total: Optional[int] = None
     page: int
     per_page: int
-    has_next: bool
\ No newline at end of file
+    has_next: bool
+    next_cursor: Optional[str] = None
+
+
+class PlaceClusterItem(BaseModel):
+    lat: float  # Centroid
+    lng: float
+    count: int
+    categories: List[PlaceCategory]  # Most frequent first, at most 3
+    id: Optional[int] = None  # Set for single places (zoom 18 and up)
+
+
+class PlaceClustersResponse(BaseModel):
+    zoom: int  # Zoom the tiles were cut at (requests above 18 get 18)
+    clusters: List[PlaceClusterItem]
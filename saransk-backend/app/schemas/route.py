@@ -0,0 +1,112 @@
+from pydantic import BaseModel, Field, ValidationInfo, model_validator
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from app.core.images import DEFAULT_PHOTO_SIZE, pick_variant
+
+
+class RouteGenerateRequest(BaseModel):
+    start_lat: float = Field(..., ge=-90, le=90)
+    start_lng: float = Field(..., ge=-180, le=180)
+    duration_minutes: int = Field(..., ge=15, le=720)
+    interests: List[str] = Field(default_factory=list)  # category or subcategory values
+    max_stops: int = Field(12, ge=1, le=30)
+    start_at: Optional[datetime] = None  # Departure time for opening hours (default now; naive = local time)
+
+
+class RouteStop(BaseModel):
+    place_id: int
+    title_ru: str
+    title_en: str
+    latitude: float
+    longitude: float
+    category: str
+    leg_distance_m: float  # walking distance from the previous stop (or start)
+    arrive_minute: float   # minutes since departure
+    dwell_minutes: float
+
+
+class GeneratedRouteResponse(BaseModel):
+    id: int
+    duration_minutes: int
+    distance_km: Optional[float] = None
+    place_ids: List[int]
+    interests: List[str] = Field(default_factory=list)
+    constraints: Dict[str, Any] = Field(default_factory=dict)
+    route_data: Optional[Dict[str, Any]] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class RouteTemplateStop(RouteStop):
+    subcategory: str
+    leg_walk_minutes: float  # 0 for the first stop, where the walk starts
+    photo: Optional[str] = None  # First photo of the place
+    # The first photo's variant sized for the request (dpr, photo_width), else the original
+    thumbnail: Optional[str] = None
+    photo_variants: Optional[Dict[str, Dict[str, str]]] = Field(None, exclude=True)
+
+    @model_validator(mode="after")
+    def _pick_thumbnail(self, info: ValidationInfo):
+        if self.photo and not self.thumbnail:
+            size = (info.context or {}).get("photo_size", DEFAULT_PHOTO_SIZE)
+            self.thumbnail = pick_variant(self.photo_variants, size) or self.photo
+        return self
+
+
+class RouteTemplateBase(BaseModel):
+    name_ru: str = Field(..., min_length=1, max_length=255)
+    name_en: str = Field(..., min_length=1, max_length=255)
+    description_ru: Optional[str] = Field(None, max_length=1000)
+    description_en: Optional[str] = Field(None, max_length=1000)
+    duration_minutes: int = Field(..., ge=1, le=1440)
+    place_ids: List[int] = Field(..., min_length=1, max_length=100)  # In visiting order
+    categories: List[str] = Field(default_factory=list)
+    tags: List[str] = Field(default_factory=list)
+    is_premium: bool = False
+    is_featured: bool = False
+
+
+class RouteTemplateCreate(RouteTemplateBase):
+    pass
+
+
+class RouteTemplateUpdate(BaseModel):
+    name_ru: Optional[str] = Field(None, min_length=1, max_length=255)
+    name_en: Optional[str] = Field(None, min_length=1, max_length=255)
+    description_ru: Optional[str] = Field(None, max_length=1000)
+    description_en: Optional[str] = Field(None, max_length=1000)
+    duration_minutes: Optional[int] = Field(None, ge=1, le=1440)
+    place_ids: Optional[List[int]] = Field(None, min_length=1, max_length=100)
+    categories: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
+    is_premium: Optional[bool] = None
+    is_featured: Optional[bool] = None
+    is_active: Optional[bool] = None
+
+
+class RouteTemplateResponse(BaseModel):
+    id: int
+    name_ru: str
+    name_en: str
+    description_ru: Optional[str] = None
+    description_en: Optional[str] = None
+    duration_minutes: int
+    distance_km: Optional[float] = None
+    distance_m: float = 0.0
+    walk_minutes: float = 0.0  # Between the stops, from the first one
+    dwell_minutes: float = 0.0
+    place_ids: List[int]
+    categories: List[str] = Field(default_factory=list)
+    tags: List[str] = Field(default_factory=list)
+    is_premium: bool = False
+    is_featured: bool = False
+    # Materialized on write: place_ids resolved, in route order
+    stops: List[RouteTemplateStop] = Field(default_factory=list)
+    polyline: List[List[float]] = Field(default_factory=list)  # [lat, lng] per stop
+    missing_place_ids: List[int] = Field(default_factory=list)  # Deleted or inactive places
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
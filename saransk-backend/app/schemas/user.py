@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from app.schemas.place import PlaceMapResponse
+
+
+class PlaceRecommendation(PlaceMapResponse):
+    reviews_count: int = 0
+    thumbnail: Optional[str] = None  # First photo, sized like PlaceResponse.thumbnails
+    distance_m: Optional[float] = None  # Walking meters from lat/lng, when given
+    score: float
+
+
+class RecommendationListResponse(BaseModel):
+    user_id: int
+    interests: List[str]  # The user's interests the places were matched against
+    places: List[PlaceRecommendation]  # Best first
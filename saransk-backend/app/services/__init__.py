@@ -0,0 +1,19 @@
+from .batch import fetch_places, ordered_places
+from .importer import import_places, poi_to_place
+from .invalidation import after_place_write
+from .moderation import ModerationWorkerPool, moderate_batch, submit_for_moderation
+from .nearby import find_nearby_places
+from .ratings import apply_review_transition, reconcile_place_ratings
+from .recommendations import place_index_cache
+from .reports import record_report
+from .routing import describe_route, distance_matrix_cache, plan_route
+from .search import search_places
+from .sync import compact_change_log, iter_sync
+
+__all__ = [
+    "find_nearby_places", "apply_review_transition", "reconcile_place_ratings",
+    "describe_route", "distance_matrix_cache", "plan_route", "place_index_cache",
+    "import_places", "poi_to_place", "search_places", "fetch_places", "ordered_places",
+    "compact_change_log", "iter_sync", "after_place_write",
+    "ModerationWorkerPool", "moderate_batch", "submit_for_moderation", "record_report",
+]
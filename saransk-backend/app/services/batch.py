@@ -0,0 +1,40 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.place import Place
+from app.schemas.place import PlaceResponse
+
+# Longer lists go through POST /places/batch (PlaceBatchRequest allows 1000)
+MAX_BATCH_IDS_QUERY = 200
+
+
+async def fetch_places(db: AsyncSession, ids: Iterable[int]) -> Dict[int, Place]:
+    """Active places with the given ids, loaded with a single IN query"""
+    wanted = set(ids)
+    if not wanted:
+        return {}
+    result = await db.scalars(select(Place).where(Place.id.in_(wanted), Place.is_active == True))
+    return {place.id: place for place in result}
+
+
+def ordered_places(
+    ids: Sequence[int], found: Dict[int, Place], context: Optional[dict] = None
+) -> Tuple[List[dict], List[int]]:
+    """Serializable places in the caller's order, plus the ids that were not found.
+
+    Each place is dumped once even when its id repeats (a route may pass the
+    same place twice); missing ids are reported once, in request order.
+    ``context`` is the PlaceResponse validation context (photo size).
+    """
+    dumped: Dict[int, dict] = {}
+    places, missing = [], []
+    for place_id in ids:
+        place = found.get(place_id)
+        if place is None:
+            if place_id not in missing:
+                missing.append(place_id)
+            continue
+        if place_id not in dumped:
+            dumped[place_id] = PlaceResponse.model_validate(place, context=context).model_dump()
+        places.append(dumped[place_id])
+    return places, missing
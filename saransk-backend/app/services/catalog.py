@@ -0,0 +1,314 @@
+"""In-process snapshot of the active place catalog.
+
+With CATALOG_SNAPSHOT_ENABLED, every API process loads all active places
+at startup into an immutable CatalogSnapshot: one ``__slots__`` record per
+place, in id order, with indexes by id, category and subcategory (each in
+id and rating order). GET /places/{id} and the default GET /places/ lists
+(active places) are then answered from memory, without a database query.
+
+Freshness comes from a version counter: place writes that change a served
+column bump ``catalog_versions['places']`` in their own transaction
+(statement triggers). A background task polls it every
+CATALOG_SNAPSHOT_POLL_SECONDS, or right away after a place write in this
+process. When it moved, only the places logged in ``sync_changes`` since
+the snapshot's horizon are reloaded (as for the recommendation index), and
+a new snapshot is built from the old records plus those in a worker
+thread, so the event loop keeps serving; then the reference is swapped.
+Requests keep the snapshot they started with. Readers elsewhere lag by at
+most a poll interval plus a refresh.
+"""
+import asyncio
+import logging
+import time
+from array import array
+from bisect import bisect_right
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.catalog import CatalogVersion
+from app.models.place import Place, PlaceCategory, PlaceSubcategory, PriceTier
+from app.models.sync import SyncChange
+from app.schemas.place import PlaceResponse, PlaceSort
+from app.services.sync import current_horizon
+
+logger = logging.getLogger(__name__)
+
+VERSION_NAME = "places"
+# What PlaceResponse and the list projections read, plus the compiled hours
+# (the catalog version trigger of migration 8e4b1c7d2a95 watches the same columns)
+RECORD_FIELDS = tuple(name for name in PlaceResponse.model_fields if name != "thumbnails") + ("open_intervals",)
+# Array columns stored as tuples (immutable, smaller)
+TUPLE_FIELDS = ("tags", "photos")
+NO_PLACES = (array("i"), array("i"))
+
+
+class PlaceRecord:
+    """One active place; attribute access for PlaceResponse, item access for PlaceProjection"""
+
+    __slots__ = RECORD_FIELDS
+
+    def __init__(self, row):
+        for name in RECORD_FIELDS:
+            value = getattr(row, name)
+            if name in TUPLE_FIELDS:
+                value = tuple(value or ())
+            elif name == "open_intervals" and value is not None:
+                value = tuple((rng.lower, rng.upper) for rng in value)
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PlaceRecord is immutable")
+
+    def __getitem__(self, name: str) -> Any:
+        return getattr(self, name)
+
+    def is_open(self, minute: int) -> bool:
+        """Open at a week minute (unknown hours count as open, as in get_places)"""
+        if self.open_intervals is None:
+            return True
+        return any(start <= minute < end for start, end in self.open_intervals)
+
+
+def _rating_key(record: PlaceRecord) -> Tuple[float, int]:
+    # Ascending order of this key is (rating_overall, id) descending, as in get_places
+    return -(record.rating_overall or 0.0), -record.id
+
+
+class CatalogSnapshot:
+    """Immutable view of the active places at one catalog version"""
+
+    __slots__ = ("version", "horizon", "places", "by_id", "indexes", "loaded_at", "load_seconds")
+
+    def __init__(self, version: int, places: Sequence[PlaceRecord], horizon: int = 0, load_seconds: float = 0.0):
+        self.version = version
+        self.horizon = horizon  # Sync log horizon the records are current to
+        self.places: Tuple[PlaceRecord, ...] = tuple(places)  # Id order
+        self.by_id: Dict[int, PlaceRecord] = {p.id: p for p in self.places}
+
+        # Positions into places per filter value, in id and in rating order
+        grouped: Dict[Any, List[int]] = {}
+        for pos, place in enumerate(self.places):
+            grouped.setdefault(place.category, []).append(pos)
+            grouped.setdefault(place.subcategory, []).append(pos)
+        everything = list(range(len(self.places)))
+        self.indexes: Dict[Any, Tuple[array, array]] = {
+            value: self._orders(positions) for value, positions in [(None, everything), *grouped.items()]
+        }
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+
+    def _orders(self, positions: List[int]) -> Tuple[array, array]:
+        by_rating = sorted(positions, key=lambda pos: _rating_key(self.places[pos]))
+        return array("i", positions), array("i", by_rating)
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def get(self, place_id: int) -> Optional[PlaceRecord]:
+        return self.by_id.get(place_id)
+
+    def patched(
+        self, version: int, horizon: int, rows: Sequence[Any], changed: Sequence[int], load_seconds: float = 0.0
+    ) -> "CatalogSnapshot":
+        """A new snapshot with the ``changed`` ids replaced by ``rows`` (their active places, if any)"""
+        by_id = dict(self.by_id)
+        for place_id in changed:
+            by_id.pop(place_id, None)
+        for row in rows:
+            by_id[row.id] = PlaceRecord(row)
+        places = sorted(by_id.values(), key=lambda p: p.id)
+        return CatalogSnapshot(version, places, horizon, load_seconds)
+
+    def select(
+        self,
+        *,
+        category: Optional[PlaceCategory] = None,
+        subcategory: Optional[PlaceSubcategory] = None,
+        price_tier: Optional[PriceTier] = None,
+        is_commercial: Optional[bool] = None,
+        open_minute: Optional[int] = None,
+        sort: PlaceSort = PlaceSort.ID,
+        key: Optional[List[Any]] = None,
+        offset: int = 0,
+        limit: int = 20,
+        with_total: bool = False,
+    ) -> Tuple[List[PlaceRecord], Optional[int]]:
+        """One page of get_places over active places: up to ``limit`` records and the total.
+
+        ``key`` is a decoded cursor (the sort key of the last row already
+        sent); pages start right after it, as with apply_keyset.
+        """
+        # Narrowest index first; the other filters are checked row by row
+        by_id, by_rating = self.indexes.get(subcategory if subcategory is not None else category, NO_PLACES)
+        predicates: List[Callable[[PlaceRecord], bool]] = []
+        if subcategory is not None and category is not None:
+            predicates.append(lambda p: p.category == category)
+        if price_tier is not None:
+            predicates.append(lambda p: p.price_tier == price_tier)
+        if is_commercial is not None:
+            predicates.append(lambda p: p.is_commercial == is_commercial)
+        if open_minute is not None:
+            predicates.append(lambda p: p.is_open(open_minute))
+
+        places = self.places
+        if sort == PlaceSort.RATING:
+            positions = by_rating
+            start = 0 if key is None else bisect_right(
+                positions, (-key[0], -key[1]), key=lambda pos: _rating_key(places[pos])
+            )
+        else:
+            positions = by_id
+            start = 0 if key is None else bisect_right(positions, key[0], key=lambda pos: places[pos].id)
+
+        total = None
+        if with_total:
+            total = len(positions) if not predicates else sum(
+                1 for pos in positions if all(check(places[pos]) for check in predicates)
+            )
+
+        if not predicates:
+            return [places[pos] for pos in positions[start + offset:start + offset + limit]], total
+        page: List[PlaceRecord] = []
+        skipped = 0
+        for pos in positions[start:]:
+            place = places[pos]
+            if all(check(place) for check in predicates):
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                page.append(place)
+                if len(page) == limit:
+                    break
+        return page, total
+
+
+async def read_version(db: AsyncSession) -> int:
+    return await db.scalar(select(CatalogVersion.version).where(CatalogVersion.name == VERSION_NAME)) or 0
+
+
+def _build(version: int, rows: Sequence[Any], horizon: int, started: float) -> CatalogSnapshot:
+    return CatalogSnapshot(version, [PlaceRecord(row) for row in rows], horizon, time.perf_counter() - started)
+
+
+async def load_snapshot(db: AsyncSession) -> CatalogSnapshot:
+    """Version, horizon and places from one REPEATABLE READ snapshot, so they match.
+
+    Records and indexes are built in a worker thread.
+    """
+    started = time.perf_counter()
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    version = await read_version(db)
+    horizon = await current_horizon(db)
+    rows = (await db.execute(
+        select(*(getattr(Place, name) for name in RECORD_FIELDS))
+        .where(Place.is_active == True)
+        .order_by(Place.id)
+    )).all()
+    return await asyncio.to_thread(_build, version, rows, horizon, started)
+
+
+async def refresh_snapshot(db: AsyncSession, snapshot: CatalogSnapshot) -> CatalogSnapshot:
+    """The snapshot patched with the places changed since its horizon.
+
+    Reads every change logged at or after the horizon that this transaction
+    sees, not only those below the new horizon: a later transaction that
+    committed already has bumped the version read here too, and would
+    otherwise wait for the next bump.
+    """
+    started = time.perf_counter()
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    version = await read_version(db)
+    horizon = await current_horizon(db)
+    changed = list(await db.scalars(
+        select(SyncChange.entity_id)
+        .where(SyncChange.xid >= snapshot.horizon, SyncChange.entity == "place")
+        .distinct()
+    ))
+    rows = []
+    if changed:
+        rows = (await db.execute(
+            select(*(getattr(Place, name) for name in RECORD_FIELDS))
+            .where(Place.id.in_(changed), Place.is_active == True)
+        )).all()
+    return await asyncio.to_thread(
+        lambda: snapshot.patched(version, horizon, rows, changed, time.perf_counter() - started)
+    )
+
+
+class CatalogCache:
+    """Holds the current snapshot of this process and reloads it on version bumps"""
+
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self._sessionmaker: Optional[async_sessionmaker] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    async def start(self, sessionmaker: async_sessionmaker) -> None:
+        """Load the first snapshot (before serving) and start polling"""
+        self._sessionmaker = sessionmaker
+        await self.reload()
+        self._poller = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+        self.snapshot = None
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """The snapshot to answer from, or None when disabled or not loaded"""
+        return self.snapshot
+
+    def notify(self) -> None:
+        """A place write committed in this process: check the version now"""
+        self._wake.set()
+
+    async def reload(self) -> CatalogSnapshot:
+        """Full load of the active places"""
+        async with self._sessionmaker() as db:
+            snapshot = await load_snapshot(db)
+        self.snapshot = snapshot
+        logger.info(
+            "catalog snapshot v%d: %d places loaded in %.0f ms",
+            snapshot.version, len(snapshot), snapshot.load_seconds * 1000,
+        )
+        return snapshot
+
+    async def refresh(self) -> CatalogSnapshot:
+        """Patch the current snapshot with the places changed since it was taken"""
+        async with self._sessionmaker() as db:
+            snapshot = await refresh_snapshot(db, self.snapshot)
+        self.snapshot = snapshot
+        logger.info(
+            "catalog snapshot v%d: %d places, refreshed in %.0f ms",
+            snapshot.version, len(snapshot), snapshot.load_seconds * 1000,
+        )
+        return snapshot
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                async with self._sessionmaker() as db:
+                    version = await read_version(db)
+                if self.snapshot is None:
+                    await self.reload()
+                elif version != self.snapshot.version:
+                    await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("catalog snapshot refresh failed")
+
+
+catalog_cache = CatalogCache(poll_seconds=settings.catalog_snapshot_poll_seconds)
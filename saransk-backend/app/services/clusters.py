@@ -0,0 +1,155 @@
+"""Server-side map clusters.
+
+The map asks for a bounding box at its zoom level and gets, per Web
+Mercator tile covering it, one cluster per occupied cell: the tile split
+one level further (2 x 2 cells of 128 px), with the place count, centroid and
+top categories. Counts and coordinate sums per cell are precomputed for
+every zoom in place_clusters by database triggers, so a tile is one index
+range scan whatever the number of places under it. From MAX_ZOOM on, tiles
+list the places themselves.
+
+Tile payloads are cached per (zoom, x, y). A place write drops only the
+tiles containing the place's old and new position at each zoom; imports
+drop them all with the other place payloads.
+"""
+import hashlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import CLUSTERS_TAG, ResponseCache, cluster_tile_tag
+from app.core.geo import box_cell_ranges, tile_bounds, tile_xy
+from app.models.cluster import PlaceCluster
+from app.models.place import Place
+
+# Cells are tiles this many levels deeper than the requested zoom (2 x 2 per tile,
+# about a cluster marker apart); place_clusters holds levels CELL_SHIFT .. MAX_ZOOM - 1 + CELL_SHIFT
+CELL_SHIFT = 1
+# From this zoom on, tiles list individual places
+MAX_ZOOM = 18
+MAX_TILES = 64
+TOP_CATEGORIES = 3
+# ~1 m; keeps payloads small
+COORD_DIGITS = 5
+
+BBox = Tuple[float, float, float, float]  # min_lng, min_lat, max_lng, max_lat
+
+
+def parse_bbox(value: str) -> BBox:
+    """``min_lng,min_lat,max_lng,max_lat``; raises ValueError"""
+    parts = [float(part) for part in value.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must be min_lng,min_lat,max_lng,max_lat")
+    min_lng, min_lat, max_lng, max_lat = parts
+    if not (-180 <= min_lng <= max_lng <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise ValueError("bbox out of range or inverted")
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def tile_zoom(zoom: int) -> int:
+    """Zoom whose tiles answer a request at ``zoom``"""
+    return min(zoom, MAX_ZOOM)
+
+
+def bbox_tiles(bbox: BBox, zoom: int) -> List[Tuple[int, int]]:
+    """Tiles covering a box at a zoom; raises ValueError past MAX_TILES"""
+    min_lng, min_lat, max_lng, max_lat = bbox
+    x0, y0 = tile_xy(max_lat, min_lng, zoom)  # Rows grow southwards
+    x1, y1 = tile_xy(min_lat, max_lng, zoom)
+    if (x1 - x0 + 1) * (y1 - y0 + 1) > MAX_TILES:
+        raise ValueError(f"bbox covers more than {MAX_TILES} tiles at this zoom")
+    return [(x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+
+
+def _point(lat: float, lng: float) -> dict:
+    return {"lat": round(lat, COORD_DIGITS), "lng": round(lng, COORD_DIGITS)}
+
+
+async def _load_clusters(db: AsyncSession, zoom: int, x: int, y: int) -> List[dict]:
+    level, side = zoom + CELL_SHIFT, 1 << CELL_SHIFT
+    rows = await db.execute(
+        select(PlaceCluster.x, PlaceCluster.y, PlaceCluster.category, PlaceCluster.count,
+               PlaceCluster.sum_lat, PlaceCluster.sum_lng)
+        .where(
+            PlaceCluster.level == level,
+            PlaceCluster.x.between(x * side, x * side + side - 1),
+            PlaceCluster.y.between(y * side, y * side + side - 1),
+        )
+    )
+    cells: Dict[Tuple[int, int], list] = defaultdict(list)
+    for row in rows:
+        cells[(row.x, row.y)].append(row)
+
+    clusters = []
+    for _, members in sorted(cells.items()):
+        count = sum(m.count for m in members)
+        top = sorted(members, key=lambda m: -m.count)[:TOP_CATEGORIES]
+        clusters.append({
+            **_point(sum(m.sum_lat for m in members) / count, sum(m.sum_lng for m in members) / count),
+            "count": count,
+            "categories": [m.category.value for m in top],
+        })
+    return clusters
+
+
+async def _load_places(db: AsyncSession, zoom: int, x: int, y: int) -> List[dict]:
+    min_lat, max_lat, min_lng, max_lng = tile_bounds(x, y, zoom)
+    cells = or_(*(Place.grid_cell.between(lo, hi) for lo, hi in box_cell_ranges(min_lat, max_lat, min_lng, max_lng)))
+    rows = await db.execute(
+        select(Place.id, Place.latitude, Place.longitude, Place.category)
+        .where(
+            cells,
+            # Rows grow southwards: a tile owns its northern edge (as in tile_xy)
+            Place.latitude > min_lat, Place.latitude <= max_lat,
+            Place.longitude >= min_lng, Place.longitude < max_lng,
+            Place.is_active == True,
+        )
+        .order_by(Place.id)
+    )
+    return [
+        {"id": row.id, **_point(row.latitude, row.longitude), "count": 1, "categories": [row.category.value]}
+        for row in rows
+    ]
+
+
+async def cluster_tile(db: AsyncSession, cache: ResponseCache, zoom: int, x: int, y: int) -> bytes:
+    """JSON array of the clusters (or, from MAX_ZOOM, places) in one tile"""
+    async def load() -> bytes:
+        loader = _load_places if zoom >= MAX_ZOOM else _load_clusters
+        return orjson.dumps(await loader(db, zoom, x, y))
+
+    return await cache.get_or_set(
+        cache.key("clusters", zoom, x, y), load, tags=[CLUSTERS_TAG, cluster_tile_tag(zoom, x, y)]
+    )
+
+
+async def clusters_payload(db: AsyncSession, cache: ResponseCache, bbox: BBox, zoom: int) -> Tuple[bytes, str]:
+    """Response body for a bbox and its content hash (for the ETag)"""
+    zoom = tile_zoom(zoom)
+    tiles = [await cluster_tile(db, cache, zoom, x, y) for x, y in bbox_tiles(bbox, zoom)]
+    # Splice the cached arrays together instead of decoding them
+    items = b",".join(tile[1:-1] for tile in tiles if len(tile) > 2)
+    body = b'{"zoom":%d,"clusters":[%s]}' % (zoom, items)
+    return body, hashlib.sha1(body).hexdigest()
+
+
+async def invalidate_cluster_tiles(cache: ResponseCache, *points: Optional[Tuple[float, float]]) -> None:
+    """Drop the cached tiles containing any of the (lat, lng) points, at every zoom"""
+    tags = set()
+    for point in points:
+        if point is not None:
+            tags.update(cluster_tile_tag(zoom, *tile_xy(*point, zoom)) for zoom in range(MAX_ZOOM + 1))
+    await cache.invalidate_tags(*sorted(tags))
+
+
+def map_state(place: Place) -> tuple:
+    """What the clusters show of a place; tiles need dropping only when it changes"""
+    return place.latitude, place.longitude, place.category, place.is_active
+
+
+def map_position(place: Place) -> Optional[Tuple[float, float]]:
+    """Where a place shows up on the map, if it does"""
+    return (place.latitude, place.longitude) if place.is_active else None
@@ -0,0 +1,250 @@
+import json
+import re
+import time
+from typing import AsyncIterable, Iterable, IO, Iterator, List, Optional, Tuple, Union
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.place import Place, PlaceCategory, PlaceSubcategory, PriceTier, derived_columns
+from app.schemas.place import PlaceImport, PlaceImportError, PlaceImportReport
+from app.services.media import find_photo_variants
+
+MAX_REPORTED_ERRORS = 100
+
+# (line number, raw record or the JSON error that replaced it)
+Record = Tuple[int, Union[dict, Exception]]
+
+
+class PlaceImporter:
+    """Validates place records and upserts them on external_id in batches.
+
+    Each batch is one ``INSERT ... ON CONFLICT (external_id) DO UPDATE`` and
+    is committed on its own, so a failure keeps the batches already written.
+    A record whose external_id is already in the pending batch flushes the
+    batch first: Postgres cannot touch the same row twice in one statement,
+    and flushing keeps last-write-wins order.
+    """
+
+    def __init__(self, db: AsyncSession, batch_size: int = 500):
+        self.db = db
+        self.batch_size = batch_size
+        self.report = PlaceImportReport()
+        self._batch: List[dict] = []
+        self._batch_ids = set()
+        self._started = time.perf_counter()
+
+    def _reject(self, line: int, error: str, external_id: Optional[str] = None) -> None:
+        self.report.rejected += 1
+        if len(self.report.errors) < MAX_REPORTED_ERRORS:
+            self.report.errors.append(PlaceImportError(line=line, external_id=external_id, error=error))
+
+    async def add(self, line: int, record: Union[dict, Exception]) -> None:
+        if isinstance(record, Exception):
+            self._reject(line, f"invalid JSON: {record}")
+            return
+        try:
+            place = PlaceImport.model_validate(record)
+        except ValidationError as exc:
+            external_id = record.get("external_id") if isinstance(record, dict) else None
+            errors = "; ".join(
+                f"{'.'.join(str(p) for p in e['loc']) or 'record'}: {e['msg']}" for e in exc.errors()
+            )
+            self._reject(line, errors, external_id if isinstance(external_id, str) else None)
+            return
+
+        if place.external_id in self._batch_ids:
+            await self.flush()
+        values = place.model_dump()
+        values.update(derived_columns(values))
+        self._batch.append(values)
+        self._batch_ids.add(place.external_id)
+        if len(self._batch) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._batch:
+            return
+        # Variants follow the imported photos, as attach_photo_variants does for
+        # API writes; replaced photos would otherwise keep their old variants
+        found = await find_photo_variants(self.db, (url for values in self._batch for url in values["photos"]))
+        for values in self._batch:
+            values["photo_variants"] = {url: found[url] for url in values["photos"] if url in found}
+        # executemany form: the statement compiles once and SQLAlchemy packs the
+        # rows into multi-row VALUES pages ("insertmanyvalues") with RETURNING
+        stmt = insert(Place)
+        updatable = [c for c in self._batch[0] if c != "external_id"]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Place.external_id],
+            set_={**{c: stmt.excluded[c] for c in updatable}, "updated_at": func.timezone("utc", func.now())},
+        ).returning(
+            # xmax is 0 only for freshly inserted tuples
+            literal_column("(xmax = 0)").label("inserted")
+        )
+        result = await self.db.execute(stmt, self._batch)
+        inserted = sum(1 for row in result if row.inserted)
+        await self.db.commit()
+
+        self.report.inserted += inserted
+        self.report.updated += len(self._batch) - inserted
+        self._batch = []
+        self._batch_ids = set()
+
+    async def finish(self) -> PlaceImportReport:
+        await self.flush()
+        elapsed = time.perf_counter() - self._started
+        written = self.report.inserted + self.report.updated
+        self.report.elapsed_seconds = round(elapsed, 3)
+        self.report.rows_per_second = round(written / elapsed, 1) if elapsed > 0 else 0.0
+        return self.report
+
+
+async def import_places(
+    db: AsyncSession,
+    records: Union[Iterable[Record], AsyncIterable[Record]],
+    batch_size: int = 500,
+) -> PlaceImportReport:
+    importer = PlaceImporter(db, batch_size)
+    if hasattr(records, "__aiter__"):
+        async for line, record in records:
+            await importer.add(line, record)
+    else:
+        for line, record in records:
+            await importer.add(line, record)
+    return await importer.finish()
+
+
+def parse_ndjson_line(line: bytes) -> Union[dict, Exception]:
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError as exc:
+        return exc
+
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterable[Record]:
+    """Split a streamed NDJSON body into records without buffering it whole"""
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, parse_ndjson_line(line)
+    if buffer.strip():
+        yield number + 1, parse_ndjson_line(buffer)
+
+
+def iter_json_array(fp: IO[str], key: str = "items", chunk_size: int = 1 << 16) -> Iterator[Record]:
+    """Yield the elements of ``document[key]`` one at a time from a JSON file.
+
+    Reads the file in chunks and decodes one element per ``raw_decode`` call,
+    so memory stays bounded by the largest element rather than the document.
+    Line numbers are element positions (1-based).
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    marker = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+
+    while True:
+        found = marker.search(buffer)
+        if found:
+            buffer = buffer[found.end():]
+            break
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            return
+        # Keep a tail in case the key straddles the chunk boundary
+        buffer = buffer[-len(key) - 16:] + chunk
+
+    number = 0
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = fp.read(chunk_size)
+            if not chunk:
+                raise
+            buffer += chunk
+            continue
+        number += 1
+        yield number, item
+        buffer = buffer[end:]
+
+
+# content/poi.json uses free-form Russian categories; first recognised one wins
+POI_CATEGORIES = {
+    "архитектура": (PlaceCategory.ARCHITECTURE, PlaceSubcategory.MODERN),
+    "храмы": (PlaceCategory.ARCHITECTURE, PlaceSubcategory.ORTHODOX_CHURCH),
+    "храм": (PlaceCategory.ARCHITECTURE, PlaceSubcategory.ORTHODOX_CHURCH),
+    "деревянное зодчество": (PlaceCategory.ARCHITECTURE, PlaceSubcategory.WOODEN_ARCHITECTURE),
+    "памятники": (PlaceCategory.MONUMENT, PlaceSubcategory.HISTORICAL_PERSON),
+    "военная слава": (PlaceCategory.MONUMENT, PlaceSubcategory.MILITARY_GLORY),
+    "музеи": (PlaceCategory.MONUMENT, PlaceSubcategory.CULTURAL_HERITAGE),
+    "история": (PlaceCategory.MONUMENT, PlaceSubcategory.CULTURAL_HERITAGE),
+    "мордовская кухня": (PlaceCategory.FOOD, PlaceSubcategory.MORDOVIAN_CUISINE),
+    "рестораны": (PlaceCategory.FOOD, PlaceSubcategory.RESTAURANT),
+    "кафе": (PlaceCategory.FOOD, PlaceSubcategory.CAFE),
+    "кофейни": (PlaceCategory.FOOD, PlaceSubcategory.COFFEE_SHOP),
+    "еда": (PlaceCategory.FOOD, PlaceSubcategory.CAFE),
+    "сувениры": (PlaceCategory.SOUVENIR, PlaceSubcategory.CRAFTS_ETHNO),
+    "ремёсла": (PlaceCategory.SOUVENIR, PlaceSubcategory.CRAFTS_ETHNO),
+    "рынки": (PlaceCategory.SOUVENIR, PlaceSubcategory.MARKET_FAIR),
+}
+
+
+def _price_tier(ticket: Optional[str]) -> PriceTier:
+    amount = re.search(r"\d+", (ticket or "").replace(" ", ""))
+    if not amount:
+        return PriceTier.FREE
+    value = int(amount.group())
+    if value <= 500:
+        return PriceTier.BUDGET
+    if value <= 1500:
+        return PriceTier.MEDIUM
+    return PriceTier.PREMIUM
+
+
+def poi_to_place(item: dict) -> dict:
+    """Map a content/poi.json item onto PlaceImport fields.
+
+    The source is single-language (Russian), so English fields fall back to
+    the same text until translations are added. Unknown categories are left
+    unset and the record is rejected by validation.
+    """
+    category = subcategory = None
+    for name in item.get("categories") or []:
+        if name.lower() in POI_CATEGORIES:
+            category, subcategory = POI_CATEGORIES[name.lower()]
+            break
+
+    coordinates = item.get("coordinates") or {}
+    contacts = item.get("contacts") or {}
+    description = item.get("description") or item.get("short")
+    audio = item.get("audio") or []
+    return {
+        "external_id": item.get("id"),
+        "title_ru": item.get("title"),
+        "title_en": item.get("title_en") or item.get("title"),
+        "description_ru": description,
+        "description_en": item.get("description_en") or description,
+        "category": category,
+        "subcategory": subcategory,
+        "tags": item.get("tags") or [],
+        "latitude": coordinates.get("lat"),
+        "longitude": coordinates.get("lng"),
+        "address_ru": item.get("address"),
+        "price_tier": _price_tier(item.get("ticket")),
+        "website": contacts.get("site"),
+        "phone": contacts.get("phone"),
+        "hours_json": item.get("openingHours"),
+        "photos": [image["src"] for image in item.get("images") or [] if image.get("src")],
+        "audio_url_ru": audio[0] if audio else None,
+    }
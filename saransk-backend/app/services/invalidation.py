@@ -0,0 +1,24 @@
+from typing import Optional, Tuple
+from app.core.cache import ResponseCache, invalidate_place
+from app.services.catalog import catalog_cache
+from app.services.clusters import invalidate_cluster_tiles
+from app.services.recommendations import place_index_cache
+from app.services.routing import distance_matrix_cache
+
+
+async def after_place_write(
+    cache: ResponseCache, place_id: Optional[int], *positions: Optional[Tuple[float, float]]
+) -> None:
+    """Drop everything derived from places after a committed write.
+
+    ``place_id`` is the written place, or None after a bulk write to any
+    number of places (which drops every place payload and cluster tile).
+    ``positions`` are the map positions (app.services.clusters.map_position)
+    whose cluster tiles changed; pass none when the place did not move on
+    the map.
+    """
+    await invalidate_place(cache, place_id)
+    await invalidate_cluster_tiles(cache, *positions)
+    distance_matrix_cache.invalidate()
+    place_index_cache.mark_stale()
+    catalog_cache.notify()
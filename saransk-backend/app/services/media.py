@@ -0,0 +1,157 @@
+"""Photo uploads straight to S3.
+
+Clients ask for an upload ticket (a presigned PUT bound to the content type
+and exact size), PUT the file to the bucket themselves and then confirm it;
+the API never proxies image bytes. Confirmed originals are resized by
+app.services.thumbnails, which publishes the variant URLs to every place
+showing the photo.
+"""
+import asyncio
+import uuid
+from contextlib import AsyncExitStack
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.media import MediaAsset, MediaKind, MediaStatus
+from app.models.place import Place
+
+CONTENT_TYPES = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+}
+# Resized copies are immutable (new upload, new key)
+VARIANT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class MediaStorage:
+    """The media bucket through one lazily opened aioboto3 client"""
+
+    def __init__(self, bucket: str, public_url: str, **client_kwargs):
+        self.bucket = bucket
+        self.public_base = public_url.rstrip("/")
+        self._client_kwargs = client_kwargs
+        self._client = None
+        self._stack = AsyncExitStack()
+        self._lock = asyncio.Lock()
+
+    async def _s3(self):
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    import aioboto3
+                    from botocore.config import Config
+
+                    # SigV4 signs the Content-Length of presigned PUTs
+                    self._client = await self._stack.enter_async_context(
+                        aioboto3.Session().client("s3", config=Config(signature_version="s3v4"), **self._client_kwargs)
+                    )
+        return self._client
+
+    def public_url(self, key: str) -> str:
+        return f"{self.public_base}/{key}"
+
+    async def presign_put(self, key: str, content_type: str, size: int, expires: int) -> str:
+        s3 = await self._s3()
+        # Content type and length are signed: the PUT must match them exactly
+        return await s3.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": self.bucket, "Key": key, "ContentType": content_type, "ContentLength": size},
+            ExpiresIn=expires,
+        )
+
+    async def size(self, key: str) -> Optional[int]:
+        from botocore.exceptions import ClientError
+
+        s3 = await self._s3()
+        try:
+            head = await s3.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return head["ContentLength"]
+
+    async def read(self, key: str) -> bytes:
+        s3 = await self._s3()
+        obj = await s3.get_object(Bucket=self.bucket, Key=key)
+        async with obj["Body"] as body:
+            return await body.read()
+
+    async def write(self, key: str, data: bytes, content_type: str) -> None:
+        s3 = await self._s3()
+        await s3.put_object(
+            Bucket=self.bucket, Key=key, Body=data, ContentType=content_type, CacheControl=VARIANT_CACHE_CONTROL
+        )
+
+    async def aclose(self) -> None:
+        await self._stack.aclose()
+        self._client = None
+
+
+media_storage = MediaStorage(
+    settings.s3_bucket,
+    settings.s3_public_url or f"{settings.s3_endpoint.rstrip('/')}/{settings.s3_bucket}",
+    endpoint_url=settings.s3_endpoint,
+    region_name=settings.s3_region,
+    aws_access_key_id=settings.s3_access_key,
+    aws_secret_access_key=settings.s3_secret_key,
+)
+
+
+def get_media_storage() -> MediaStorage:
+    return media_storage
+
+
+async def create_upload(
+    db: AsyncSession, storage: MediaStorage, kind: MediaKind, content_type: str, size: int
+) -> Tuple[MediaAsset, str]:
+    """Register an upload and presign its PUT; returns (asset, upload_url). The caller commits."""
+    key = f"{settings.media_prefix}{kind.value}/{uuid.uuid4().hex}.{CONTENT_TYPES[content_type]}"
+    asset = MediaAsset(
+        kind=kind,
+        key=key,
+        url=storage.public_url(key),
+        content_type=content_type,
+        size=size,
+        status=MediaStatus.UPLOADING,
+        variants={},
+    )
+    db.add(asset)
+    await db.flush()
+    upload_url = await storage.presign_put(key, content_type, size, settings.media_upload_expires_seconds)
+    return asset, upload_url
+
+
+def variant_key(asset: MediaAsset, width: int, extension: str) -> str:
+    stem = asset.key.rsplit(".", 1)[0]
+    return f"{stem}/w{width}.{extension}"
+
+
+async def find_photo_variants(db: AsyncSession, urls: Iterable[str]) -> Dict[str, dict]:
+    """Variants of finished uploads by photo URL, for the URLs that have any"""
+    urls = set(urls)
+    if not urls:
+        return {}
+    rows = await db.execute(
+        select(MediaAsset.url, MediaAsset.variants)
+        .where(MediaAsset.url.in_(urls), MediaAsset.status == MediaStatus.READY)
+    )
+    return {url: found for url, found in rows if found}
+
+
+async def attach_photo_variants(db: AsyncSession, place: Place) -> None:
+    """Set ``place.photo_variants`` for its current photos from finished uploads"""
+    place.photo_variants = await find_photo_variants(db, place.photos or [])
+
+
+async def publish_variants(db: AsyncSession, asset: MediaAsset) -> Set[int]:
+    """Add a finished asset's variants to every place showing it; returns their ids. The caller commits."""
+    places = (await db.scalars(select(Place).where(Place.photos.any(asset.url)))).all()
+    for place in places:
+        # Reassign: the JSON column does not track in-place mutation
+        place.photo_variants = {**(place.photo_variants or {}), asset.url: asset.variants}
+    return {place.id for place in places}
@@ -0,0 +1,375 @@
+"""Background review moderation.
+
+Review writes only enqueue the review id (bounded by a short timeout); a
+pool of workers takes ids in batches, scores the texts with a pluggable
+scorer outside any database transaction, then applies the decision under
+a row lock and updates the place ratings for approved reviews.
+
+The database stays the source of truth: a review is waiting for moderation
+while it is pending with no toxicity_score, and one sweeper at a time
+(Postgres advisory lock) puts such reviews that have waited longer than a
+sweep interval back into the queue. The queue holds each id at most once,
+so sweeps and re-enqueues do not pile up duplicates. A lost enqueue or a
+crashed worker therefore only delays moderation.
+"""
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Protocol, Sequence
+
+import httpx
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import ResponseCache, invalidate_place
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.models.review import Review, ReviewStatus
+from app.services.ratings import apply_review_transition
+
+logger = logging.getLogger(__name__)
+
+# Sorted set of review ids scored by enqueue time (the former list key held duplicates)
+QUEUE_KEY = "moderation:queue"
+# pg_try_advisory_xact_lock key held by the process running a sweep
+SWEEP_LOCK_ID = 0x6D6F6431
+
+
+@dataclass
+class ModerationScore:
+    toxicity: float
+    spam: float
+    flags: List[str] = field(default_factory=list)
+
+
+class Scorer(Protocol):
+    async def score(self, texts: Sequence[str]) -> List[ModerationScore]:
+        ...
+
+
+# Word stems, matched at word starts
+SPAM_WORDS = ("спам", "реклам", "купить", "продать", "заработ", "скидк", "промокод", "казино",
+              "buy", "discount", "promo", "casino")
+TOXIC_WORDS = ("дурак", "идиот", "тупой", "тупая", "урод", "отстой", "ненавиж", "мразь",
+               "idiot", "stupid", "moron", "hate", "sucks", "trash")
+_LINK = re.compile(r"https?://|www\.|\b[\w-]+\.(?:ru|com|net|org|рф)\b", re.IGNORECASE)
+_PHONE = re.compile(r"(?:\+7|8)[\s(-]*\d{3}[\s)-]*\d{3}[\s-]*\d{2}[\s-]*\d{2}")
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def _stem_hits(words: Sequence[str], stems: Sequence[str]) -> int:
+    return sum(1 for w in words if w.startswith(stems))
+
+
+class HeuristicScorer:
+    """Local word-list and shape heuristics (the rules the Firebase moderateText used, extended).
+
+    Deterministic and instant; the default, and the scorer for tests.
+    """
+
+    async def score(self, texts: Sequence[str]) -> List[ModerationScore]:
+        return [self.score_one(text) for text in texts]
+
+    @staticmethod
+    def score_one(text: str) -> ModerationScore:
+        words = [w.lower() for w in _WORD.findall(text)]
+        flags = []
+
+        spam = 0.0
+        if hits := _stem_hits(words, SPAM_WORDS):
+            spam += 0.35 * hits
+            flags.append("spam_words")
+        if links := len(_LINK.findall(text)) + len(_PHONE.findall(text)):
+            spam += 0.4 * links
+            flags.append("links")
+        if words and max(words.count(w) for w in set(words)) > 5:
+            spam += 0.5
+            flags.append("repetitive")
+
+        toxicity = 0.0
+        if hits := _stem_hits(words, TOXIC_WORDS):
+            toxicity += 0.45 * hits
+            flags.append("insults")
+        letters = [c for c in text if c.isalpha()]
+        if len(letters) >= 20 and sum(c.isupper() for c in letters) / len(letters) > 0.7:
+            toxicity += 0.25
+            flags.append("shouting")
+        if "!!!" in text:
+            toxicity += 0.1
+
+        return ModerationScore(toxicity=round(min(toxicity, 1.0), 3), spam=round(min(spam, 1.0), 3), flags=flags)
+
+
+class PerspectiveScorer:
+    """Toxicity from the Perspective API; spam still comes from the heuristics"""
+
+    URL = "https://commentanalyzer.googleapis.com/v1alpha1/comments:analyze"
+
+    def __init__(self, api_key: str, timeout: float = 5.0, concurrency: int = 8):
+        self.api_key = api_key
+        self.client = httpx.AsyncClient(timeout=timeout)
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def _toxicity(self, text: str) -> float:
+        async with self.semaphore:
+            response = await self.client.post(self.URL, params={"key": self.api_key}, json={
+                "comment": {"text": text},
+                "languages": ["ru", "en"],
+                "requestedAttributes": {"TOXICITY": {}},
+                "doNotStore": True,
+            })
+        response.raise_for_status()
+        return response.json()["attributeScores"]["TOXICITY"]["summaryScore"]["value"]
+
+    async def score(self, texts: Sequence[str]) -> List[ModerationScore]:
+        toxicities = await asyncio.gather(*(self._toxicity(text) for text in texts))
+        scores = []
+        for text, toxicity in zip(texts, toxicities):
+            local = HeuristicScorer.score_one(text)
+            flags = [f for f in local.flags if f not in ("insults", "shouting")]
+            if toxicity >= settings.moderation_approve_below:
+                flags.append("toxicity")
+            scores.append(ModerationScore(toxicity=round(toxicity, 3), spam=local.spam, flags=flags))
+        return scores
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def create_scorer(kind: Optional[str] = None) -> Scorer:
+    if (kind or settings.moderation_scorer) == "perspective":
+        if not settings.perspective_api_key:
+            raise RuntimeError("MODERATION_SCORER=perspective needs PERSPECTIVE_API_KEY")
+        return PerspectiveScorer(settings.perspective_api_key)
+    return HeuristicScorer()
+
+
+class RedisModerationQueue:
+    """Review ids in a Redis sorted set, shared by every API and worker process.
+
+    Ids are scored by first enqueue time and taken oldest first; adding an
+    id that is already queued keeps its place (ZADD NX).
+    """
+
+    def __init__(self, client, key: str = QUEUE_KEY):
+        self.client = client
+        self.key = key
+
+    async def put(self, review_ids: Sequence[int]) -> None:
+        if review_ids:
+            now = time.time()
+            await self.client.zadd(self.key, {str(review_id): now for review_id in review_ids}, nx=True)
+
+    async def take(self, max_items: int) -> List[int]:
+        items = await self.client.zpopmin(self.key, max_items)
+        return [int(member) for member, _ in items or ()]
+
+
+class LocalModerationQueue:
+    """In-process stand-in for a single API process (and tests)"""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._queued = set()
+
+    async def put(self, review_ids: Sequence[int]) -> None:
+        for review_id in review_ids:
+            if review_id not in self._queued:
+                self._queued.add(review_id)
+                self._queue.put_nowait(review_id)
+
+    async def take(self, max_items: int) -> List[int]:
+        items = []
+        while len(items) < max_items and not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        self._queued.difference_update(items)
+        return items
+
+
+def create_moderation_queue(kind: Optional[str] = None):
+    if (kind or settings.moderation_queue) == "local":
+        return LocalModerationQueue()
+    return RedisModerationQueue(redis_client)
+
+
+moderation_queue = create_moderation_queue()
+
+
+def get_moderation_queue():
+    return moderation_queue
+
+
+async def submit_for_moderation(queue, review_id: int) -> bool:
+    """Enqueue a committed review within the request's latency budget.
+
+    Returns False when the queue is slow or down; the review stays pending
+    and unscored, so the next sweep picks it up.
+    """
+    try:
+        await asyncio.wait_for(queue.put([review_id]), settings.moderation_enqueue_timeout_ms / 1000)
+        return True
+    except (asyncio.TimeoutError, RedisError, OSError) as exc:
+        logger.warning("moderation enqueue failed for review %s: %r", review_id, exc)
+        return False
+
+
+def decide(score: ModerationScore) -> ReviewStatus:
+    worst = max(score.toxicity, score.spam)
+    if worst >= settings.moderation_reject_above:
+        return ReviewStatus.REJECTED
+    if worst < settings.moderation_approve_below:
+        return ReviewStatus.APPROVED
+    return ReviewStatus.PENDING  # Left for a human moderator
+
+
+async def moderate_batch(
+    db: AsyncSession,
+    scorer: Scorer,
+    review_ids: Sequence[int],
+    cache: Optional[ResponseCache] = None,
+) -> Dict[str, int]:
+    """Score and settle a batch of reviews; returns counts per outcome.
+
+    Scoring runs before any row is locked. The decision is applied only if
+    the review is still pending, unscored and has the text that was scored
+    (an edit re-enqueues it); rows locked by another worker are skipped.
+    """
+    pending = (await db.execute(
+        select(Review.id, Review.text).where(
+            Review.id.in_(set(review_ids)),
+            Review.status == ReviewStatus.PENDING,
+            Review.toxicity_score.is_(None),
+        )
+    )).all()
+    await db.rollback()  # Do not hold a snapshot open while scoring
+    if not pending:
+        return {}
+
+    scores = dict(zip((r.id for r in pending), await scorer.score([r.text for r in pending])))
+    texts = {r.id: r.text for r in pending}
+
+    outcomes: Dict[str, int] = {}
+    places = set()
+    reviews = (await db.scalars(
+        select(Review).where(Review.id.in_(scores)).with_for_update(skip_locked=True)
+    )).all()
+    for review in reviews:
+        if review.status != ReviewStatus.PENDING or review.toxicity_score is not None or review.text != texts[review.id]:
+            continue
+        score = scores[review.id]
+        status = decide(score)
+        review.toxicity_score = score.toxicity
+        review.spam_score = score.spam
+        if score.flags:
+            review.moderation_notes = "auto: " + ", ".join(score.flags)
+        if status != ReviewStatus.PENDING:
+            if await apply_review_transition(db, review, review.status, status):
+                places.add(review.place_id)
+            review.status = status
+        outcomes[status.value] = outcomes.get(status.value, 0) + 1
+    await db.commit()
+
+    if cache is not None:
+        for place_id in places:
+            await invalidate_place(cache, place_id)
+    return outcomes
+
+
+async def requeue_unscored(db: AsyncSession, queue, older_than: timedelta) -> Optional[int]:
+    """Put pending, unscored reviews last written before ``older_than`` (back) on the queue.
+
+    Fresher reviews were just enqueued by their request or are being scored.
+    Returns None when another process holds the sweep lock.
+    """
+    if not await db.scalar(select(func.pg_try_advisory_xact_lock(SWEEP_LOCK_ID))):
+        await db.rollback()
+        return None
+    try:
+        ids = list(await db.scalars(
+            select(Review.id).where(
+                Review.status == ReviewStatus.PENDING,
+                Review.toxicity_score.is_(None),
+                Review.updated_at < datetime.utcnow() - older_than,
+            )
+        ))
+        await queue.put(ids)
+    finally:
+        await db.rollback()  # Releases the lock
+    return len(ids)
+
+
+class ModerationWorkerPool:
+    """``workers`` asyncio tasks draining the queue in batches of ``batch_size``"""
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker,
+        queue,
+        scorer: Scorer,
+        cache: ResponseCache,
+        workers: int,
+        batch_size: int,
+        poll_interval: float = 0.2,
+        sweep_interval: float = 60.0,
+    ):
+        self.cache = cache
+        self.sessionmaker = sessionmaker
+        self.queue = queue
+        self.scorer = scorer
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.sweep_interval = sweep_interval
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._work(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _sweep(self) -> None:
+        while True:
+            try:
+                older_than = timedelta(seconds=self.sweep_interval)
+                async with self.sessionmaker() as db:
+                    requeued = await requeue_unscored(db, self.queue, older_than)
+                if requeued:
+                    logger.info("moderation sweep requeued %d reviews", requeued)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("moderation sweep failed")
+            await asyncio.sleep(self.sweep_interval)
+
+    async def _work(self, worker: int) -> None:
+        while True:
+            try:
+                ids = await self.queue.take(self.batch_size)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("moderation worker %d: queue read failed", worker)
+                await asyncio.sleep(self.poll_interval * 10)
+                continue
+            if not ids:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            try:
+                async with self.sessionmaker() as db:
+                    outcomes = await moderate_batch(db, self.scorer, ids, self.cache)
+                logger.info("moderation worker %d: %d reviews %s", worker, len(ids), outcomes)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # The reviews stay pending and unscored; the sweep retries them
+                logger.exception("moderation worker %d: batch of %d failed", worker, len(ids))
+                await asyncio.sleep(self.poll_interval * 10)
@@ -0,0 +1,39 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.geo import bounding_box, cell_ranges, haversine_m
+from app.models.place import Place, PlaceCategory
+
+
+async def find_nearby_places(
+    db: AsyncSession,
+    lat: float,
+    lng: float,
+    radius_m: float,
+    category: Optional[PlaceCategory] = None,
+    limit: int = 50,
+) -> List[Tuple[Place, float]]:
+    """Active places within radius_m of a point, nearest first, with distances in meters.
+
+    Candidates come from grid_cell range scans plus a bounding-box check, so
+    the exact distance is only computed for places around the point.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_m)
+    cells = or_(*(Place.grid_cell.between(lo, hi) for lo, hi in cell_ranges(lat, lng, radius_m)))
+
+    query = select(Place).where(
+        cells,
+        and_(Place.latitude.between(min_lat, max_lat), Place.longitude.between(min_lng, max_lng)),
+        Place.is_active == True,
+    )
+    if category:
+        query = query.where(Place.category == category)
+
+    result = await db.scalars(query)
+    hits = []
+    for place in result:
+        distance = haversine_m(lat, lng, place.latitude, place.longitude)
+        if distance <= radius_m:
+            hits.append((place, distance))
+    hits.sort(key=lambda hit: hit[1])
+    return hits[:limit]
@@ -0,0 +1,326 @@
+import hashlib
+import io
+import os
+import tarfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.place import Place
+from app.models.route import RouteTemplate
+from app.schemas.place import PlaceResponse
+from app.schemas.route import RouteTemplateResponse
+
+PACK_FORMAT = 1
+HASH_CHUNK = 1 << 20
+# Places are exported in shards by id range so one edited place only
+# changes one small object; id ranges keep shard boundaries stable
+PLACES_PER_SHARD = 500
+
+# Layout of the offline directory:
+#   objects/ab/abcdef...      content-addressed blobs (sha256 of the bytes)
+#   manifests/v3.json         full manifest of version 3
+#   deltas/v2-v3.json         what changed from version 2 to 3
+#   packs/v3.tar              manifest + every object of version 3
+#   packs/v2-v3.tar           delta + new manifest + objects added in version 3
+#   latest.json               version, pack_id and content_hash of the newest version
+#   hash-cache.json           (size, mtime_ns, sha256) per media file
+# Tars are uncompressed: media is already compressed and byte offsets stay
+# stable for Range resume.
+
+
+def sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def dumps(data) -> bytes:
+    # Sorted keys keep unchanged data byte-identical between builds
+    return orjson.dumps(data, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2)
+
+
+def pack_id(version: int, base: Optional[int] = None) -> str:
+    return f"v{version}" if base is None else f"v{base}-v{version}"
+
+
+class HashCache:
+    """File hashes keyed by path, trusted while size and mtime are unchanged"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, list] = orjson.loads(path.read_bytes()) if path.exists() else {}
+
+    def lookup(self, file: Path, stat: os.stat_result) -> Optional[str]:
+        entry = self.entries.get(str(file))
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        return None
+
+    def store(self, file: Path, stat: os.stat_result, digest: str) -> None:
+        self.entries[str(file)] = [stat.st_size, stat.st_mtime_ns, digest]
+
+    def save(self) -> None:
+        self.path.write_bytes(orjson.dumps(self.entries))
+
+
+def hash_files(files: Iterable[Path], cache: HashCache, workers: Optional[int] = None) -> Tuple[Dict[Path, str], int]:
+    """Hash files in a process pool, skipping those the cache still vouches for.
+
+    Returns the digests and the number of files that actually had to be read.
+    """
+    digests: Dict[Path, str] = {}
+    stale: List[Tuple[Path, os.stat_result]] = []
+    for file in files:
+        stat = file.stat()
+        digest = cache.lookup(file, stat)
+        if digest is None:
+            stale.append((file, stat))
+        else:
+            digests[file] = digest
+
+    if len(stale) == 1:
+        file, stat = stale[0]
+        digests[file] = sha256_file(str(file))
+        cache.store(file, stat, digests[file])
+    elif stale:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for (file, stat), digest in zip(stale, pool.map(sha256_file, [str(f) for f, _ in stale], chunksize=8)):
+                digests[file] = digest
+                cache.store(file, stat, digest)
+    return digests, len(stale)
+
+
+@dataclass
+class BuildResult:
+    version: int
+    pack_id: str
+    manifest: dict
+    delta: Optional[dict] = None
+    hashed_files: int = 0
+    new_objects: int = 0
+    missing: List[str] = field(default_factory=list)
+    files: List[str] = field(default_factory=list)  # Published files written by this build
+
+    @property
+    def unchanged(self) -> bool:
+        return self.delta is not None and not (self.delta["added"] or self.delta["changed"] or self.delta["removed"])
+
+
+async def export_catalog(db: AsyncSession) -> Tuple[Dict[str, bytes], List[str]]:
+    """Serialize active places (sharded) and route templates into pack files.
+
+    Also returns the media paths the places reference.
+    """
+    places = (await db.scalars(select(Place).where(Place.is_active == True).order_by(Place.id))).all()
+    routes = (await db.scalars(select(RouteTemplate).where(RouteTemplate.is_active == True).order_by(RouteTemplate.id))).all()
+
+    media: List[str] = []
+    for place in places:
+        media.extend(place.photos or [])
+        media.extend(url for url in (place.audio_url_ru, place.audio_url_en) if url)
+
+    shards: Dict[int, list] = {}
+    for place in places:
+        shards.setdefault(place.id // PLACES_PER_SHARD, []).append(
+            PlaceResponse.model_validate(place).model_dump(mode="json")
+        )
+    files = {f"data/places/{shard:05d}.json": dumps(items) for shard, items in shards.items()}
+    # Materialized stops, legs and polyline included, so clients need no route math offline
+    files["data/routes.json"] = dumps([RouteTemplateResponse.model_validate(r).model_dump(mode="json") for r in routes])
+    return files, media
+
+
+class OfflinePackBuilder:
+    """Builds versioned, content-addressed offline packs with deltas.
+
+    Every file of a version (catalog JSON shards and referenced images/audio) is
+    stored once under its sha256; a version is a manifest mapping pack paths
+    to digests. A new version is only cut when the manifest differs from the
+    latest one, and the delta lists exactly the objects a client must fetch.
+    """
+
+    def __init__(self, out_dir: Path, media_root: Path, workers: Optional[int] = None):
+        self.out_dir = out_dir
+        self.media_root = media_root.resolve()
+        self.workers = workers
+        for sub in ("objects", "manifests", "deltas", "packs"):
+            (out_dir / sub).mkdir(parents=True, exist_ok=True)
+
+    def object_path(self, digest: str) -> Path:
+        return self.out_dir / "objects" / digest[:2] / digest
+
+    def latest_version(self) -> int:
+        versions = [int(p.stem[1:]) for p in (self.out_dir / "manifests").glob("v*.json")]
+        return max(versions, default=0)
+
+    def load_manifest(self, version: int) -> Optional[dict]:
+        path = self.out_dir / "manifests" / f"{pack_id(version)}.json"
+        return orjson.loads(path.read_bytes()) if path.exists() else None
+
+    def _resolve_media(self, refs: Iterable[str]) -> Tuple[Dict[str, Path], List[str]]:
+        found: Dict[str, Path] = {}
+        missing: List[str] = []
+        for ref in sorted(set(refs)):
+            if "://" in ref:
+                continue  # remote URLs are fetched by the client directly
+            path = (self.media_root / ref.lstrip("/")).resolve()
+            if not path.is_relative_to(self.media_root) or not path.is_file():
+                missing.append(ref)
+                continue
+            found[ref.lstrip("/")] = path
+        return found, missing
+
+    def _put_bytes(self, data: bytes) -> Tuple[str, bool]:
+        digest = hashlib.sha256(data).hexdigest()
+        target = self.object_path(digest)
+        if target.exists():
+            return digest, False
+        target.parent.mkdir(exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(target)
+        return digest, True
+
+    def _put_file(self, path: Path, digest: str) -> bool:
+        target = self.object_path(digest)
+        if target.exists():
+            return False
+        target.parent.mkdir(exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        with path.open("rb") as src, tmp.open("wb") as dst:
+            for chunk in iter(lambda: src.read(HASH_CHUNK), b""):
+                dst.write(chunk)
+        tmp.replace(target)
+        return True
+
+    async def build(self, db: AsyncSession, force: bool = False) -> BuildResult:
+        data_files, media_refs = await export_catalog(db)
+        media, missing = self._resolve_media(media_refs)
+
+        cache = HashCache(self.out_dir / "hash-cache.json")
+        digests, hashed = hash_files(media.values(), cache, self.workers)
+        cache.save()
+
+        entries: Dict[str, dict] = {}
+        new_objects = 0
+        for name, data in data_files.items():
+            digest, created = self._put_bytes(data)
+            entries[name] = {"sha256": digest, "size": len(data)}
+            new_objects += created
+        for ref, path in media.items():
+            digest = digests[path]
+            new_objects += self._put_file(path, digest)
+            entries[ref] = {"sha256": digest, "size": path.stat().st_size}
+
+        content_hash = hashlib.sha256(dumps(entries)).hexdigest()
+        previous_version = self.latest_version()
+        previous = self.load_manifest(previous_version) if previous_version else None
+        if previous and previous["content_hash"] == content_hash and not force:
+            return BuildResult(
+                version=previous_version,
+                pack_id=previous["pack_id"],
+                manifest=previous,
+                delta=diff_manifests(previous, previous),
+                hashed_files=hashed,
+                missing=missing,
+            )
+
+        version = previous_version + 1
+        manifest = {
+            "format": PACK_FORMAT,
+            "version": version,
+            "pack_id": pack_id(version),
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "content_hash": content_hash,
+            "size": sum(e["size"] for e in entries.values()),
+            "entries": entries,
+            "missing": missing,
+        }
+        manifest_bytes = dumps(manifest)
+        (self.out_dir / "manifests" / f"{manifest['pack_id']}.json").write_bytes(manifest_bytes)
+        self._write_tar(self.out_dir / "packs" / f"{manifest['pack_id']}.tar", manifest_bytes, entries.values())
+
+        files = [f"manifests/{manifest['pack_id']}.json", f"packs/{manifest['pack_id']}.tar"]
+
+        delta = None
+        if previous:
+            delta = diff_manifests(previous, manifest)
+            delta_bytes = dumps(delta)
+            (self.out_dir / "deltas" / f"{delta['pack_id']}.json").write_bytes(delta_bytes)
+            fetch = [{"sha256": d} for d in delta["objects"]]
+            self._write_tar(
+                self.out_dir / "packs" / f"{delta['pack_id']}.tar",
+                manifest_bytes,
+                fetch,
+                extra={"delta.json": delta_bytes},
+            )
+            files += [f"deltas/{delta['pack_id']}.json", f"packs/{delta['pack_id']}.tar"]
+
+        # Written last so readers never see a version whose files are incomplete
+        (self.out_dir / "latest.json").write_bytes(dumps({
+            "version": version,
+            "pack_id": manifest["pack_id"],
+            "content_hash": content_hash,
+        }))
+        files.append("latest.json")
+
+        return BuildResult(
+            version=version,
+            pack_id=manifest["pack_id"],
+            manifest=manifest,
+            delta=delta,
+            hashed_files=hashed,
+            new_objects=new_objects,
+            missing=missing,
+            files=files,
+        )
+
+    def _write_tar(self, path: Path, manifest: bytes, entries: Iterable[dict], extra: Optional[Dict[str, bytes]] = None) -> None:
+        tmp = path.with_suffix(".tmp")
+        with tarfile.open(tmp, "w") as tar:
+            files = {"manifest.json": manifest, **(extra or {})}
+            for name, data in files.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = 0
+                tar.addfile(info, io.BytesIO(data))
+            for digest in sorted({e["sha256"] for e in entries}):
+                info = tar.gettarinfo(str(self.object_path(digest)), arcname=f"objects/{digest[:2]}/{digest}")
+                info.mtime, info.uid, info.gid, info.uname, info.gname = 0, 0, 0, "", ""
+                with self.object_path(digest).open("rb") as f:
+                    tar.addfile(info, f)
+        tmp.replace(path)
+
+
+def diff_manifests(old: dict, new: dict) -> dict:
+    """Paths added/changed/removed between two manifests and the objects to fetch"""
+    old_entries, new_entries = old["entries"], new["entries"]
+    added = {p: e for p, e in new_entries.items() if p not in old_entries}
+    changed = {p: e for p, e in new_entries.items() if p in old_entries and old_entries[p]["sha256"] != e["sha256"]}
+    removed = sorted(p for p in old_entries if p not in new_entries)
+
+    known = {e["sha256"] for e in old_entries.values()}
+    objects = sorted({e["sha256"] for e in (*added.values(), *changed.values())} - known)
+    sizes = {e["sha256"]: e["size"] for e in new_entries.values()}
+    return {
+        "format": PACK_FORMAT,
+        "pack_id": pack_id(new["version"], old["version"]),
+        "from_version": old["version"],
+        "to_version": new["version"],
+        "from_content_hash": old["content_hash"],
+        "to_content_hash": new["content_hash"],
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "objects": objects,
+        "size": sum(sizes[d] for d in objects),
+    }
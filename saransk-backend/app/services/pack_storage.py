@@ -0,0 +1,153 @@
+import asyncio
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import anyio
+
+from app.core.config import settings
+
+CHUNK_SIZE = 256 * 1024
+
+# Names are relative to the offline directory layout (see app.services.offline):
+# "packs/v3.tar", "manifests/v3.json", "deltas/v2-v3.json", "latest.json"
+
+
+class LocalPackStorage:
+    """Offline packs on the local filesystem (OFFLINE_DIR)"""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _path(self, name: str) -> Path:
+        return self.root / name
+
+    async def size(self, name: str) -> Optional[int]:
+        path = anyio.Path(self._path(name))
+        try:
+            return (await path.stat()).st_size
+        except FileNotFoundError:
+            return None
+
+    async def read(self, name: str) -> Optional[bytes]:
+        try:
+            return await anyio.Path(self._path(name)).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    async def iter_range(self, name: str, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Yield bytes start..end (inclusive) without loading the file"""
+        async with await anyio.open_file(self._path(name), "rb") as f:
+            await f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    async def upload(self, name: str, path: Path) -> None:
+        pass  # Builder output already lives here
+
+    async def aclose(self) -> None:
+        pass
+
+
+class S3PackStorage:
+    """Offline packs in the S3 bucket (MinIO locally) under a key prefix.
+
+    One aioboto3 client is opened lazily and kept for the process lifetime;
+    ranged GETs are streamed to the caller chunk by chunk.
+    """
+
+    def __init__(self, bucket: str, prefix: str, **client_kwargs):
+        import aioboto3
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self._session = aioboto3.Session()
+        self._client_kwargs = client_kwargs
+        self._client = None
+        self._stack = AsyncExitStack()
+        self._lock = asyncio.Lock()
+
+    async def _s3(self):
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    self._client = await self._stack.enter_async_context(
+                        self._session.client("s3", **self._client_kwargs)
+                    )
+        return self._client
+
+    def _key(self, name: str) -> str:
+        return self.prefix + name
+
+    @staticmethod
+    def _not_found(exc) -> bool:
+        return exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    async def size(self, name: str) -> Optional[int]:
+        from botocore.exceptions import ClientError
+
+        s3 = await self._s3()
+        try:
+            head = await s3.head_object(Bucket=self.bucket, Key=self._key(name))
+        except ClientError as exc:
+            if self._not_found(exc):
+                return None
+            raise
+        return head["ContentLength"]
+
+    async def read(self, name: str) -> Optional[bytes]:
+        from botocore.exceptions import ClientError
+
+        s3 = await self._s3()
+        try:
+            obj = await s3.get_object(Bucket=self.bucket, Key=self._key(name))
+        except ClientError as exc:
+            if self._not_found(exc):
+                return None
+            raise
+        async with obj["Body"] as body:
+            return await body.read()
+
+    async def iter_range(self, name: str, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        s3 = await self._s3()
+        obj = await s3.get_object(Bucket=self.bucket, Key=self._key(name), Range=f"bytes={start}-{end}")
+        # Entering the body yields the raw aiohttp response, which has no
+        # iter_chunks(): keep the StreamingBody and only close it through the context
+        body = obj["Body"]
+        async with body:
+            async for chunk in body.iter_chunks(chunk_size):
+                yield chunk
+
+    async def upload(self, name: str, path: Path) -> None:
+        # Managed transfer: large archives go up as multipart uploads
+        s3 = await self._s3()
+        await s3.upload_file(str(path), self.bucket, self._key(name))
+
+    async def aclose(self) -> None:
+        await self._stack.aclose()
+        self._client = None
+
+
+def create_pack_storage(kind: Optional[str] = None):
+    if (kind or settings.offline_storage) == "s3":
+        return S3PackStorage(
+            settings.s3_bucket,
+            settings.offline_s3_prefix,
+            endpoint_url=settings.s3_endpoint,
+            region_name=settings.s3_region,
+            aws_access_key_id=settings.s3_access_key,
+            aws_secret_access_key=settings.s3_secret_key,
+        )
+    return LocalPackStorage(Path(settings.offline_dir))
+
+
+pack_storage = create_pack_storage()
+
+
+def get_pack_storage():
+    return pack_storage
@@ -0,0 +1,129 @@
+"""Sparse place representations for list endpoints.
+
+A PlaceProjection turns ``view=compact|map``, ``fields=`` and ``lang=``
+into the output keys of each place and the few table columns they need, so
+the list query selects only those columns (no ORM entities, no long
+descriptions or opening hours for map pins) and rows become plain dicts
+without a pass through PlaceResponse.
+
+Localized fields are named without their suffix (``title``, ``address``,
+...): without ``lang`` they expand to both ``title_ru`` and ``title_en``,
+with ``lang`` they become a single ``title`` in that language. Suffixed
+names (``title_en``) may also be requested directly.
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Column
+
+from app.core.images import PhotoSize, pick_variant
+from app.models.place import Place
+from app.schemas.place import (
+    PlaceCompactResponse, PlaceMapResponse, PlaceResponse, PlaceView, SearchLang,
+)
+
+LOCALIZED = ("title", "description", "address", "audio_url")
+LANGS = tuple(lang.value for lang in SearchLang)
+# Array columns PlaceResponse returns as [] when NULL
+LIST_COLUMNS = {"tags", "photos"}
+
+
+def _thumbnails(row, size: PhotoSize) -> List[str]:
+    variants = row["photo_variants"] or {}
+    return [pick_variant(variants.get(url), size) or url for url in row["photos"] or ()]
+
+
+def _thumbnail(row, size: PhotoSize) -> Optional[str]:
+    photos = row["photos"]
+    if not photos:
+        return None
+    return pick_variant((row["photo_variants"] or {}).get(photos[0]), size) or photos[0]
+
+
+# Output fields computed from columns: (columns needed, function of the row)
+DERIVED: Dict[str, Tuple[Tuple[str, ...], Callable[[Any, PhotoSize], Any]]] = {
+    "thumbnails": (("photos", "photo_variants"), _thumbnails),
+    "thumbnail": (("photos", "photo_variants"), _thumbnail),
+}
+
+
+def _collapse(names: Sequence[str]) -> Tuple[str, ...]:
+    """Field names with localized pairs folded into their unsuffixed name, in order"""
+    folded: List[str] = []
+    for name in names:
+        base = _localized_base(name) or name
+        if base not in folded:
+            folded.append(base)
+    return tuple(folded)
+
+
+def _localized_base(name: str) -> Optional[str]:
+    base, _, suffix = name.rpartition("_")
+    return base if base in LOCALIZED and suffix in LANGS else None
+
+
+VIEW_FIELDS = {
+    PlaceView.FULL: _collapse([name for name in PlaceResponse.model_fields if name != "photo_variants"]),
+    PlaceView.COMPACT: _collapse(list(PlaceCompactResponse.model_fields)),
+    PlaceView.MAP: _collapse(list(PlaceMapResponse.model_fields)),
+}
+FIELD_NAMES = set(VIEW_FIELDS[PlaceView.FULL]) | set(DERIVED) | {
+    f"{base}_{lang}" for base in LOCALIZED for lang in LANGS
+}
+
+
+class PlaceProjection:
+    """Output keys and selected columns for one (view, fields, lang) combination.
+
+    Raises ValueError naming the unknown entries of ``fields``.
+    """
+
+    def __init__(self, view: PlaceView, fields: Optional[str], lang: Optional[SearchLang], photo_size: PhotoSize):
+        names = [name.strip() for name in fields.split(",") if name.strip()] if fields else VIEW_FIELDS[view]
+        unknown = [name for name in names if name not in FIELD_NAMES]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        # Output key -> column name, or a derived field
+        self.outputs: Dict[str, str] = {"id": "id"}
+        for name in names:
+            base = _localized_base(name)
+            if name in LOCALIZED:
+                if lang is not None:
+                    self.outputs[name] = f"{name}_{lang.value}"
+                else:
+                    for code in LANGS:
+                        self.outputs[f"{name}_{code}"] = f"{name}_{code}"
+            elif base is not None and lang is not None:
+                self.outputs[base] = f"{base}_{lang.value}"
+            else:
+                self.outputs[name] = name
+
+        needed: List[str] = []
+        for source in self.outputs.values():
+            for column in DERIVED[source][0] if source in DERIVED else (source,):
+                if column not in needed:
+                    needed.append(column)
+        self.column_names = needed
+        self.photo_size = photo_size
+
+    @property
+    def key(self) -> str:
+        """Cache key / ETag part: projections with the same output share it"""
+        return ",".join(f"{out}={source}" for out, source in self.outputs.items())
+
+    def columns(self, *extra: Column) -> list:
+        """Table columns to select, plus ``extra`` ones (sort keys) not already among them"""
+        table = Place.__table__.c
+        selected = [table[name] for name in self.column_names]
+        return selected + [c for c in extra if c.key not in self.column_names]
+
+    def project(self, row) -> Dict[str, Any]:
+        """One row (a RowMapping of ``columns()``) as its output dict"""
+        place = {}
+        for out, source in self.outputs.items():
+            if source in DERIVED:
+                place[out] = DERIVED[source][1](row, self.photo_size)
+            else:
+                value = row[source]
+                place[out] = [] if value is None and source in LIST_COLUMNS else value
+        return place
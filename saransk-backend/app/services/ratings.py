@@ -0,0 +1,91 @@
+from typing import Optional
+from sqlalchemy import case, func, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.place import Place
+from app.models.review import Review, ReviewStatus
+
+
+def _avg(total, count):
+    return case((count > 0, total / count), else_=0.0)
+
+
+async def apply_review_transition(
+    db: AsyncSession,
+    review: Review,
+    old_status: Optional[ReviewStatus],
+    new_status: Optional[ReviewStatus],
+) -> bool:
+    """Adjust the place's running sums when a review moves into or out of APPROVED.
+
+    ``None`` stands for a review that does not exist (created or deleted).
+    Runs as one atomic UPDATE in the caller's transaction; commit it together
+    with the status change. Returns True if the place aggregates changed.
+    """
+    was_counted = old_status == ReviewStatus.APPROVED
+    is_counted = new_status == ReviewStatus.APPROVED
+    if was_counted == is_counted:
+        return False
+
+    sign = 1 if is_counted else -1
+    count = func.coalesce(Place.reviews_count, 0) + sign
+    interest = Place.rating_interest_sum + sign * review.rating_interest
+    informativeness = Place.rating_informativeness_sum + sign * review.rating_informativeness
+    convenience = Place.rating_convenience_sum + sign * review.rating_convenience
+
+    # SET expressions all see the pre-update row, so averages use the new sums
+    await db.execute(
+        update(Place)
+        .where(Place.id == review.place_id)
+        .values(
+            reviews_count=count,
+            rating_interest_sum=interest,
+            rating_informativeness_sum=informativeness,
+            rating_convenience_sum=convenience,
+            rating_interest=_avg(interest, count),
+            rating_informativeness=_avg(informativeness, count),
+            rating_convenience=_avg(convenience, count),
+            rating_overall=_avg((interest + informativeness + convenience) / 3, count),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return True
+
+
+RECONCILE_SQL = """
+UPDATE places AS p
+SET reviews_count = a.n,
+    rating_interest_sum = a.interest,
+    rating_informativeness_sum = a.informativeness,
+    rating_convenience_sum = a.convenience,
+    rating_interest = CASE WHEN a.n > 0 THEN a.interest / a.n ELSE 0 END,
+    rating_informativeness = CASE WHEN a.n > 0 THEN a.informativeness / a.n ELSE 0 END,
+    rating_convenience = CASE WHEN a.n > 0 THEN a.convenience / a.n ELSE 0 END,
+    rating_overall = CASE WHEN a.n > 0
+        THEN (a.interest + a.informativeness + a.convenience) / 3 / a.n ELSE 0 END,
+    updated_at = now() AT TIME ZONE 'utc'
+FROM (
+    SELECT pl.id,
+           count(r.id) AS n,
+           coalesce(sum(r.rating_interest), 0) AS interest,
+           coalesce(sum(r.rating_informativeness), 0) AS informativeness,
+           coalesce(sum(r.rating_convenience), 0) AS convenience
+    FROM places pl
+    LEFT JOIN reviews r ON r.place_id = pl.id AND r.status = 'approved'
+    GROUP BY pl.id
+) AS a
+WHERE p.id = a.id
+  AND (p.reviews_count IS DISTINCT FROM a.n
+       OR abs(p.rating_interest_sum - a.interest) > 1e-6
+       OR abs(p.rating_informativeness_sum - a.informativeness) > 1e-6
+       OR abs(p.rating_convenience_sum - a.convenience) > 1e-6)
+"""
+
+
+async def reconcile_place_ratings(db: AsyncSession) -> int:
+    """Recompute every place's aggregates in one grouped query to repair drift.
+
+    Only places whose stored sums disagree with their approved reviews are
+    rewritten. Returns the number of repaired places; the caller commits.
+    """
+    result = await db.execute(text(RECONCILE_SQL))
+    return result.rowcount
@@ -0,0 +1,300 @@
+"""Personalized place recommendations.
+
+Active places are held in a compact in-process index: NumPy columns for
+position, category/subcategory codes, price tier, accessibility, rating and
+review count, plus the few display fields a recommendation shows. A
+request is scored with a handful of vectorized passes and cut to the top k
+with argpartition, without querying places.
+
+The index follows the catalog incrementally through the sync change log:
+at most every ``refresh_seconds`` (or on the next request after a place
+write in this process) it reads the place ids changed since its last
+horizon, rating updates from review moderation included, reloads only those
+rows and patches them in place. A full rebuild every ``rebuild_seconds``
+drops the rows of deactivated places.
+"""
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.images import PhotoSize, pick_variant
+from app.models.place import Place, PlaceCategory, PlaceSubcategory, PriceTier
+from app.services.routing import point_walk_m
+from app.services.sync import changed_ids, current_horizon
+
+CATEGORIES = list(PlaceCategory)
+SUBCATEGORIES = list(PlaceSubcategory)
+PRICE_TIERS = list(PriceTier)
+CATEGORY_CODE = {c: i for i, c in enumerate(CATEGORIES)}
+SUBCATEGORY_CODE = {c: i for i, c in enumerate(SUBCATEGORIES)}
+PRICE_TIER_CODE = {t: i for i, t in enumerate(PRICE_TIERS)}
+
+# Score = weighted sum of terms in [0, 1]
+INTEREST_WEIGHT = 0.45
+RATING_WEIGHT = 0.25
+DISTANCE_WEIGHT = 0.2
+POPULARITY_WEIGHT = 0.1
+# Interest match of a place whose category (not subcategory) is among the interests
+CATEGORY_MATCH = 0.6
+# Ratings are shrunk towards this prior, worth this many reviews, so a single
+# 5-star review does not outrank a well-reviewed 4.6
+PRIOR_RATING = 3.5
+PRIOR_REVIEWS = 5
+# Walking meters at which the distance term falls to 1/e
+DISTANCE_SCALE_M = 1500.0
+
+INITIAL_CAPACITY = 1024
+
+COLUMNS = (
+    Place.id, Place.latitude, Place.longitude, Place.category, Place.subcategory, Place.price_tier,
+    Place.wheelchair_accessible, Place.rating_overall, Place.reviews_count, Place.title_ru, Place.title_en,
+    Place.photos, Place.photo_variants, Place.is_active,
+)
+
+
+@dataclass(frozen=True)
+class Recommendation:
+    row: int
+    score: float
+    distance_m: Optional[float]
+
+
+class PlaceIndex:
+    """Columnar snapshot of active places, patchable row by row.
+
+    Rows of removed places stay allocated with ``active`` cleared until the
+    next full build; new places are appended (arrays grow by doubling).
+    """
+
+    ARRAYS = ("ids", "lat", "lng", "category", "subcategory", "price_tier", "wheelchair", "rating", "reviews",
+              "active")
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.size = 0
+        self.rows: Dict[int, int] = {}  # place id -> row
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.lat = np.zeros(capacity, dtype=np.float64)
+        self.lng = np.zeros(capacity, dtype=np.float64)
+        self.category = np.zeros(capacity, dtype=np.int8)
+        self.subcategory = np.zeros(capacity, dtype=np.int16)
+        self.price_tier = np.zeros(capacity, dtype=np.int8)
+        self.wheelchair = np.zeros(capacity, dtype=bool)
+        self.rating = np.zeros(capacity, dtype=np.float32)
+        self.reviews = np.zeros(capacity, dtype=np.int32)
+        self.active = np.zeros(capacity, dtype=bool)
+        # Display fields: (title_ru, title_en) and (first photo, its variants) per row
+        self.titles: List[Optional[tuple]] = [None] * capacity
+        self.photos: List[Optional[tuple]] = [None] * capacity
+        self.horizon = 0  # Sync log horizon the rows are current to
+        self.built_at = time.monotonic()
+        self.refreshed_at = self.built_at
+
+    @property
+    def capacity(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the NumPy columns (display fields not included)"""
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def _grow(self) -> None:
+        capacity = self.capacity * 2
+        for name in self.ARRAYS:
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+        self.titles.extend([None] * (capacity - len(self.titles)))
+        self.photos.extend([None] * (capacity - len(self.photos)))
+
+    def upsert(self, place) -> None:
+        """Store a row of ``COLUMNS`` (active place)"""
+        row = self.rows.get(place.id)
+        if row is None:
+            if self.size == self.capacity:
+                self._grow()
+            row = self.size
+            self.size += 1
+            self.rows[place.id] = row
+            self.ids[row] = place.id
+        self.lat[row] = place.latitude
+        self.lng[row] = place.longitude
+        self.category[row] = CATEGORY_CODE[place.category]
+        self.subcategory[row] = SUBCATEGORY_CODE[place.subcategory]
+        self.price_tier[row] = PRICE_TIER_CODE[place.price_tier or PriceTier.FREE]
+        self.wheelchair[row] = bool(place.wheelchair_accessible)
+        self.rating[row] = place.rating_overall or 0.0
+        self.reviews[row] = place.reviews_count or 0
+        self.active[row] = True
+        self.titles[row] = (place.title_ru, place.title_en)
+        photo = place.photos[0] if place.photos else None
+        self.photos[row] = (photo, (place.photo_variants or {}).get(photo)) if photo else None
+
+    def remove(self, place_id: int) -> None:
+        row = self.rows.get(place_id)
+        if row is not None:
+            self.active[row] = False
+
+    def apply(self, places: Iterable[Any], ids: Sequence[int] = ()) -> None:
+        """Patch rows from fresh ``COLUMNS`` rows; ``ids`` without a row are gone"""
+        seen = set()
+        for place in places:
+            seen.add(place.id)
+            if place.is_active:
+                self.upsert(place)
+            else:
+                self.remove(place.id)
+        for place_id in ids:
+            if place_id not in seen:
+                self.remove(place_id)
+
+    def recommend(
+        self,
+        interests: Sequence[str],
+        preferences: Dict[str, Any],
+        limit: int,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+    ) -> List[Recommendation]:
+        """Top ``limit`` active places for a user, best first"""
+        n = self.size
+        if n == 0:
+            return []
+
+        wanted = set(interests)
+        category_match = np.array(
+            [CATEGORY_MATCH if c.value in wanted else 0.0 for c in CATEGORIES], dtype=np.float32
+        )
+        subcategory_match = np.array([1.0 if s.value in wanted else 0.0 for s in SUBCATEGORIES], dtype=np.float32)
+        interest = np.maximum(category_match[self.category[:n]], subcategory_match[self.subcategory[:n]])
+
+        reviews = self.reviews[:n]
+        rating = (self.rating[:n] * reviews + PRIOR_RATING * PRIOR_REVIEWS) / (reviews + PRIOR_REVIEWS) / 5
+        popularity = np.log1p(reviews) / math.log1p(max(int(reviews.max()), 1))
+
+        score = INTEREST_WEIGHT * interest + RATING_WEIGHT * rating + POPULARITY_WEIGHT * popularity
+        distance = None
+        if lat is not None and lng is not None:
+            distance = point_walk_m(lat, lng, self.lat[:n], self.lng[:n])
+            score += DISTANCE_WEIGHT * np.exp(-distance / DISTANCE_SCALE_M)
+
+        allowed = self.active[:n].copy()
+        if preferences.get("wheelchair_accessible"):
+            allowed &= self.wheelchair[:n]
+        tiers = [PRICE_TIER_CODE[t] for t in map(_price_tier, preferences.get("price_tiers") or ()) if t]
+        if tiers:
+            allowed &= np.isin(self.price_tier[:n], tiers)
+        score = np.where(allowed, score, -np.inf)
+
+        k = min(limit, int(allowed.sum()))
+        if k == 0:
+            return []
+        top = np.argpartition(-score, k - 1)[:k]
+        # Best first; ties by place id, so pages are stable
+        top = top[np.lexsort((self.ids[top], -score[top]))]
+        return [
+            Recommendation(int(row), float(score[row]), float(distance[row]) if distance is not None else None)
+            for row in top
+        ]
+
+    def item(self, rec: Recommendation, size: PhotoSize) -> dict:
+        """Response dict of one recommendation (see PlaceRecommendation)"""
+        row = rec.row
+        title_ru, title_en = self.titles[row]
+        photo = self.photos[row]
+        return {
+            "id": int(self.ids[row]),
+            "title_ru": title_ru,
+            "title_en": title_en,
+            "category": CATEGORIES[self.category[row]].value,
+            "subcategory": SUBCATEGORIES[self.subcategory[row]].value,
+            "latitude": float(self.lat[row]),
+            "longitude": float(self.lng[row]),
+            "rating_overall": float(self.rating[row]),
+            "reviews_count": int(self.reviews[row]),
+            "thumbnail": (pick_variant(photo[1], size) or photo[0]) if photo else None,
+            "distance_m": round(rec.distance_m, 1) if rec.distance_m is not None else None,
+            "score": round(rec.score, 4),
+        }
+
+
+def _price_tier(value) -> Optional[PriceTier]:
+    try:
+        return PriceTier(value)
+    except ValueError:
+        return None
+
+
+async def build_place_index(db: AsyncSession) -> PlaceIndex:
+    # Horizon first: changes of transactions at or above it are replayed by the next refresh
+    horizon = await current_horizon(db)
+    rows = (await db.execute(select(*COLUMNS).where(Place.is_active == True).order_by(Place.id))).all()
+    index = PlaceIndex(max(INITIAL_CAPACITY, 1 << max(len(rows) - 1, 0).bit_length()))
+    index.apply(rows)
+    index.horizon = horizon
+    return index
+
+
+async def refresh_place_index(db: AsyncSession, index: PlaceIndex) -> int:
+    """Patch the rows of places changed since the index horizon; returns how many"""
+    horizon = await current_horizon(db)
+    ids = await changed_ids(db, "place", index.horizon, horizon)
+    if ids:
+        rows = (await db.execute(select(*COLUMNS).where(Place.id.in_(ids)))).all()
+        index.apply(rows, ids)
+    index.horizon = horizon
+    index.refreshed_at = time.monotonic()
+    return len(ids)
+
+
+class PlaceIndexCache:
+    """Process-wide recommendation index.
+
+    Place writes in this process call mark_stale() so the next request
+    catches up right away; other workers' writes and rating changes are
+    picked up within refresh_seconds.
+    """
+
+    def __init__(self, refresh_seconds: float, rebuild_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._index: Optional[PlaceIndex] = None
+        self._stale = False
+        self._lock = asyncio.Lock()
+
+    def mark_stale(self) -> None:
+        self._stale = True
+
+    def _fresh(self, index: Optional[PlaceIndex]) -> bool:
+        return (
+            index is not None and not self._stale
+            and time.monotonic() - index.refreshed_at < self.refresh_seconds
+        )
+
+    async def get(self, db: AsyncSession) -> PlaceIndex:
+        index = self._index
+        if self._fresh(index):
+            return index
+        async with self._lock:
+            index = self._index
+            if index is None or time.monotonic() - index.built_at >= self.rebuild_seconds:
+                self._stale = False
+                self._index = await build_place_index(db)
+            elif not self._fresh(index):
+                self._stale = False
+                await refresh_place_index(db, index)
+            return self._index
+
+
+place_index_cache = PlaceIndexCache(
+    refresh_seconds=settings.recommendations_refresh_seconds,
+    rebuild_seconds=settings.recommendations_rebuild_seconds,
+)
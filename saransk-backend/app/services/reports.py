@@ -0,0 +1,77 @@
+"""Review reports: one per user, counted and acted on atomically.
+
+A report is a single statement: insert the reporter row (a duplicate
+inserts nothing and so changes nothing), bump ``reports_count`` relative to
+the locked row and hide the review once it reaches REPORTS_TO_HIDE, all in
+one UPDATE ... RETURNING. Concurrent reports of a review serialize on its
+row lock, so none is lost and exactly one of them performs the hide.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.review import ReviewStatus
+from app.services.ratings import apply_review_transition
+
+REPORTS_TO_HIDE = 3
+
+REPORT_SQL = text("""
+WITH report AS (
+    INSERT INTO review_reports (review_id, user_id, reason, created_at)
+    SELECT id, :user_id, :reason, timezone('utc', now()) FROM reviews WHERE id = :review_id
+    ON CONFLICT DO NOTHING
+    RETURNING review_id
+), prev AS (
+    -- Locks the review; waiting reporters re-read the status their
+    -- predecessor committed, so old_status below is never stale
+    SELECT r.id, r.status FROM reviews AS r JOIN report ON report.review_id = r.id
+    FOR NO KEY UPDATE OF r
+)
+UPDATE reviews AS r
+SET reports_count = r.reports_count + 1,
+    status = CASE WHEN r.reports_count + 1 >= :threshold AND r.status <> 'hidden'
+                  THEN 'hidden'::reviewstatus ELSE r.status END,
+    updated_at = timezone('utc', now())
+FROM prev
+WHERE r.id = prev.id
+RETURNING r.id, r.place_id, r.reports_count, r.status, prev.status AS old_status,
+          r.rating_interest, r.rating_informativeness, r.rating_convenience
+""")
+
+
+@dataclass
+class ReportResult:
+    place_id: int
+    reports_count: int
+    status: ReviewStatus
+    hidden: bool  # This report hid the review
+    ratings_changed: bool
+
+
+async def record_report(db: AsyncSession, review_id: int, user_id: int, reason: str) -> Optional[ReportResult]:
+    """Record ``user_id``'s report of a review; the caller commits.
+
+    Returns None if the review does not exist or the user already reported
+    it. A review hidden while approved leaves its place's rating in the same
+    transaction.
+    """
+    row = (await db.execute(REPORT_SQL, {
+        "review_id": review_id,
+        "user_id": user_id,
+        "reason": reason,
+        "threshold": REPORTS_TO_HIDE,
+    })).one_or_none()
+    if row is None:
+        return None
+
+    old_status, status = ReviewStatus(row.old_status), ReviewStatus(row.status)
+    ratings_changed = await apply_review_transition(db, row, old_status, status)
+    return ReportResult(
+        place_id=row.place_id,
+        reports_count=row.reports_count,
+        status=status,
+        hidden=status != old_status,
+        ratings_changed=ratings_changed,
+    )
@@ -0,0 +1,399 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.geo import EARTH_RADIUS_M
+from app.core.hours import WEEK_MIN, Intervals, is_open_for
+from app.models.place import Place, PlaceCategory
+
+# Straight-line distance times this factor approximates the street network
+WALK_DETOUR_FACTOR = 1.3
+WALK_SPEED_M_PER_MIN = 75.0  # 4.5 km/h
+
+DWELL_MINUTES: Dict[PlaceCategory, float] = {
+    PlaceCategory.MONUMENT: 15,
+    PlaceCategory.ARCHITECTURE: 30,
+    PlaceCategory.FOOD: 45,
+    PlaceCategory.SOUVENIR: 20,
+}
+
+# Re-plans allowed when a planned stop turns out to be closed at its arrival time
+MAX_REPLANS = 3
+
+
+def pairwise_walk_m(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    """Vectorized haversine walking-distance matrix (meters, float32)"""
+    phi = np.radians(lat)[:, None]
+    lmb = np.radians(lng)[:, None]
+    dphi = phi - phi.T
+    dlmb = lmb - lmb.T
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi) * np.cos(phi.T) * np.sin(dlmb / 2) ** 2
+    dist = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return (dist * WALK_DETOUR_FACTOR).astype(np.float32)
+
+
+def point_walk_m(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Walking distance from one point to many (meters)"""
+    phi1, phi2 = np.radians(lat), np.radians(lats)
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lngs - lng) / 2) ** 2
+    return (2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0))) * WALK_DETOUR_FACTOR).astype(np.float32)
+
+
+@dataclass(frozen=True)
+class DistanceMatrix:
+    """Snapshot of active places with their pairwise walking distances"""
+
+    ids: np.ndarray            # int64 place ids, row order of the matrix
+    lat: np.ndarray
+    lng: np.ndarray
+    category: np.ndarray       # object array of category values
+    subcategory: np.ndarray    # object array of subcategory values
+    rating: np.ndarray         # float32 rating_overall
+    dwell: np.ndarray          # float32 minutes spent at each place
+    titles: List[tuple]        # (title_ru, title_en) per row
+    hours: List[Optional[Intervals]]  # week-minute opening intervals per row, None = unknown
+    hours_row: np.ndarray      # flat interval arrays over all rows, for vectorized checks
+    hours_start: np.ndarray
+    hours_end: np.ndarray
+    dist: np.ndarray           # (n, n) float32 walking meters
+    built_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    def open_minutes(self, window_start: float, window_end: float) -> np.ndarray:
+        """Minutes each place is open within a week-minute window (inf when hours are unknown)"""
+        total = np.zeros(self.size, dtype=np.float64)
+        # The window may run past Sunday midnight into next week's intervals
+        for shift in (0, WEEK_MIN):
+            overlap = (
+                np.minimum(self.hours_end + shift, window_end) - np.maximum(self.hours_start + shift, window_start)
+            )
+            total += np.bincount(self.hours_row, weights=np.clip(overlap, 0, None), minlength=self.size)
+        unknown = np.array([h is None for h in self.hours], dtype=bool)
+        total[unknown] = np.inf
+        return total
+
+
+async def load_distance_matrix(db: AsyncSession) -> DistanceMatrix:
+    rows = (await db.execute(
+        select(
+            Place.id, Place.latitude, Place.longitude, Place.category, Place.subcategory,
+            Place.rating_overall, Place.title_ru, Place.title_en, Place.open_intervals,
+        ).where(Place.is_active == True).order_by(Place.id)
+    )).all()
+
+    lat = np.array([r.latitude for r in rows], dtype=np.float64)
+    lng = np.array([r.longitude for r in rows], dtype=np.float64)
+    category = np.array([r.category.value for r in rows], dtype=object)
+    hours = [
+        None if r.open_intervals is None else [(rng.lower, rng.upper) for rng in r.open_intervals]
+        for r in rows
+    ]
+    flat = [(row, lo, hi) for row, intervals in enumerate(hours) for lo, hi in intervals or ()]
+    hours_row, hours_start, hours_end = (
+        np.array(column, dtype=np.int64) for column in (zip(*flat) if flat else ((), (), ()))
+    )
+    # O(n^2) but vectorized; a few thousand places take well under a second
+    dist = await asyncio.to_thread(pairwise_walk_m, lat, lng)
+    return DistanceMatrix(
+        ids=np.array([r.id for r in rows], dtype=np.int64),
+        lat=lat,
+        lng=lng,
+        category=category,
+        subcategory=np.array([r.subcategory.value for r in rows], dtype=object),
+        rating=np.array([r.rating_overall or 0.0 for r in rows], dtype=np.float32),
+        dwell=np.array([DWELL_MINUTES.get(r.category, 30) for r in rows], dtype=np.float32),
+        titles=[(r.title_ru, r.title_en) for r in rows],
+        hours=hours,
+        hours_row=hours_row,
+        hours_start=hours_start,
+        hours_end=hours_end,
+        dist=dist,
+        built_at=time.monotonic(),
+    )
+
+
+class DistanceMatrixCache:
+    """Process-wide distance matrix, rebuilt lazily after place changes.
+
+    Place writes in this process call invalidate(); max_age bounds how long
+    changes made by other workers can go unnoticed.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._matrix: Optional[DistanceMatrix] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._matrix = None
+
+    def _fresh(self, matrix: Optional[DistanceMatrix]) -> bool:
+        return matrix is not None and time.monotonic() - matrix.built_at < self.max_age
+
+    async def get(self, db: AsyncSession) -> DistanceMatrix:
+        matrix = self._matrix
+        if self._fresh(matrix):
+            return matrix
+        async with self._lock:
+            if not self._fresh(self._matrix):
+                self._matrix = await load_distance_matrix(db)
+            return self._matrix
+
+
+distance_matrix_cache = DistanceMatrixCache(max_age=settings.route_matrix_max_age_seconds)
+
+
+@dataclass
+class PlannedRoute:
+    place_ids: List[int]
+    rows: List[int]               # matrix rows of the stops, in visiting order
+    leg_m: List[float]            # walking meters into each stop
+    walk_minutes: float
+    dwell_minutes: float
+
+    @property
+    def total_minutes(self) -> float:
+        return self.walk_minutes + self.dwell_minutes
+
+    @property
+    def distance_m(self) -> float:
+        return float(sum(self.leg_m))
+
+
+class _Planner:
+    """Orienteering heuristic over a local distance matrix.
+
+    Node 0 is the start point, nodes 1..m the candidate places. The route is
+    an open path from the start. A greedy seed inserts the place with the
+    best score per extra minute at its cheapest position; 2-opt and or-opt
+    then shorten the walk, and the freed time is offered to more places.
+    """
+
+    def __init__(
+        self,
+        dist: np.ndarray,
+        dwell: np.ndarray,
+        score: np.ndarray,
+        budget: float,
+        max_stops: int,
+        excluded: Optional[np.ndarray] = None,
+    ):
+        self.d = dist / WALK_SPEED_M_PER_MIN   # minutes
+        self.dwell = dwell
+        self.score = score
+        self.budget = budget
+        self.max_stops = max_stops
+        self.excluded = excluded if excluded is not None else np.zeros(len(dist), dtype=bool)
+        self.route: List[int] = [0]
+
+    def cost(self, route: Sequence[int]) -> float:
+        r = np.asarray(route)
+        return float(self.d[r[:-1], r[1:]].sum() + self.dwell[r[1:]].sum())
+
+    def insert_greedy(self) -> bool:
+        inserted = False
+        while len(self.route) - 1 < self.max_stops:
+            r = np.asarray(self.route)
+            current = self.cost(self.route)
+            free = ~self.excluded
+            free[r] = False
+            cand = np.nonzero(free)[0]
+            if not len(cand):
+                break
+
+            # Extra minutes of inserting each candidate after each route position
+            prev = r[:, None]
+            nxt = np.append(r[1:], -1)[:, None]
+            delta = self.d[prev, cand[None, :]] + self.dwell[cand][None, :]
+            has_next = nxt[:, 0] >= 0
+            delta[has_next] += (
+                self.d[cand[None, :], nxt[has_next]] - self.d[prev[has_next], nxt[has_next]]
+            )
+
+            best_pos = delta.argmin(axis=0)
+            best_delta = delta[best_pos, np.arange(len(cand))]
+            feasible = current + best_delta <= self.budget
+            if not feasible.any():
+                break
+            ratio = np.where(feasible, self.score[cand] / np.maximum(best_delta, 1e-3), -np.inf)
+            k = int(ratio.argmax())
+            self.route.insert(int(best_pos[k]) + 1, int(cand[k]))
+            inserted = True
+        return inserted
+
+    def two_opt(self) -> bool:
+        improved, r, d = False, self.route, self.d
+        n = len(r)
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                before = d[r[i - 1], r[i]] + (d[r[j], r[j + 1]] if j + 1 < n else 0.0)
+                after = d[r[i - 1], r[j]] + (d[r[i], r[j + 1]] if j + 1 < n else 0.0)
+                if after + 1e-6 < before:
+                    r[i:j + 1] = reversed(r[i:j + 1])
+                    improved = True
+        return improved
+
+    def or_opt(self) -> bool:
+        improved = False
+        for length in (1, 2, 3):
+            i = 1
+            while i + length <= len(self.route):
+                segment = self.route[i:i + length]
+                rest = self.route[:i] + self.route[i + length:]
+                base = self.cost(self.route)
+                best, best_route = base, None
+                for pos in range(1, len(rest) + 1):
+                    if pos == i:
+                        continue
+                    for seg in (segment, segment[::-1]):
+                        candidate = rest[:pos] + seg + rest[pos:]
+                        c = self.cost(candidate)
+                        if c + 1e-6 < best:
+                            best, best_route = c, candidate
+                if best_route is not None:
+                    self.route = best_route
+                    improved = True
+                else:
+                    i += 1
+        return improved
+
+    def solve(self, max_rounds: int = 8) -> List[int]:
+        self.insert_greedy()
+        for _ in range(max_rounds):
+            shortened = self.two_opt()
+            shortened = self.or_opt() or shortened
+            if not (shortened and self.insert_greedy()):
+                break
+        return self.route[1:]
+
+
+def _closed_stops(
+    order: List[int],
+    d_min: np.ndarray,
+    dwell: np.ndarray,
+    hours: List[Optional[Intervals]],
+    start_minute: float,
+) -> List[int]:
+    """Nodes of an ordered route that are not open for their whole visit"""
+    closed, clock, prev = [], float(start_minute), 0
+    for node in order:
+        clock += float(d_min[prev, node])
+        if not is_open_for(hours[node], clock, float(dwell[node])):
+            closed.append(node)
+        clock += float(dwell[node])
+        prev = node
+    return closed
+
+
+def plan_route(
+    matrix: DistanceMatrix,
+    start_lat: float,
+    start_lng: float,
+    budget_minutes: float,
+    interests: Sequence[str] = (),
+    max_stops: int = 12,
+    max_candidates: int = 150,
+    start_minute: Optional[int] = None,
+) -> PlannedRoute:
+    """Pick and order stops that fit into the time budget, maximizing place score.
+
+    With ``start_minute`` (minute of the local week, see app.core.hours) only
+    places open long enough during the outing are candidates, and every stop
+    is checked against its opening hours at the planned arrival time.
+    """
+    if matrix.size == 0:
+        return PlannedRoute([], [], [], 0.0, 0.0)
+
+    start_m = point_walk_m(start_lat, start_lng, matrix.lat, matrix.lng)
+    mask = np.ones(matrix.size, dtype=bool)
+    if interests:
+        wanted = list(interests)
+        mask = np.isin(matrix.category, wanted) | np.isin(matrix.subcategory, wanted)
+    # Places that cannot even be reached and visited within the budget
+    mask &= start_m / WALK_SPEED_M_PER_MIN + matrix.dwell <= budget_minutes
+    if start_minute is not None:
+        mask &= matrix.open_minutes(start_minute, start_minute + budget_minutes) >= matrix.dwell
+
+    rows = np.nonzero(mask)[0]
+    if len(rows) > max_candidates:
+        rows = rows[np.argsort(start_m[rows])[:max_candidates]]
+    if not len(rows):
+        return PlannedRoute([], [], [], 0.0, 0.0)
+
+    m = len(rows)
+    local = np.zeros((m + 1, m + 1), dtype=np.float32)
+    local[1:, 1:] = matrix.dist[np.ix_(rows, rows)]
+    local[0, 1:] = start_m[rows]
+    local[1:, 0] = start_m[rows]
+    dwell = np.concatenate([[0.0], matrix.dwell[rows]]).astype(np.float32)
+    score = np.concatenate([[0.0], 1.0 + matrix.rating[rows]]).astype(np.float32)
+
+    excluded = np.zeros(m + 1, dtype=bool)
+    order = _Planner(local, dwell, score, budget_minutes, max_stops, excluded).solve()
+    if start_minute is not None:
+        hours = [None] + [matrix.hours[r] for r in rows]
+        d_min = local / WALK_SPEED_M_PER_MIN
+        for _ in range(MAX_REPLANS):
+            closed = _closed_stops(order, d_min, dwell, hours, start_minute)
+            if not closed:
+                break
+            excluded[closed] = True
+            order = _Planner(local, dwell, score, budget_minutes, max_stops, excluded).solve()
+        # Still conflicting after the re-plans: drop stops until every visit fits
+        while closed := _closed_stops(order, d_min, dwell, hours, start_minute):
+            order.remove(closed[0])
+
+    stops = [int(rows[i - 1]) for i in order]
+    path = [0] + order
+    leg_m = [float(local[a, b]) for a, b in zip(path[:-1], path[1:])]
+    return PlannedRoute(
+        place_ids=[int(matrix.ids[s]) for s in stops],
+        rows=stops,
+        leg_m=leg_m,
+        walk_minutes=sum(leg_m) / WALK_SPEED_M_PER_MIN,
+        dwell_minutes=float(matrix.dwell[stops].sum()) if stops else 0.0,
+    )
+
+
+def describe_route(
+    matrix: DistanceMatrix,
+    planned: PlannedRoute,
+    start_lat: float,
+    start_lng: float,
+) -> dict:
+    """Serializable route object stored in GeneratedRoute.route_data"""
+    stops = []
+    clock = 0.0
+    for row, leg_m in zip(planned.rows, planned.leg_m):
+        clock += leg_m / WALK_SPEED_M_PER_MIN
+        title_ru, title_en = matrix.titles[row]
+        stops.append({
+            "place_id": int(matrix.ids[row]),
+            "title_ru": title_ru,
+            "title_en": title_en,
+            "latitude": float(matrix.lat[row]),
+            "longitude": float(matrix.lng[row]),
+            "category": matrix.category[row],
+            "leg_distance_m": round(leg_m, 1),
+            "arrive_minute": round(clock, 1),
+            "dwell_minutes": float(matrix.dwell[row]),
+        })
+        clock += float(matrix.dwell[row])
+
+    return {
+        "start": {"latitude": start_lat, "longitude": start_lng},
+        "stops": stops,
+        "polyline": [[start_lat, start_lng]] + [[s["latitude"], s["longitude"]] for s in stops],
+        "walk_minutes": round(planned.walk_minutes, 1),
+        "dwell_minutes": round(planned.dwell_minutes, 1),
+        "distance_m": round(planned.distance_m, 1),
+    }
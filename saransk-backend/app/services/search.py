@@ -0,0 +1,85 @@
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import func, select, text, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.place import Place, PlaceCategory
+
+SEARCH_CONFIGS = {"ru": "russian", "en": "english"}
+
+# Letters and digits only: everything else is tsquery syntax or noise
+_TOKEN = re.compile(r"[^\W_]+", re.UNICODE)
+MAX_TOKENS = 8
+# Ranking reads every candidate document, so broad queries ("па:*") rank at
+# most this many best title/tag matches plus this many matches anywhere
+MAX_RANKED = 150
+
+
+def prefix_tsquery(q: str) -> Optional[str]:
+    """to_tsquery() text matching every word of ``q``, the last one as a prefix.
+
+    Search-as-you-type: "собор пло" becomes "собор & пло:*". Single-letter
+    trailing fragments are dropped since they match most of the catalog.
+    """
+    tokens = [t.lower() for t in _TOKEN.findall(q)][:MAX_TOKENS]
+    if tokens and len(tokens[-1]) < 2:
+        tokens.pop()
+    if not tokens:
+        return None
+    *words, last = tokens
+    return " & ".join([*words, f"{last}:*"])
+
+
+async def search_places(
+    db: AsyncSession,
+    q: str,
+    lang: str = "ru",
+    category: Optional[PlaceCategory] = None,
+    limit: int = 20,
+) -> List[Tuple[Place, float]]:
+    """Active places matching ``q``, best ranked first, with their ts_rank_cd score.
+
+    Matching goes through the GIN indexes, which return matches in no
+    particular order, and ranking reads every matched document. To bound
+    that work, the candidates are the MAX_RANKED best matches of the small
+    title and tags vector (weights A and B, which dominate ts_rank_cd) plus
+    the first MAX_RANKED matches anywhere, and only those are ranked on the
+    full document. On very broad queries, title matches that tie there are
+    cut by id, so one whose address and description would rank it higher
+    can be missed. Only the top ``limit`` rows are joined back to load full
+    places.
+    """
+    query_text = prefix_tsquery(q)
+    if query_text is None:
+        return []
+
+    config = SEARCH_CONFIGS[lang]
+    document = Place.search_ru if lang == "ru" else Place.search_en
+    title_tags = Place.title_tags_search_ru if lang == "ru" else Place.title_tags_search_en
+    tsquery = func.to_tsquery(config, query_text)
+
+    filters = [Place.is_active == True]
+    if category:
+        filters.append(Place.category == category)
+    title_tags_rank = func.ts_rank_cd(title_tags, tsquery)
+    candidates = union(
+        select(Place.id)
+        .where(title_tags.op("@@")(tsquery), *filters)
+        .order_by(title_tags_rank.desc(), Place.id)
+        .limit(MAX_RANKED),
+        select(Place.id).where(document.op("@@")(tsquery), *filters).limit(MAX_RANKED),
+    ).subquery()
+    matches = select(Place.id, document.label("document")).where(Place.id.in_(select(candidates.c.id))).subquery()
+
+    rank = func.ts_rank_cd(matches.c.document, tsquery)
+    top = (
+        select(matches.c.id, rank.label("rank"))
+        .order_by(rank.desc(), matches.c.id)
+        .limit(limit)
+        .subquery()
+    )
+    # psycopg prepares a statement run often enough, and Postgres then
+    # switches to a generic plan that cannot see the tsquery: with the LIMIT
+    # it scans the whole table for rare words instead of using the index
+    await db.execute(text("SET LOCAL plan_cache_mode = force_custom_plan"))
+    query = select(Place, top.c.rank).join(top, Place.id == top.c.id).order_by(top.c.rank.desc(), Place.id)
+    return [(place, float(score)) for place, score in (await db.execute(query)).all()]
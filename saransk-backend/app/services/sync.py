@@ -0,0 +1,113 @@
+"""Delta sync of the public catalog (places and route templates).
+
+Tokens are transaction-id horizons, not change-row ids: row ids are handed
+out when a change is written, so a transaction that commits late can leave
+a lower id behind a token that was already issued. A token is instead the
+snapshot's xmin; every transaction below it has finished, so a sync covers
+changes written by transactions in [since, token). Changes from
+transactions that committed but sit at or above the horizon are visible in
+the snapshot too, and are sent again next time; applying them is
+idempotent since each line carries the current state of the entity.
+"""
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+import orjson
+from sqlalchemy import delete, exists, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.place import Place
+from app.models.route import RouteTemplate
+from app.models.sync import SyncChange
+from app.schemas.place import PlaceResponse
+from app.schemas.route import RouteTemplateResponse
+
+SYNC_BATCH = 500
+
+ENTITIES = {
+    "place": Place,
+    "route_template": RouteTemplate,
+}
+
+
+def _dump(entity: str, row) -> dict:
+    if entity == "place":
+        return PlaceResponse.model_validate(row).model_dump()
+    return RouteTemplateResponse.model_validate(row).model_dump()
+
+
+async def current_horizon(db: AsyncSession) -> int:
+    """xmin of the current snapshot: every transaction below it has finished"""
+    return await db.scalar(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"))
+
+
+async def begin_snapshot(db: AsyncSession) -> int:
+    """Pin one snapshot for the whole sync and return its horizon (the new token)"""
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    return await current_horizon(db)
+
+
+async def changed_ids(db: AsyncSession, entity: str, since: Optional[int], horizon: int) -> List[int]:
+    """Ids to send: everything active for a full sync, else every id changed in [since, horizon)"""
+    if since is None:
+        model = ENTITIES[entity]
+        return list(await db.scalars(select(model.id).where(model.is_active == True).order_by(model.id)))
+    return list(await db.scalars(
+        select(SyncChange.entity_id)
+        .where(SyncChange.xid >= since, SyncChange.xid < horizon, SyncChange.entity == entity)
+        .distinct()
+        .order_by(SyncChange.entity_id)
+    ))
+
+
+async def iter_sync(db: AsyncSession, since: Optional[int]) -> AsyncIterator[bytes]:
+    """NDJSON lines: a header, one line per changed entity, then the new token.
+
+    Entities that are gone or inactive become ``"op": "delete"`` tombstones.
+    The token comes last so clients can tell a truncated stream from a
+    complete one and only advance after applying everything.
+    """
+    horizon = await begin_snapshot(db)
+    yield orjson.dumps({"since": str(since) if since is not None else None, "full": since is None}) + b"\n"
+
+    count = 0
+    for entity, model in ENTITIES.items():
+        ids = await changed_ids(db, entity, since, horizon)
+        for start in range(0, len(ids), SYNC_BATCH):
+            chunk = ids[start:start + SYNC_BATCH]
+            rows: Dict[int, object] = {
+                row.id: row for row in await db.scalars(select(model).where(model.id.in_(chunk)))
+            }
+            lines = []
+            for entity_id in chunk:
+                row = rows.get(entity_id)
+                if row is None or not row.is_active:
+                    lines.append({"entity": entity, "op": "delete", "id": entity_id})
+                else:
+                    lines.append({"entity": entity, "op": "upsert", "id": entity_id, "data": _dump(entity, row)})
+            count += len(lines)
+            yield b"".join(orjson.dumps(line) + b"\n" for line in lines)
+            db.expunge_all()
+
+    yield orjson.dumps({"token": str(horizon), "changes": count}) + b"\n"
+
+
+async def compact_change_log(db: AsyncSession, entities: Sequence[str] = tuple(ENTITIES)) -> int:
+    """Delete change rows superseded by a later change of the same entity.
+
+    A client only needs the newest change per entity (lines carry current
+    state), so this keeps the log at one row per entity ever written,
+    tombstones included, without invalidating any token.
+    """
+    newer = aliased(SyncChange)
+    result = await db.execute(
+        delete(SyncChange).where(
+            SyncChange.entity.in_(entities),
+            exists().where(
+                newer.entity == SyncChange.entity,
+                newer.entity_id == SyncChange.entity_id,
+                tuple_(newer.xid, newer.id) > tuple_(SyncChange.xid, SyncChange.id),
+            ),
+        )
+    )
+    return result.rowcount
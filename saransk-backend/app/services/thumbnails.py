@@ -0,0 +1,181 @@
+"""Thumbnail generation for confirmed uploads.
+
+Confirmed uploads are ``processing`` media assets. The pipeline downloads
+the original, resizes it in a process pool (app.core.images.render_variants)
+so decoding and encoding never hold up the event loop, uploads the variants
+next to the original and publishes their URLs to the asset and every place
+showing it.
+
+As with moderation, the database is the queue's source of truth: the API
+hands confirmed ids to the in-process pipeline for a fast start, and a
+periodic sweep picks up any ``processing`` asset that is not in flight, so
+a restart or a separately run worker (scripts/thumbnail_worker.py) loses
+nothing. Before rendering, a pipeline claims the asset (``claimed_at``)
+with a conditional UPDATE, so with several API or worker processes each
+upload is rendered once; a claim older than ``claim_seconds`` (a crashed
+process) can be taken over.
+"""
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Sequence, Set
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.cache import ResponseCache, invalidate_place, response_cache
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.images import PhotoFormat, render_variants
+from app.models.media import MediaAsset, MediaStatus
+from app.services.media import MediaStorage, media_storage, publish_variants, variant_key
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    PhotoFormat.WEBP: ("webp", "image/webp"),
+    PhotoFormat.JPEG: ("jpg", "image/jpeg"),
+}
+
+
+class ThumbnailPipeline:
+    """Resizes up to ``workers`` photos at a time in a ``workers``-process pool"""
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker,
+        storage: MediaStorage,
+        cache: Optional[ResponseCache],
+        workers: int,
+        widths: Sequence[int],
+        sweep_interval: float = 30.0,
+        claim_seconds: float = 600.0,
+    ):
+        self.sessionmaker = sessionmaker
+        self.storage = storage
+        self.cache = cache
+        self.workers = workers
+        self.widths = list(widths)
+        self.sweep_interval = sweep_interval
+        self.claim_seconds = claim_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(workers)
+        self._inflight: Set[int] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self) -> None:
+        tasks = [*self._tasks, *([self._sweeper] if self._sweeper else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, asset_id: int) -> None:
+        """Start processing a confirmed upload unless it is already underway"""
+        if asset_id in self._inflight or self._executor is None:
+            return
+        self._inflight.add(asset_id)
+        task = asyncio.create_task(self._process(asset_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _claimable(self):
+        """Processing assets no other pipeline is rendering (or whose claim expired)"""
+        expired = datetime.utcnow() - timedelta(seconds=self.claim_seconds)
+        return (
+            MediaAsset.status == MediaStatus.PROCESSING,
+            or_(MediaAsset.claimed_at.is_(None), MediaAsset.claimed_at < expired),
+        )
+
+    async def _sweep(self) -> None:
+        while True:
+            try:
+                async with self.sessionmaker() as db:
+                    ids = list(await db.scalars(
+                        select(MediaAsset.id).where(*self._claimable()).order_by(MediaAsset.id)
+                    ))
+                for asset_id in ids:
+                    self.submit(asset_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("thumbnail sweep failed")
+            await asyncio.sleep(self.sweep_interval)
+
+    async def _process(self, asset_id: int) -> None:
+        try:
+            async with self._semaphore, self.sessionmaker() as db:
+                # Committed claim: other processes skip the asset until it expires
+                claimed = await db.scalar(
+                    update(MediaAsset)
+                    .where(MediaAsset.id == asset_id, *self._claimable())
+                    .values(claimed_at=datetime.utcnow())
+                    .returning(MediaAsset.id)
+                )
+                await db.commit()
+                if claimed is None:
+                    return
+                asset = await db.get(MediaAsset, asset_id)
+                try:
+                    places = await self._render(db, asset)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    logger.exception("thumbnails failed for media asset %s", asset_id)
+                    await db.rollback()
+                    asset.status = MediaStatus.FAILED
+                    asset.error = f"{type(exc).__name__}: {exc}"[:1000]
+                    await db.commit()
+                    return
+            if self.cache is not None:
+                for place_id in places:
+                    await invalidate_place(self.cache, place_id)
+        finally:
+            self._inflight.discard(asset_id)
+
+    async def _render(self, db, asset: MediaAsset) -> Set[int]:
+        original = await self.storage.read(asset.key)
+        loop = asyncio.get_running_loop()
+        width, height, rendered = await loop.run_in_executor(
+            self._executor, render_variants, original, self.widths
+        )
+
+        variants: dict = {}
+        uploads = []
+        for target, fmt, data in rendered:
+            extension, content_type = FORMATS[fmt]
+            key = variant_key(asset, target, extension)
+            variants.setdefault(str(target), {})[fmt.value] = self.storage.public_url(key)
+            uploads.append(self.storage.write(key, data, content_type))
+        await asyncio.gather(*uploads)
+
+        asset.width, asset.height = width, height
+        asset.variants = variants
+        asset.status = MediaStatus.READY
+        asset.error = None
+        places = await publish_variants(db, asset)
+        await db.commit()
+        logger.info("media asset %s: %d variants, %d places", asset.id, len(rendered), len(places))
+        return places
+
+
+thumbnail_pipeline = ThumbnailPipeline(
+    SessionLocal,
+    media_storage,
+    response_cache,
+    settings.media_thumbnail_workers,
+    settings.media_thumbnail_widths,
+    claim_seconds=settings.media_thumbnail_claim_seconds,
+)
+
+
+def get_thumbnail_pipeline() -> ThumbnailPipeline:
+    return thumbnail_pipeline
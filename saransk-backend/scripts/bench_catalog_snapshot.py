@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Memory and load time of the in-process catalog snapshot.
+
+Seeds N realistic places (long bilingual descriptions, opening hours,
+photos with thumbnail variants) inside a transaction, then builds a
+CatalogSnapshot the way startup does and reports the load time (query,
+records, indexes), the cost of an incremental refresh (patching changed
+places into a new snapshot, the work done off the event loop after a
+version bump), the memory retained per place (tracemalloc, strings
+included) against ORM Place entities, and the latency of place and list
+reads from the snapshot against the same reads from the database, both
+serialized as the endpoints do. Rolls everything back. Needs a migrated
+database (DATABASE_URL).
+
+    python scripts/bench_catalog_snapshot.py --places 20000
+"""
+import argparse
+import asyncio
+import gc
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import orjson  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.core.db import engine  # noqa: E402
+from app.core.images import DEFAULT_PHOTO_SIZE  # noqa: E402
+from app.models.place import Place, PlaceCategory, PlaceSubcategory, derived_columns  # noqa: E402
+from app.schemas.place import PlaceListResponse, PlaceResponse, PlaceSort, PlaceView  # noqa: E402
+from app.services.catalog import RECORD_FIELDS, CatalogSnapshot, PlaceRecord  # noqa: E402
+from app.services.projection import PlaceProjection  # noqa: E402
+
+PREFIX = "bench-catalog-"
+WIDTHS = (160, 320, 640, 1280)
+
+
+def place_row(i: int) -> dict:
+    photos = [f"https://storage.example.com/media/place/{i:06d}{n}.jpg" for n in range(random.randint(1, 4))]
+    row = {
+        "external_id": f"{PREFIX}{i}",
+        "title_ru": f"Памятник архитектуры №{i}",
+        "title_en": f"Architectural monument #{i}",
+        "description_ru": "Историческое здание начала XX века, объект культурного наследия. " * 8,
+        "description_en": "A historic early 20th century building, a cultural heritage site. " * 8,
+        "category": random.choice(list(PlaceCategory)),
+        "subcategory": random.choice(list(PlaceSubcategory)),
+        "tags": ["история", "архитектура"],
+        "latitude": 54.18 + random.uniform(-0.05, 0.05),
+        "longitude": 45.17 + random.uniform(-0.08, 0.08),
+        "address_ru": f"Саранск, ул. Советская, {i % 120}",
+        "address_en": f"Saransk, Sovetskaya st., {i % 120}",
+        "hours_json": "Вт–Вс 10:00–18:00, Пн — выходной",
+        "photos": photos,
+        "photo_variants": {
+            url: {str(w): {"webp": url.replace(".jpg", f"/w{w}.webp")} for w in WIDTHS} for url in photos
+        },
+        "rating_overall": round(random.uniform(3, 5), 2),
+        "reviews_count": random.randint(0, 300),
+        "is_active": True,
+    }
+    return {**row, **derived_columns(row)}
+
+
+def timed(samples) -> str:
+    return f"{statistics.median(samples):7.3f} ms"
+
+
+async def run(places: int, rounds: int):
+    random.seed(3)
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        db = AsyncSession(bind=conn)
+        try:
+            for offset in range(0, places, 1000):
+                chunk = [place_row(i) for i in range(offset, min(offset + 1000, places))]
+                await conn.execute(insert(Place).values(chunk))
+            active = Place.is_active == True
+            columns = select(*(getattr(Place, name) for name in RECORD_FIELDS)).where(active).order_by(Place.id)
+
+            started = time.perf_counter()
+            rows = (await db.execute(columns)).all()
+            queried = time.perf_counter()
+            records = [PlaceRecord(row) for row in rows]
+            built = time.perf_counter()
+            snapshot = CatalogSnapshot(0, records)
+            indexed = time.perf_counter()
+            print(f"snapshot of {len(snapshot)} places: query {(queried - started) * 1000:.0f} ms, "
+                  f"records {(built - queried) * 1000:.0f} ms, indexes {(indexed - built) * 1000:.0f} ms, "
+                  f"total {(indexed - started) * 1000:.0f} ms")
+
+            # The refresh query reads only the changed ids; time the rebuild it feeds
+            for changed in (10, 200, 2000):
+                ids = [p.id for p in random.sample(snapshot.places, changed)]
+                fresh = (await db.execute(columns.where(Place.id.in_(ids)))).all()
+                t = time.perf_counter()
+                snapshot.patched(1, 0, fresh, ids)
+                print(f"refresh of {changed:>5} changed places: {(time.perf_counter() - t) * 1000:.0f} ms")
+
+            count = len(snapshot)
+            del records, snapshot
+
+            # Memory retained once the fetched rows are gone (strings and variants included)
+            async def orm_load():
+                return (await db.scalars(select(Place).where(active).order_by(Place.id))).all()
+
+            gc.collect()
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            orm = await orm_load()
+            gc.collect()
+            orm_bytes = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+            del orm
+            db.expunge_all()
+
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            rows = (await db.execute(columns)).all()
+            snapshot = CatalogSnapshot(0, [PlaceRecord(row) for row in rows])
+            del rows
+            gc.collect()
+            full_bytes = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+            print(f"memory per place: snapshot {full_bytes / count:.0f} B (values included), "
+                  f"ORM Place entities {orm_bytes / count:.0f} B; __slots__ record itself "
+                  f"{sys.getsizeof(snapshot.places[0])} B")
+
+            context = DEFAULT_PHOTO_SIZE.context()
+            ids = [p.id for p in random.sample(snapshot.places, 200)]
+            mem, dbt = [], []
+            for _ in range(max(1, rounds // 10)):
+                for place_id in ids:
+                    t = time.perf_counter()
+                    orjson.dumps(PlaceResponse.model_validate(snapshot.get(place_id), context=context).model_dump())
+                    mem.append((time.perf_counter() - t) * 1000)
+                    t = time.perf_counter()
+                    place = await db.scalar(select(Place).where(Place.id == place_id, active))
+                    orjson.dumps(PlaceResponse.model_validate(place, context=context).model_dump())
+                    dbt.append((time.perf_counter() - t) * 1000)
+                db.expunge_all()
+            print(f"{'read':<34} {'snapshot':>10} {'database':>10}")
+            print(f"{'GET /places/{id}':<34} {timed(mem)} {timed(dbt)}")
+
+            projection = PlaceProjection(PlaceView.MAP, None, None, DEFAULT_PHOTO_SIZE)
+            for label, category, sort, offset, view in (
+                ("list page 1, full", None, PlaceSort.ID, 0, None),
+                ("list category, rating, page 50", PlaceCategory.FOOD, PlaceSort.RATING, 49 * 20, None),
+                ("list page 1, view=map", None, PlaceSort.ID, 0, projection),
+            ):
+                mem, dbt = [], []
+                for _ in range(rounds):
+                    t = time.perf_counter()
+                    page, _ = snapshot.select(category=category, sort=sort, offset=offset, limit=21)
+                    page = page[:20]
+                    if view:
+                        orjson.dumps([view.project(p) for p in page])
+                    else:
+                        orjson.dumps(PlaceListResponse.model_validate(
+                            {"places": page, "page": 1, "per_page": 20, "has_next": True},
+                            from_attributes=True, context=context,
+                        ).model_dump())
+                    mem.append((time.perf_counter() - t) * 1000)
+
+                    t = time.perf_counter()
+                    filters = [active] + ([Place.category == category] if category else [])
+                    order = [Place.rating_overall.desc(), Place.id.desc()] if sort == PlaceSort.RATING else [Place.id]
+                    if view:
+                        query = select(*view.columns(Place.id)).where(*filters).order_by(*order)
+                        page = (await db.execute(query.offset(offset).limit(21))).mappings().all()[:20]
+                        orjson.dumps([view.project(p) for p in page])
+                    else:
+                        query = select(Place).where(*filters).order_by(*order)
+                        page = (await db.scalars(query.offset(offset).limit(21))).all()[:20]
+                        orjson.dumps(PlaceListResponse.model_validate(
+                            {"places": page, "page": 1, "per_page": 20, "has_next": True},
+                            from_attributes=True, context=context,
+                        ).model_dump())
+                        db.expunge_all()
+                    dbt.append((time.perf_counter() - t) * 1000)
+                print(f"{label:<34} {timed(mem)} {timed(dbt)}")
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--places", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.places, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
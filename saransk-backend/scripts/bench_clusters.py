@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark /places/clusters on a synthetic city catalog.
+
+Seeds N active places around Saransk (dense centre, sparse outskirts)
+inside a transaction, so the place_clusters triggers build the per-zoom
+aggregates, then reports per zoom the uncached tile load time and the raw
+and gzipped response for phone-sized viewports from region to street, plus what the triggers add
+to single-place moves and to a bulk insert. Rolls everything back. Needs a
+migrated database (DATABASE_URL).
+
+    python scripts/bench_clusters.py --places 20000
+"""
+import argparse
+import asyncio
+import gzip
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import insert, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.core.cache import ResponseCache  # noqa: E402
+from app.core.db import engine  # noqa: E402
+from app.core.redis import redis_client  # noqa: E402
+from app.models.place import Place, PlaceCategory, PlaceSubcategory, derived_columns  # noqa: E402
+from app.services.clusters import clusters_payload, parse_bbox  # noqa: E402
+
+CENTRE = (54.1838, 45.1749)
+# Phone-screen viewports: the region, the city, the centre, streets, individual places
+VIEWPORTS = [
+    (10, "44.95,54.08,45.40,54.29"),
+    (12, "45.08,54.14,45.27,54.23"),
+    (14, "45.15,54.17,45.20,54.20"),
+    (16, "45.170,54.180,45.182,54.187"),
+    (18, "45.1735,54.1830,45.1765,54.1848"),
+]
+
+
+def place_row(i: int) -> dict:
+    spread = 0.01 if random.random() < 0.6 else 0.05
+    row = {
+        "title_ru": f"Место {i}",
+        "title_en": f"Place {i}",
+        "description_ru": "Описание",
+        "description_en": "Description",
+        "category": random.choice(list(PlaceCategory)),
+        "subcategory": random.choice(list(PlaceSubcategory)),
+        "latitude": random.gauss(CENTRE[0], spread),
+        "longitude": random.gauss(CENTRE[1], spread * 1.7),
+        "is_active": True,
+    }
+    return {**row, **derived_columns(row)}
+
+
+def timed(samples) -> str:
+    return f"p50={statistics.median(samples):.2f} ms"
+
+
+async def run(places: int, rounds: int):
+    random.seed(5)
+    # Every tile load goes to the database
+    cache = ResponseCache(redis_client, ttl=1, lock_ttl_ms=1, lock_wait_ms=1, enabled=False)
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        db = AsyncSession(bind=conn)
+        try:
+            rows = [place_row(i) for i in range(places)]
+            started = time.perf_counter()
+            # Multi-row statements, as the importer writes (the triggers fire per statement)
+            for offset in range(0, places, 1000):
+                await conn.execute(insert(Place).values(rows[offset:offset + 1000]))
+            print(f"seeded {places} places in {time.perf_counter() - started:.2f} s (clusters included)")
+
+            print(f"{'zoom':>4} {'load':>16} {'clusters':>9} {'bytes':>7} {'gzip':>6}")
+            for zoom, bbox in VIEWPORTS:
+                samples = []
+                for _ in range(rounds):
+                    t = time.perf_counter()
+                    body, _ = await clusters_payload(db, cache, parse_bbox(bbox), zoom)
+                    samples.append((time.perf_counter() - t) * 1000)
+                print(f"{zoom:>4} {timed(samples):>16} {body.count(b'count'):>9} {len(body):>7} "
+                      f"{len(gzip.compress(body)):>6}")
+
+            ids = [row[0] for row in await conn.execute(text("SELECT id FROM places ORDER BY random() LIMIT 200"))]
+            for label, sql in (
+                ("rating update (no-op for clusters)", "UPDATE places SET rating_overall = 4.5 WHERE id = :id"),
+                ("move place ~100 m", "UPDATE places SET latitude = latitude + 0.001 WHERE id = :id"),
+            ):
+                samples = []
+                for place_id in ids:
+                    t = time.perf_counter()
+                    await conn.execute(text(sql), {"id": place_id})
+                    samples.append((time.perf_counter() - t) * 1000)
+                print(f"{label:<36} {timed(samples)}")
+        finally:
+            await trans.rollback()
+    await redis_client.aclose()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--places", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.places, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
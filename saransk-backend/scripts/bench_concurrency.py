@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Concurrent-request load benchmark for the read endpoints.
+
+Run it against a live server before and after a change and compare the
+numbers, e.g.:
+
+    python scripts/bench_concurrency.py --base-url http://localhost:8000 \
+        --concurrency 64 --requests 2000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/places/?per_page=20",
+    "/api/v1/places/?per_page=20&category=food",
+    "/api/v1/places/1",
+    "/api/v1/reviews/place/1",
+]
+
+
+async def worker(client: httpx.AsyncClient, paths, queue: asyncio.Queue, latencies, errors):
+    while True:
+        try:
+            i = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        path = paths[i % len(paths)]
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+async def run(base_url: str, concurrency: int, total: int, paths):
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    latencies: list = []
+    errors: list = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        # Warm up connections and server-side pools
+        await asyncio.gather(*(client.get(p) for p in paths), return_exceptions=True)
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(worker(client, paths, queue, latencies, errors) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - started
+
+    print(f"requests:    {total} ({len(errors)} errors)")
+    print(f"concurrency: {concurrency}")
+    print(f"elapsed:     {elapsed:.2f} s")
+    print(f"throughput:  {total / elapsed:.1f} req/s")
+    print(f"latency ms:  p50={percentile(latencies, 50):.1f} "
+          f"p95={percentile(latencies, 95):.1f} p99={percentile(latencies, 99):.1f} "
+          f"mean={statistics.fmean(latencies):.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--path", action="append", dest="paths",
+                        help="Request path (repeatable); defaults to a mix of place/review reads")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.base_url, args.concurrency, args.requests, args.paths or DEFAULT_PATHS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Benchmark /places/nearby lookups on a synthetic catalog.
+
+Seeds N random places around Saransk inside a transaction, times the
+grid-cell query used by the endpoint against a full-table haversine scan,
+then rolls everything back. Needs a migrated database (DATABASE_URL).
+
+    python scripts/bench_nearby.py --places 100000 --radius 1000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.core.db import engine  # noqa: E402
+from app.core.geo import CELL_DEG, GRID_COLS, cell_ranges  # noqa: E402
+from app.services.nearby import find_nearby_places  # noqa: E402
+
+CENTER = (54.1838, 45.1749)
+
+SEED_SQL = f"""
+INSERT INTO places (created_at, updated_at, title_ru, title_en, description_ru, description_en,
+                    category, subcategory, latitude, longitude, grid_cell, is_active)
+SELECT now(), now(), 'bench ' || g, 'bench ' || g, '-', '-',
+       'monument', 'cultural_heritage', lat, lng,
+       floor((lat + 90) / {CELL_DEG})::bigint * {GRID_COLS}
+           + LEAST(floor((lng + 180) / {CELL_DEG})::bigint, {GRID_COLS - 1}),
+       true
+FROM (
+    SELECT g, :lat + (random() - 0.5) * :spread AS lat, :lng + (random() - 0.5) * :spread * 1.7 AS lng
+    FROM generate_series(1, :n) AS g
+) s
+"""
+
+FULL_SCAN_SQL = """
+SELECT id, 2 * 6371008.8 * asin(sqrt(
+    power(sin(radians(latitude - :lat) / 2), 2)
+    + cos(radians(:lat)) * cos(radians(latitude)) * power(sin(radians(longitude - :lng) / 2), 2)
+)) AS distance
+FROM places
+WHERE is_active
+ORDER BY distance
+"""
+
+
+def timed(samples):
+    return (f"p50={statistics.median(samples):.2f} ms  "
+            f"p95={sorted(samples)[int(len(samples) * 0.95) - 1]:.2f} ms")
+
+
+async def run(n: int, radius: float, queries: int, spread: float):
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        db = AsyncSession(bind=conn)
+        try:
+            started = time.perf_counter()
+            await conn.execute(text(SEED_SQL), {"n": n, "lat": CENTER[0], "lng": CENTER[1], "spread": spread})
+            await conn.execute(text("ANALYZE places"))
+            print(f"seeded {n} places in {time.perf_counter() - started:.1f} s")
+
+            points = [
+                (CENTER[0] + random.uniform(-spread, spread) / 2, CENTER[1] + random.uniform(-spread, spread))
+                for _ in range(queries)
+            ]
+
+            grid, hits = [], 0
+            for lat, lng in points:
+                t = time.perf_counter()
+                result = await find_nearby_places(db, lat, lng, radius, limit=50)
+                grid.append((time.perf_counter() - t) * 1000)
+                hits += len(result)
+                db.expunge_all()
+
+            full = []
+            for lat, lng in points[: max(1, queries // 10)]:
+                t = time.perf_counter()
+                rows = await conn.execute(
+                    text(FULL_SCAN_SQL + " LIMIT 50").bindparams(lat=lat, lng=lng)
+                )
+                rows.all()
+                full.append((time.perf_counter() - t) * 1000)
+
+            print(f"radius {radius:.0f} m, avg {hits / queries:.1f} hits per query")
+            print(f"grid cell index:    {timed(grid)}")
+            print(f"full-table scan:    {timed(full)}")
+
+            lat, lng = points[0]
+            plan = await conn.execute(
+                text("EXPLAIN SELECT id FROM places WHERE is_active AND ("
+                     + " OR ".join(f"grid_cell BETWEEN {lo} AND {hi}" for lo, hi in cell_ranges(lat, lng, radius))
+                     + ")")
+            )
+            print("plan:")
+            for (line,) in plan:
+                print("   ", line)
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--places", type=int, default=100_000)
+    parser.add_argument("--radius", type=float, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--spread", type=float, default=0.5, help="Latitude span of the dataset in degrees")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.places, args.radius, args.queries, args.spread))
+
+
+if __name__ == '__main__':
+    main()
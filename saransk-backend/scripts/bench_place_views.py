@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Payload size and serialization cost of place list views.
+
+Seeds a catalog of realistic places (long bilingual descriptions, opening
+hours, photos with thumbnail variants) inside a transaction and loads one
+page per variant the way GET /places/ does: full PlaceResponse through the
+ORM, and view=compact|map / fields= / lang= through column projections.
+Reports the fetch (query + row hydration) and serialization times and the
+raw and gzipped payload per page, then rolls everything back. Needs a
+migrated database (DATABASE_URL).
+
+    python scripts/bench_place_views.py --per-page 100
+"""
+import argparse
+import asyncio
+import gzip
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import orjson  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.core.db import engine  # noqa: E402
+from app.core.images import DEFAULT_PHOTO_SIZE  # noqa: E402
+from app.models.place import Place, PlaceCategory, PlaceSubcategory  # noqa: E402
+from app.schemas.place import PlaceListResponse, PlaceView, SearchLang  # noqa: E402
+from app.services.projection import PlaceProjection  # noqa: E402
+
+PREFIX = "bench-views-"
+WIDTHS = (160, 320, 640, 1280)
+VARIANTS = [
+    ("full", PlaceView.FULL, None, None),
+    ("full lang=ru", PlaceView.FULL, None, SearchLang.RU),
+    ("compact", PlaceView.COMPACT, None, None),
+    ("compact lang=ru", PlaceView.COMPACT, None, SearchLang.RU),
+    ("map", PlaceView.MAP, None, None),
+    ("map lang=ru", PlaceView.MAP, None, SearchLang.RU),
+    ("fields=id,lat,lng", PlaceView.FULL, "latitude,longitude", None),
+]
+
+
+def place_row(i: int) -> dict:
+    photos = [f"https://storage.example.com/media/place/{i:06d}{n}.jpg" for n in range(random.randint(1, 6))]
+    return {
+        "external_id": f"{PREFIX}{i}",
+        "title_ru": f"Памятник архитектуры №{i}",
+        "title_en": f"Architectural monument #{i}",
+        "description_ru": "Историческое здание начала XX века, объект культурного наследия. " * 25,
+        "description_en": "A historic early 20th century building and a cultural heritage site. " * 25,
+        "category": random.choice(list(PlaceCategory)),
+        "subcategory": random.choice(list(PlaceSubcategory)),
+        "tags": ["история", "архитектура", "центр"],
+        "latitude": 54.18 + random.uniform(-0.05, 0.05),
+        "longitude": 45.17 + random.uniform(-0.08, 0.08),
+        "address_ru": f"Саранск, ул. Советская, {i % 120}",
+        "address_en": f"Saransk, Sovetskaya st., {i % 120}",
+        "hours_json": "Вт–Вс 10:00–18:00, Пн — выходной",
+        "photos": photos,
+        "photo_variants": {
+            url: {str(w): {"webp": url.replace(".jpg", f"/w{w}.webp"), "jpeg": url.replace(".jpg", f"/w{w}.jpg")}
+                  for w in WIDTHS}
+            for url in photos
+        },
+        "rating_overall": round(random.uniform(3, 5), 2),
+        "reviews_count": random.randint(0, 300),
+        "website": "https://example.com",
+        "phone": "+7 (8342) 00-00-00",
+    }
+
+
+def timed(samples) -> str:
+    return f"{statistics.median(samples):7.2f} ms"
+
+
+async def load_page(db: AsyncSession, view, fields, lang, per_page: int):
+    """(fetch ms, serialize ms, payload) for one page, as get_places builds it"""
+    filters = [Place.external_id.like(f"{PREFIX}%"), Place.is_active == True]
+    projection = None
+    if view != PlaceView.FULL or fields or lang is not None:
+        projection = PlaceProjection(view, fields, lang, DEFAULT_PHOTO_SIZE)
+
+    started = time.perf_counter()
+    query = select(*projection.columns(Place.id)) if projection else select(Place)
+    query = query.where(*filters).order_by(Place.id).limit(per_page)
+    rows = (await db.execute(query)).mappings().all() if projection else (await db.scalars(query)).all()
+    fetched = time.perf_counter()
+
+    page = {"total": None, "page": 1, "per_page": per_page, "has_next": True, "next_cursor": None}
+    if projection:
+        payload = orjson.dumps({"places": [projection.project(row) for row in rows], **page})
+    else:
+        payload = orjson.dumps(PlaceListResponse.model_validate(
+            {"places": rows, **page}, from_attributes=True, context=DEFAULT_PHOTO_SIZE.context()
+        ).model_dump())
+    done = time.perf_counter()
+    db.expunge_all()
+    return (fetched - started) * 1000, (done - fetched) * 1000, payload
+
+
+async def run(places: int, per_page: int, rounds: int):
+    random.seed(11)
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        db = AsyncSession(bind=conn)
+        try:
+            await conn.execute(insert(Place), [place_row(i) for i in range(places)])
+            print(f"seeded {places} places; pages of {per_page}, median of {rounds} rounds")
+            print(f"{'variant':<20} {'fetch':>10} {'serialize':>10} {'bytes':>9} {'gzip':>8}")
+            for name, view, fields, lang in VARIANTS:
+                await load_page(db, view, fields, lang, per_page)  # Warm up
+                fetch, serialize = [], []
+                for _ in range(rounds):
+                    f, s, payload = await load_page(db, view, fields, lang, per_page)
+                    fetch.append(f)
+                    serialize.append(s)
+                print(f"{name:<20} {timed(fetch)} {timed(serialize)} {len(payload):9d} "
+                      f"{len(gzip.compress(payload)):8d}")
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--places", type=int, default=1000)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.places, args.per_page, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
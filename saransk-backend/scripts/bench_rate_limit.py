@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Per-request overhead of the write-endpoint rate limiter.
+
+Times the limiter call itself (Redis Lua script and the in-process
+fallback buckets) and the end-to-end cost of the RateLimit dependency on a
+minimal in-process FastAPI app, sequentially and under concurrency. Needs
+REDIS_URL; bucket keys are random and expire on their own.
+
+    python scripts/bench_rate_limit.py --requests 5000 --concurrency 32
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+
+from app.core.ratelimit import POLICIES, RateLimit, RatePolicy, rate_limiter  # noqa: E402
+from app.core.redis import redis_client  # noqa: E402
+
+# Never exhausted during the run, so every call does the full check
+BENCH_POLICY = RatePolicy("bench", limit=10 ** 9, period=1)
+
+
+def summary(label: str, latencies_us, elapsed: float) -> None:
+    ordered = sorted(latencies_us)
+    pct = lambda p: ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))]  # noqa: E731
+    print(f"{label:<30} p50={pct(50):7.1f} us  p99={pct(99):7.1f} us  "
+          f"mean={statistics.fmean(ordered):7.1f} us  {len(ordered) / elapsed:9.0f} ops/s")
+
+
+async def timed(call, total: int, concurrency: int):
+    latencies = []
+    queue = iter(range(total))
+
+    async def worker():
+        for i in queue:
+            started = time.perf_counter()
+            await call(i)
+            latencies.append((time.perf_counter() - started) * 1e6)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+async def run(args):
+    run_id = uuid.uuid4().hex[:8]
+    identities = [f"bench-{run_id}-{i}" for i in range(args.identities)]
+
+    async def redis_take(i):
+        await rate_limiter.take(BENCH_POLICY, identities[i % len(identities)])
+
+    async def local_take(i):
+        rate_limiter.local.take(f"bench:{identities[i % len(identities)]}", BENCH_POLICY)
+
+    await redis_take(0)  # Load the script and open a connection
+    if rate_limiter._redis_down_until:
+        raise SystemExit("Redis is unavailable; the numbers would only cover the fallback")
+    for concurrency in (1, args.concurrency):
+        summary(f"redis script  c={concurrency}", *await timed(redis_take, args.requests, concurrency))
+    summary("in-process buckets", *await timed(local_take, args.requests, 1))
+
+    POLICIES[BENCH_POLICY.name] = BENCH_POLICY
+    app = FastAPI()
+
+    @app.post("/plain")
+    async def plain():
+        return {}
+
+    @app.post("/limited", dependencies=[Depends(RateLimit(BENCH_POLICY.name))])
+    async def limited():
+        return {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for concurrency in (1, args.concurrency):
+            results = {}
+            for path in ("/plain", "/limited"):
+                await client.post(path)
+                results[path] = await timed(lambda i, p=path: client.post(p), args.requests, concurrency)
+                summary(f"POST {path:<9} c={concurrency}", *results[path])
+            overhead = statistics.median(results["/limited"][0]) - statistics.median(results["/plain"][0])
+            print(f"{'dependency overhead':<30} {overhead:7.1f} us per request (median, c={concurrency})")
+    await redis_client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--identities", type=int, default=1000, help="Distinct buckets to spread calls over")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Benchmark the in-process recommendation index on a synthetic catalog.
+
+Seeds N active places around Saransk (random categories, ratings, review
+counts and price tiers) inside a transaction, builds the index from the
+database, then reports per-request top-k latency for random user interest
+sets with and without a position and with preference filters, the cost of
+an incremental refresh after rating changes, and the index memory.
+Rolls everything back. Needs a migrated database (DATABASE_URL).
+
+    python scripts/bench_recommendations.py --places 50000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import insert, select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.core.db import engine  # noqa: E402
+from app.core.images import DEFAULT_PHOTO_SIZE  # noqa: E402
+from app.models.place import Place, PlaceCategory, PlaceSubcategory, PriceTier, derived_columns  # noqa: E402
+from app.services.recommendations import COLUMNS, build_place_index  # noqa: E402
+
+CENTRE = (54.1838, 45.1749)
+INTERESTS = [c.value for c in PlaceCategory] + [s.value for s in PlaceSubcategory]
+
+
+def place_row(i: int) -> dict:
+    reviews = int(random.paretovariate(1.2)) - 1
+    row = {
+        "title_ru": f"Место {i}",
+        "title_en": f"Place {i}",
+        "description_ru": "Описание",
+        "description_en": "Description",
+        "category": random.choice(list(PlaceCategory)),
+        "subcategory": random.choice(list(PlaceSubcategory)),
+        "latitude": random.gauss(CENTRE[0], 0.03),
+        "longitude": random.gauss(CENTRE[1], 0.05),
+        "price_tier": random.choice(list(PriceTier)),
+        "wheelchair_accessible": random.random() < 0.3,
+        "rating_overall": round(random.uniform(2.5, 5), 2) if reviews else 0.0,
+        "reviews_count": reviews,
+        "photos": [f"https://storage.example.com/media/place/{i:06d}.jpg"],
+        "is_active": True,
+    }
+    return {**row, **derived_columns(row)}
+
+
+def timed(samples) -> str:
+    samples = sorted(samples)
+    return f"p50={statistics.median(samples):6.2f} ms  p99={samples[int(len(samples) * 0.99)]:6.2f} ms"
+
+
+async def run(places: int, rounds: int, limit: int):
+    random.seed(7)
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        db = AsyncSession(bind=conn)
+        try:
+            rows = [place_row(i) for i in range(places)]
+            started = time.perf_counter()
+            for offset in range(0, places, 1000):
+                await conn.execute(insert(Place).values(rows[offset:offset + 1000]))
+            print(f"seeded {places} places in {time.perf_counter() - started:.1f} s")
+
+            started = time.perf_counter()
+            index = await build_place_index(db)
+            print(f"index build: {(time.perf_counter() - started) * 1000:.0f} ms for {index.size} rows; "
+                  f"columns {index.nbytes / 1024:.0f} KiB ({index.nbytes / index.capacity:.0f} B/row)")
+
+            variants = [
+                ("interests", lambda: {}, False),
+                ("interests + position", lambda: {}, True),
+                ("+ wheelchair, price filter", lambda: {"wheelchair_accessible": True,
+                                                        "price_tiers": ["free", "budget"]}, True),
+            ]
+            print(f"top-{limit}, {rounds} requests each")
+            for label, preferences, located in variants:
+                samples = []
+                for _ in range(rounds):
+                    interests = random.sample(INTERESTS, random.randint(1, 4))
+                    lat, lng = (random.gauss(CENTRE[0], 0.02), random.gauss(CENTRE[1], 0.03)) if located else (None, None)
+                    t = time.perf_counter()
+                    recommended = index.recommend(interests, preferences(), limit, lat, lng)
+                    [index.item(rec, DEFAULT_PHOTO_SIZE) for rec in recommended]
+                    samples.append((time.perf_counter() - t) * 1000)
+                print(f"  {label:<28} {timed(samples)}")
+
+            # The change log only exposes committed transactions, so patch from the rows directly
+            for changed in (10, 200, 2000):
+                ids = [row[0] for row in await conn.execute(
+                    text("SELECT id FROM places ORDER BY random() LIMIT :n"), {"n": changed}
+                )]
+                await conn.execute(
+                    text("UPDATE places SET rating_overall = 4.9, reviews_count = reviews_count + 1 "
+                         "WHERE id = ANY(:ids)"), {"ids": ids}
+                )
+                t = time.perf_counter()
+                fresh = (await db.execute(select(*COLUMNS).where(Place.id.in_(ids)))).all()
+                index.apply(fresh, ids)
+                print(f"incremental refresh of {changed:>5} places: {(time.perf_counter() - t) * 1000:7.2f} ms")
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--places", type=int, default=50_000)
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.places, args.rounds, args.limit))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Benchmark /places/search on a synthetic bilingual catalog.
+
+Seeds N places with titles, tags, addresses and descriptions drawn from
+long-tailed Russian/English vocabularies inside a transaction, times the
+tsvector/GIN search used by the endpoint (whole words, multi-word and
+search-as-you-type prefixes) against building the documents at query
+time, checks the capped candidate ranking against ranking every match,
+then rolls everything back. Needs a migrated database (DATABASE_URL).
+
+    python scripts/bench_search.py --places 50000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import insert, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.core.db import engine  # noqa: E402
+from app.models.place import Place, PlaceCategory, PlaceSubcategory  # noqa: E402
+from app.services.search import SEARCH_CONFIGS, prefix_tsquery, search_places  # noqa: E402
+
+WORDS_RU = (
+    "собор площадь музей памятник храм парк фонтан улица театр галерея мост набережная "
+    "кафе ресторан кухня сувениры ярмарка мастерская усадьба церковь стадион библиотека "
+    "советский деревянный исторический мордовский городской старинный главный красный"
+).split()
+WORDS_EN = (
+    "cathedral square museum monument church park fountain street theatre gallery bridge "
+    "embankment cafe restaurant cuisine souvenirs fair workshop manor stadium library "
+    "soviet wooden historic mordovian city old main red"
+).split()
+
+
+# Reference for the candidate cap in search_places: rank every match
+RANK_ALL_SQL = """
+SELECT ts_rank_cd({doc}, to_tsquery(:config, :q)) AS rank FROM places
+WHERE {doc} @@ to_tsquery(:config, :q) AND is_active
+ORDER BY rank DESC
+LIMIT 20
+"""
+
+# Baseline without the stored columns: build the document per row at query time
+ON_THE_FLY_SQL = """
+SELECT id, ts_rank_cd(doc, q) AS rank
+FROM (SELECT id, to_tsvector('russian', title_ru || ' ' || coalesce(address_ru, '') || ' '
+                                        || description_ru) AS doc
+      FROM places WHERE is_active) d,
+     to_tsquery('russian', :q) q
+WHERE doc @@ q
+ORDER BY rank DESC
+LIMIT 20
+"""
+
+
+# Real catalogs have long-tailed vocabularies: pad the landmark words with
+# generated filler words and draw them with Zipf-like weights
+SYLLABLES_RU = "ба ва га да жа за ка ла ма на па ра са та фа ха ца ча ша ки ло ну ре ми со ту".split()
+SYLLABLES_EN = "ba ve go da ri zo ka le mo ni pa ru sa te fo hi co lu mi no tu ve xa yo".split()
+
+
+def vocabulary(seed_words, syllables, size):
+    rng = random.Random(len(seed_words))
+    words = list(seed_words)
+    while len(words) < size:
+        words.append("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return words
+
+
+VOCAB_RU = vocabulary(WORDS_RU, SYLLABLES_RU, 5000)
+VOCAB_EN = vocabulary(WORDS_EN, SYLLABLES_EN, 5000)
+WEIGHTS = [1 / (rank + 10) for rank in range(5000)]
+
+
+def phrase(words, n):
+    vocab = VOCAB_RU if words is WORDS_RU else VOCAB_EN
+    return " ".join(random.choices(vocab, WEIGHTS, k=n))
+
+
+def row(i):
+    return {
+        "title_ru": f"{phrase(WORDS_RU, 3)} {i}",
+        "title_en": f"{phrase(WORDS_EN, 3)} {i}",
+        "description_ru": phrase(WORDS_RU, 40),
+        "description_en": phrase(WORDS_EN, 40),
+        "address_ru": f"Саранск, улица {random.choice(WORDS_RU)}, {i % 200}",
+        "address_en": f"Saransk, {random.choice(WORDS_EN)} street, {i % 200}",
+        "tags": phrase(WORDS_RU, 3).split(),
+        "category": PlaceCategory.MONUMENT,
+        "subcategory": PlaceSubcategory.CULTURAL_HERITAGE,
+        "latitude": 54.18,
+        "longitude": 45.17,
+        "is_active": True,
+    }
+
+
+def timed(samples):
+    return (f"p50={statistics.median(samples):.2f} ms  "
+            f"p95={sorted(samples)[int(len(samples) * 0.95) - 1]:.2f} ms")
+
+
+async def run(n: int, queries: int):
+    random.seed(7)
+    cases = {
+        "word (ru)": [("ru", random.choice(WORDS_RU)) for _ in range(queries)],
+        "two words (ru)": [("ru", phrase(WORDS_RU, 2)) for _ in range(queries)],
+        "prefix (ru)": [("ru", random.choice(WORDS_RU)[:random.randint(3, 5)]) for _ in range(queries)],
+        "prefix (en)": [("en", random.choice(WORDS_EN)[:random.randint(3, 5)]) for _ in range(queries)],
+        "title number": [("ru", f"{random.choice(WORDS_RU)} {random.randint(1, n)}") for _ in range(queries)],
+    }
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        db = AsyncSession(bind=conn)
+        try:
+            started = time.perf_counter()
+            # One multi-row INSERT per chunk: the statement-level triggers on
+            # places (sync log, clusters, catalog version) then fire per chunk
+            for offset in range(0, n, 1000):
+                await conn.execute(insert(Place).values([row(i) for i in range(offset, min(offset + 1000, n))]))
+            await conn.execute(text("ANALYZE places"))
+            print(f"seeded {n} places in {time.perf_counter() - started:.1f} s")
+
+            for name, items in cases.items():
+                samples, hits, found = [], 0, 0
+                for lang, q in items:
+                    t = time.perf_counter()
+                    result = await search_places(db, q, lang, limit=20)
+                    samples.append((time.perf_counter() - t) * 1000)
+                    hits += len(result)
+                    best = (await conn.execute(
+                        text(RANK_ALL_SQL.format(doc=f"search_{lang}")),
+                        {"config": SEARCH_CONFIGS[lang], "q": prefix_tsquery(q)},
+                    )).scalars().all()
+                    # Ties are common, so compare scores rather than ids
+                    found += sum(score >= best[-1] - 1e-6 for _, score in result) if best else 0
+                    db.expunge_all()
+                recall = found / hits if hits else 1.0
+                print(f"{name:<16} {timed(samples)}  avg {hits / len(items):.1f} hits, "
+                      f"{recall:.0%} as good as ranking every match")
+
+            scan = []
+            for _, q in cases["prefix (ru)"][: max(2, queries // 20)]:
+                t = time.perf_counter()
+                (await conn.execute(text(ON_THE_FLY_SQL), {"q": prefix_tsquery(q)})).all()
+                scan.append((time.perf_counter() - t) * 1000)
+            print(f"{'on-the-fly scan':<16} {timed(scan)}")
+
+            plan = await conn.execute(text(
+                "EXPLAIN SELECT id FROM places WHERE search_ru @@ to_tsquery('russian', :q) AND is_active"
+            ), {"q": prefix_tsquery("собор пло")})
+            print("plan:")
+            for (line,) in plan:
+                print("   ", line)
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--places", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.places, args.queries))
+
+
+if __name__ == '__main__':
+    main()
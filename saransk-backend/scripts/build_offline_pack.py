@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Build the next offline pack version from the database.
+
+Exports active places and route templates plus the images/audio they
+reference into a content-addressed store, writes the version manifest,
+a delta against the previous version and tar archives for both. Media is
+hashed in a process pool; files whose size and mtime are unchanged reuse
+their cached hash. Nothing is written when the content is unchanged.
+
+    python scripts/build_offline_pack.py
+    python scripts/build_offline_pack.py --out var/offline --media-root .. --workers 8
+    python scripts/build_offline_pack.py --upload   # also publish to the S3 bucket
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.core.db import SessionLocal, engine  # noqa: E402
+from app.services.offline import OfflinePackBuilder  # noqa: E402
+from app.services.pack_storage import create_pack_storage  # noqa: E402
+
+
+def mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.2f} MB"
+
+
+async def run(args):
+    started = time.perf_counter()
+    builder = OfflinePackBuilder(Path(args.out), Path(args.media_root), args.workers)
+    async with SessionLocal() as db:
+        result = await builder.build(db, force=args.force)
+    await engine.dispose()
+
+    if args.upload and result.files:
+        storage = create_pack_storage("s3")
+        # result.files ends with latest.json, so the pointer moves only after the packs are up
+        for name in result.files:
+            await storage.upload(name, Path(args.out) / name)
+        await storage.aclose()
+        print(f"Uploaded {len(result.files)} files to s3://{settings.s3_bucket}/{settings.offline_s3_prefix}")
+
+    elapsed = time.perf_counter() - started
+    if result.unchanged:
+        print(f"No changes since {result.pack_id} ({elapsed:.2f} s, {result.hashed_files} files rehashed)")
+        return
+    manifest = result.manifest
+    print(f"Built {result.pack_id}: {len(manifest['entries'])} files, {mb(manifest['size'])}")
+    print(f"Rehashed {result.hashed_files} files, stored {result.new_objects} new objects in {elapsed:.2f} s")
+    if result.delta:
+        delta = result.delta
+        print(
+            f"Delta {delta['pack_id']}: +{len(delta['added'])} ~{len(delta['changed'])} -{len(delta['removed'])}, "
+            f"{len(delta['objects'])} objects to fetch ({mb(delta['size'])})"
+        )
+    for ref in result.missing:
+        print(f"  missing media: {ref}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an offline pack")
+    parser.add_argument("--out", default=settings.offline_dir)
+    parser.add_argument("--media-root", default=settings.offline_media_root)
+    parser.add_argument("--workers", type=int, default=None, help="Hashing processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Cut a new version even if nothing changed")
+    parser.add_argument("--upload", action="store_true", help="Publish the new version to the S3 bucket")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
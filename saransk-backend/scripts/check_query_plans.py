@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Query-plan regression check for the hot read endpoints.
+
+Seeds a realistic catalog (places and reviews) inside a transaction,
+calls the endpoints in-process with the response cache disabled, captures
+every SELECT they issue and runs EXPLAIN on it with the same parameters.
+Exits non-zero when any plan contains a sequential scan on places or
+reviews, then rolls everything back. Exact count(*) queries (page mode
+totals, and the count/max(updated_at) list validators behind ETags) only
+warn: they visit every matching row whichever plan is used; keyset
+pagination skips the totals and validators are cached with the pages. Needs a migrated database
+(DATABASE_URL); run it in CI after `alembic upgrade head`.
+
+    python scripts/check_query_plans.py --places 20000 --reviews 100000
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.core.cache import ResponseCache, get_cache  # noqa: E402
+from app.core.db import engine, get_db  # noqa: E402
+from app.core.geo import CELL_DEG, GRID_COLS  # noqa: E402
+from app.core.redis import redis_client  # noqa: E402
+from app.main import app  # noqa: E402
+
+WATCHED_TABLES = {"places", "reviews"}
+
+SEED_PLACES_SQL = f"""
+INSERT INTO places (created_at, updated_at, title_ru, title_en, description_ru, description_en,
+                    category, subcategory, tags, photos, price_tier, is_commercial, latitude, longitude,
+                    grid_cell, wheelchair_accessible, audio_description, rating_overall, rating_interest,
+                    rating_informativeness, rating_convenience, reviews_count, is_active)
+SELECT now(), now(), 'Место ' || g, 'Place ' || g, 'Описание места ' || g, 'Place description ' || g,
+       (ARRAY['monument', 'architecture', 'food', 'souvenir'])[1 + g % 4]::placecategory,
+       (ARRAY['cultural_heritage', 'modern', 'cafe', 'workshop'])[1 + g % 4]::placesubcategory,
+       '{{}}', '{{}}', (ARRAY['free', 'budget', 'medium', 'premium'])[1 + (g / 4) % 4]::pricetier,
+       g % 3 = 0, lat, lng,
+       floor((lat + 90) / {CELL_DEG})::bigint * {GRID_COLS}
+           + LEAST(floor((lng + 180) / {CELL_DEG})::bigint, {GRID_COLS - 1}),
+       false, false, round((random() * 5)::numeric, 2), 0, 0, 0, 0, g % 10 <> 0
+FROM (
+    SELECT g, 54.18 + (random() - 0.5) * 0.3 AS lat, 45.17 + (random() - 0.5) * 0.5 AS lng
+    FROM generate_series(1, :n) AS g
+) s
+"""
+
+SEED_REVIEWS_SQL = """
+INSERT INTO reviews (created_at, updated_at, place_id, user_id, text, photos, rating_interest,
+                     rating_informativeness, rating_convenience, status, reports_count)
+SELECT now(), now(), p.ids[1 + (g % array_length(p.ids, 1))], :user_id, 'review ' || g, '{}', 4, 4, 4,
+       (ARRAY['approved', 'approved', 'approved', 'pending', 'rejected', 'hidden'])[1 + g % 6]::reviewstatus,
+       0
+FROM generate_series(1, :n) AS g,
+     (SELECT array_agg(id) AS ids FROM places) p
+"""
+
+
+def seq_scans(plan: dict):
+    """Yield (table, node) for every Seq Scan on a watched table in an EXPLAIN JSON plan"""
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in WATCHED_TABLES:
+        yield plan["Relation Name"], plan
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+async def run(n_places: int, n_reviews: int, verbose: bool) -> int:
+    failures = 0
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        db = AsyncSession(bind=conn)
+        captured = []
+
+        def capture(connection, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT") and not executemany:
+                captured.append((statement, parameters))
+
+        try:
+            user_id = await conn.scalar(text(
+                "INSERT INTO users (created_at, updated_at, auth_provider, auth_id, is_active) "
+                "VALUES (now(), now(), 'email', 'plan-check@example.com', true) RETURNING id"
+            ))
+            await conn.execute(text(SEED_PLACES_SQL), {"n": n_places})
+            await conn.execute(text(SEED_REVIEWS_SQL), {"n": n_reviews, "user_id": user_id})
+            await conn.execute(text("ANALYZE places"))
+            await conn.execute(text("ANALYZE reviews"))
+            place_id = await conn.scalar(text("SELECT id FROM places WHERE is_active ORDER BY id LIMIT 1 OFFSET 100"))
+
+            async def override_db():
+                yield db
+
+            app.dependency_overrides[get_db] = override_db
+            app.dependency_overrides[get_cache] = lambda: ResponseCache(
+                redis_client, ttl=1, lock_ttl_ms=1, lock_wait_ms=1, enabled=False
+            )
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+                first = (await client.get("/api/v1/places/", params={"with_total": False})).json()
+                by_rating = (await client.get("/api/v1/places/", params={"sort": "rating", "with_total": False})).json()
+                reviews = await client.get(f"/api/v1/reviews/place/{place_id}", params={"per_page": 5})
+
+                cases = {
+                    "places: first page": ("/api/v1/places/", {"with_total": False}),
+                    "places: deep page": ("/api/v1/places/", {"page": 200, "per_page": 20, "with_total": False}),
+                    "places: cursor": ("/api/v1/places/", {"cursor": first.get("next_cursor")}),
+                    "places: category": ("/api/v1/places/", {"category": "food", "with_total": True}),
+                    "places: subcategory": ("/api/v1/places/", {"subcategory": "cafe", "with_total": False}),
+                    "places: price tier": ("/api/v1/places/", {"price_tier": "premium", "with_total": False}),
+                    "places: open now": ("/api/v1/places/", {"open_now": True, "with_total": False}),
+                    "places: by rating": ("/api/v1/places/", {"sort": "rating", "with_total": False}),
+                    "places: by rating, cursor": (
+                        "/api/v1/places/", {"sort": "rating", "cursor": by_rating.get("next_cursor")},
+                    ),
+                    "place": (f"/api/v1/places/{place_id}", {}),
+                    "nearby": ("/api/v1/places/nearby", {"lat": 54.18, "lng": 45.17, "radius_m": 1000}),
+                    # Selective exact term first: on the synthetic titles a lone prefix
+                    # term matches nearly every row and the planner's choice flips
+                    "search": ("/api/v1/places/search", {"q": f"{n_places // 2 + 1} место"}),
+                    "reviews: first page": (f"/api/v1/reviews/place/{place_id}", {}),
+                    "reviews: cursor": (
+                        f"/api/v1/reviews/place/{place_id}", {"cursor": reviews.headers.get("x-next-cursor")},
+                    ),
+                }
+
+                listener = engine.sync_engine
+                for name, (url, params) in cases.items():
+                    params = {k: v for k, v in params.items() if v is not None}
+                    captured.clear()
+                    event.listen(listener, "before_cursor_execute", capture)
+                    try:
+                        response = await client.get(url, params=params)
+                    finally:
+                        event.remove(listener, "before_cursor_execute", capture)
+                    db.expunge_all()
+                    if response.status_code != 200:
+                        print(f"FAIL {name}: HTTP {response.status_code} {response.text[:200]}")
+                        failures += 1
+                        continue
+
+                    problems, warnings = [], []
+                    for statement, parameters in captured:
+                        raw = await conn.get_raw_connection()
+                        cursor = raw.driver_connection.cursor()
+                        await cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+                        (plan,) = (await cursor.fetchone())[0]
+                        await cursor.close()
+                        scans = list(seq_scans(plan["Plan"]))
+                        found = [f"Seq Scan on {table}" for table, _ in scans]
+                        if statement.lstrip().startswith("SELECT count("):
+                            warnings.extend(f"{f} (count)" for f in found)
+                        else:
+                            problems.extend(found)
+                        if verbose or scans:
+                            print(f"     {statement.split(chr(10))[0][:100]}...")
+                            print(f"       cost={plan['Plan']['Total Cost']:.1f} "
+                                  f"nodes={sorted(set(_node_types(plan['Plan'])))}")
+
+                    status = "FAIL" if problems else "warn" if warnings else "ok  "
+                    failures += bool(problems)
+                    notes = problems + warnings
+                    print(f"{status} {name} ({len(captured)} queries){': ' + ', '.join(notes) if notes else ''}")
+        finally:
+            app.dependency_overrides.clear()
+            await db.close()
+            await trans.rollback()
+    await redis_client.aclose()
+    await engine.dispose()
+    return failures
+
+
+def _node_types(plan: dict):
+    yield plan["Node Type"] + (f" {plan['Index Name']}" if "Index Name" in plan else "")
+    for child in plan.get("Plans", []):
+        yield from _node_types(child)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--places", type=int, default=20_000)
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every plan, not only failures")
+    args = parser.parse_args()
+
+    failures = asyncio.run(run(args.places, args.reviews, args.verbose))
+    if failures:
+        print(f"{failures} endpoint(s) fell back to sequential scans")
+        sys.exit(1)
+    print("all plans use indexes")
+
+
+if __name__ == '__main__':
+    main()
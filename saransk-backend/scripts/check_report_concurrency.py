@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Concurrency check for review reports.
+
+Creates N throwaway users and an approved review, then has every user
+report it in parallel (each twice, so duplicates race their originals) on
+separate connections. Verifies the exact outcome: reports_count and the
+reporter rows equal N, exactly one report hid the review and the place's
+rating sums dropped it exactly once. With --legacy it also runs the old
+load / increment / commit pattern under the same load to show the lost
+updates (and repairs the drift it causes). Everything created is deleted
+afterwards; exits 1 on a mismatch.
+Needs a migrated database with at least one active place (DATABASE_URL).
+
+    python scripts/check_report_concurrency.py --users 300 --legacy
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import delete, func, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.models.place import Place  # noqa: E402
+from app.models.review import Review, ReviewReport, ReviewStatus  # noqa: E402
+from app.models.user import AuthProvider, User  # noqa: E402
+from app.services.ratings import apply_review_transition, reconcile_place_ratings  # noqa: E402
+from app.services.reports import REPORTS_TO_HIDE, record_report  # noqa: E402
+
+
+async def create_fixture(Session, n_users: int, tag: str):
+    async with Session() as db:
+        place_id = await db.scalar(select(Place.id).where(Place.is_active == True).order_by(Place.id).limit(1))
+        if place_id is None:
+            raise SystemExit("No active place to review; seed the catalog first")
+        users = [User(auth_provider=AuthProvider.EMAIL, auth_id=f"report-check-{tag}-{i}") for i in range(n_users)]
+        db.add_all(users)
+        await db.flush()
+        reviews = []
+        for _ in range(2):
+            review = Review(place_id=place_id, user_id=users[0].id, text="report check", photos=[],
+                            rating_interest=5, rating_informativeness=5, rating_convenience=5,
+                            status=ReviewStatus.APPROVED)
+            db.add(review)
+            await db.flush()
+            await apply_review_transition(db, review, None, ReviewStatus.APPROVED)
+            reviews.append(review.id)
+        await db.commit()
+        return place_id, [u.id for u in users], reviews
+
+
+async def place_count(Session, place_id: int) -> int:
+    async with Session() as db:
+        return await db.scalar(select(Place.reviews_count).where(Place.id == place_id))
+
+
+async def report(Session, review_id: int, user_id: int):
+    async with Session() as db:
+        result = await record_report(db, review_id, user_id, "concurrency check")
+        await db.commit()
+        return result
+
+
+async def legacy_report(Session, review_id: int):
+    """The previous endpoint body: read, increment in Python, commit"""
+    async with Session() as db:
+        review = await db.get(Review, review_id)
+        review.reports_count += 1
+        hid = False
+        if review.reports_count >= REPORTS_TO_HIDE and review.status != ReviewStatus.HIDDEN:
+            await apply_review_transition(db, review, review.status, ReviewStatus.HIDDEN)
+            review.status = ReviewStatus.HIDDEN
+            hid = True
+        await db.commit()
+        return hid
+
+
+async def run(args):
+    engine = create_async_engine(settings.database_url, pool_size=args.concurrency, max_overflow=0)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    tag = uuid.uuid4().hex[:8]
+    place_id, user_ids, (review_id, legacy_review_id) = await create_fixture(Session, args.users, tag)
+    failures = []
+    try:
+        counted = await place_count(Session, place_id)
+        calls = [(review_id, u) for u in user_ids for _ in range(2)]
+        started = time.perf_counter()
+        results = await asyncio.gather(*(report(Session, r, u) for r, u in calls))
+        elapsed = time.perf_counter() - started
+
+        recorded = [r for r in results if r is not None]
+        async with Session() as db:
+            review = await db.get(Review, review_id)
+            rows = await db.scalar(select(func.count()).select_from(ReviewReport)
+                                   .where(ReviewReport.review_id == review_id))
+        after = await place_count(Session, place_id)
+        print(f"{len(calls)} reports ({args.users} users, each twice) in {elapsed:.2f} s")
+        print(f"  recorded {len(recorded)}, reports_count {review.reports_count}, reporter rows {rows}, "
+              f"status {review.status.value}, hides {sum(r.hidden for r in recorded)}, "
+              f"place reviews_count {counted} -> {after}")
+
+        expected_hidden = args.users >= REPORTS_TO_HIDE
+        if not len(recorded) == review.reports_count == rows == args.users:
+            failures.append("report counts differ from the number of reporters")
+        if sorted(r.reports_count for r in recorded) != list(range(1, args.users + 1)):
+            failures.append("reports did not see consecutive counts")
+        if sum(r.hidden for r in recorded) != int(expected_hidden):
+            failures.append("the review was not hidden exactly once")
+        if (review.status == ReviewStatus.HIDDEN) != expected_hidden:
+            failures.append(f"unexpected final status {review.status.value}")
+        if after != counted - int(expected_hidden):
+            failures.append("place rating did not drop the hidden review exactly once")
+
+        if args.legacy:
+            counted = await place_count(Session, place_id)
+            outcomes = []
+            for attempt in asyncio.as_completed([legacy_report(Session, legacy_review_id) for _ in user_ids]):
+                try:
+                    outcomes.append(await attempt)
+                except OperationalError:
+                    outcomes.append(None)
+            async with Session() as db:
+                legacy = await db.get(Review, legacy_review_id)
+            after = await place_count(Session, place_id)
+            print(f"legacy: {args.users} reports -> reports_count {legacy.reports_count}, "
+                  f"hides {sum(1 for o in outcomes if o)}, place reviews_count {counted} -> {after}")
+    finally:
+        async with Session() as db:
+            for rid in (review_id, legacy_review_id):
+                review = await db.get(Review, rid)
+                await apply_review_transition(db, review, review.status, None)
+            await db.execute(delete(Review).where(Review.id.in_([review_id, legacy_review_id])))
+            await db.execute(delete(User).where(User.id.in_(user_ids)))
+            if args.legacy:
+                await reconcile_place_ratings(db)  # The legacy run leaves the place's sums drifted
+            await db.commit()
+        await engine.dispose()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=50, help="Parallel connections")
+    parser.add_argument("--legacy", action="store_true", help="Also run the old read-modify-write report")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Compact the delta-sync change log.
+
+Keeps only the newest change per place / route template (tombstones
+included), so the log stays proportional to the catalog while every
+issued sync token keeps working. Safe to run at any time (e.g. nightly).
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.db import SessionLocal, engine  # noqa: E402
+from app.services.sync import compact_change_log  # noqa: E402
+
+
+async def run():
+    started = time.perf_counter()
+    async with SessionLocal() as db:
+        removed = await compact_change_log(db)
+        await db.commit()
+    await engine.dispose()
+    print(f"Removed {removed} superseded changes in {time.perf_counter() - started:.2f} s")
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
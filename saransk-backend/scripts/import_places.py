@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Bulk import places into Postgres.
+
+Streams either an NDJSON file of PlaceImport records or a
+content/poi.json-shaped document (``--format poi``), validates every
+record and upserts on external_id in batched INSERT ... ON CONFLICT
+statements. Prints inserted/updated/rejected counts and rows/sec.
+
+    python scripts/import_places.py ../content/poi.json --format poi
+    python scripts/import_places.py places.ndjson --batch-size 1000
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.cache import invalidate_place, response_cache  # noqa: E402
+from app.core.db import SessionLocal, engine  # noqa: E402
+from app.core.redis import redis_client  # noqa: E402
+from app.services.importer import import_places, iter_json_array, parse_ndjson_line, poi_to_place  # noqa: E402
+
+
+def read_ndjson(path: Path):
+    with path.open("rb") as fp:
+        for number, line in enumerate(fp, 1):
+            if line.strip():
+                yield number, parse_ndjson_line(line)
+
+
+def read_poi(path: Path):
+    with path.open(encoding="utf-8") as fp:
+        for number, item in iter_json_array(fp, "items"):
+            yield number, poi_to_place(item) if isinstance(item, dict) else item
+
+
+async def run(args):
+    path = Path(args.path)
+    fmt = args.format
+    if fmt == "auto":
+        fmt = "ndjson" if path.suffix in (".ndjson", ".jsonl") else "poi"
+    records = read_ndjson(path) if fmt == "ndjson" else read_poi(path)
+
+    async with SessionLocal() as db:
+        report = await import_places(db, records, args.batch_size)
+    if report.inserted or report.updated:
+        await invalidate_place(response_cache)
+    await redis_client.aclose()
+    await engine.dispose()
+
+    print(f"Inserted: {report.inserted}")
+    print(f"Updated:  {report.updated}")
+    print(f"Rejected: {report.rejected}")
+    print(f"Elapsed:  {report.elapsed_seconds:.2f} s ({report.rows_per_second:.0f} rows/s)")
+    for error in report.errors[:args.show_errors]:
+        print(f"  line {error.line} [{error.external_id or '-'}]: {error.error}")
+    return 1 if report.rejected and not (report.inserted or report.updated) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import places")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["auto", "ndjson", "poi"], default="auto")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--show-errors", type=int, default=20)
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == '__main__':
+    main()
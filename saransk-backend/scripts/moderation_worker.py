@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Run review moderation workers outside the API processes.
+
+Use with MODERATION_WORKERS=0 on the API so scoring (e.g. Perspective API
+calls) never competes with request handling. Needs MODERATION_QUEUE=redis
+so the API's enqueues reach this process.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.cache import response_cache  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.db import SessionLocal, engine  # noqa: E402
+from app.core.redis import redis_client  # noqa: E402
+from app.services.moderation import ModerationWorkerPool, create_scorer, moderation_queue  # noqa: E402
+
+
+async def run(args):
+    pool = ModerationWorkerPool(
+        SessionLocal, moderation_queue, create_scorer(args.scorer), response_cache,
+        args.workers, args.batch_size, sweep_interval=args.sweep_interval,
+    )
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await pool.start()
+    print(f"Moderating with {args.workers} workers, batches of {args.batch_size}")
+    await stopping.wait()
+    await pool.stop()
+    await redis_client.aclose()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=max(settings.moderation_workers, 1))
+    parser.add_argument("--batch-size", type=int, default=settings.moderation_batch_size)
+    parser.add_argument("--scorer", choices=["heuristic", "perspective"], default=None,
+                        help="Default: MODERATION_SCORER")
+    parser.add_argument("--sweep-interval", type=float, default=60.0,
+                        help="Seconds between re-queues of pending, unscored reviews")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
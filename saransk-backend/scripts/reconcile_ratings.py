@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Recompute place rating aggregates from approved reviews.
+
+Repairs drift in the incrementally maintained sums/counts with a single
+grouped query. Safe to run at any time (e.g. nightly from cron).
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.cache import invalidate_place, response_cache  # noqa: E402
+from app.core.db import SessionLocal, engine  # noqa: E402
+from app.core.redis import redis_client  # noqa: E402
+from app.services.ratings import reconcile_place_ratings  # noqa: E402
+
+
+async def run():
+    started = time.perf_counter()
+    async with SessionLocal() as db:
+        repaired = await reconcile_place_ratings(db)
+        await db.commit()
+    if repaired:
+        await invalidate_place(response_cache)
+    await redis_client.aclose()
+    await engine.dispose()
+    print(f"Repaired {repaired} places in {time.perf_counter() - started:.2f} s")
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
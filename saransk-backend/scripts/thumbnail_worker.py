@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Generate photo thumbnails outside the API processes.
+
+Use with MEDIA_THUMBNAIL_WORKERS=0 on the API so resizing never competes
+with request handling: confirmed uploads are picked up from the database
+(media assets in ``processing``) every --sweep-interval seconds.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.cache import response_cache  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.db import SessionLocal, engine  # noqa: E402
+from app.core.redis import redis_client  # noqa: E402
+from app.services.media import media_storage  # noqa: E402
+from app.services.thumbnails import ThumbnailPipeline  # noqa: E402
+
+
+async def run(args):
+    pipeline = ThumbnailPipeline(
+        SessionLocal, media_storage, response_cache, args.workers, settings.media_thumbnail_widths,
+        sweep_interval=args.sweep_interval, claim_seconds=settings.media_thumbnail_claim_seconds,
+    )
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await pipeline.start()
+    print(f"Generating thumbnails {settings.media_thumbnail_widths} with {args.workers} processes")
+    await stopping.wait()
+    await pipeline.stop()
+    await media_storage.aclose()
+    await redis_client.aclose()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=max(settings.media_thumbnail_workers, 1))
+    parser.add_argument("--sweep-interval", type=float, default=5.0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()